@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from models.models import College, Department, Course, Location, Event, db
+from model.models import (College, Department, Course, Location, Event,
+                          GLOBAL_STATS_ROW, aggregate_stats, db, read_stats_counters)
 from datetime import datetime
 
 api = Blueprint('api', __name__)
@@ -279,23 +280,29 @@ def search():
 @api.route('/stats', methods=['GET'])
 def get_stats():
     """Get database statistics"""
+    # The materialized counters, unless a write without the counter hooks
+    # has made them stale since the last rebuild
+    counts = read_stats_counters() or aggregate_stats()
+    
+    totals = counts[GLOBAL_STATS_ROW]
     stats = {
-        'colleges': College.query.count(),
-        'courses': Course.query.count(),
-        'locations': Location.query.count(),
-        'events': Event.query.filter(Event.is_active == True).count(),
-        'departments': Department.query.count(),
+        'colleges': totals['colleges'],
+        'courses': totals['courses'],
+        'locations': totals['locations'],
+        'events': totals['events'],
+        'departments': totals['departments'],
         'last_updated': datetime.utcnow().isoformat()
     }
     
     # Stats by college
-    colleges = College.query.all()
+    empty = {'courses': 0, 'locations': 0, 'events': 0}
     college_stats = {}
-    for college in colleges:
-        college_stats[college.code] = {
-            'courses': Course.query.filter_by(college_id=college.id).count(),
-            'locations': Location.query.filter_by(college_id=college.id).count(),
-            'events': Event.query.filter_by(college_id=college.id, is_active=True).count()
+    for college_id, code in db.session.query(College.id, College.code):
+        row = counts.get(college_id, empty)
+        college_stats[code] = {
+            'courses': row['courses'],
+            'locations': row['locations'],
+            'events': row['events']
         }
     
     stats['by_college'] = college_stats
@@ -1,20 +1,37 @@
-from flask import Flask, request, jsonify
+from flask import Flask, abort, request, jsonify, make_response, copy_current_request_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, timedelta
+from collections import defaultdict
+from functools import wraps
+from itertools import chain
 import os
 import hashlib
 import secrets
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from threading import Thread
+import time
+from threading import Lock, Thread
+import event_times
+import geo
+import metrics
+import query_budget
+import json_responses
+from query_budget import max_queries
+from result_cache import CacheEntry, ResultCache, FRESH, STALE
+from search_index import FuzzyIndex, PrefixIndex, VersionedIndex, MAX_SUGGESTIONS
+from spatial_index import BuildingIndex, NEAREST_RADIUS, MAX_NEAREST_RADIUS
+from shared_cache import RedisBackend, VersionSnapshot
+from db import configure_engine, install_sqlite_pragmas
+from catalog_snapshot import CATALOG_TABLES, STAGING_SESSION_INFO, staged_import
 
 app = Flask(__name__)
 CORS(app)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///chizu_v2.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# WAL, busy timeout, cache/mmap sizes and pool sizing; see db.py for the knobs
+configure_engine(app)
 
 # Email Configuration
 app.config['SMTP_SERVER'] = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
@@ -23,7 +40,31 @@ app.config['SMTP_USERNAME'] = os.environ.get('SMTP_USERNAME', '')
 app.config['SMTP_PASSWORD'] = os.environ.get('SMTP_PASSWORD', '')
 app.config['FROM_EMAIL'] = os.environ.get('FROM_EMAIL', 'noreply@chizu.app')
 
+# Latency, SQL and size histograms at /metrics; registered first so it sees the response as sent
+request_metrics = metrics.init_app(app)
+
+# Response encoding: 'auto' uses orjson when installed, 'stdlib' forces the default encoder
+app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', 'auto')
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+json_responses.init_app(app)
+
+# Per-endpoint SQL statement budgets: 'log' overruns (default for the dev server), 'raise', or 'off'
+app.config['QUERY_BUDGET_MODE'] = os.environ.get('QUERY_BUDGET_MODE', 'log' if __name__ == '__main__' else 'off')
+
+# Memory budget for cached list responses, shared by all cached endpoints
+app.config['RESULT_CACHE_MAX_BYTES'] = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+# How long an invalidated response may still be served while it is recomputed
+# (never after this process's own write to a table it reads)
+app.config['RESULT_CACHE_MAX_STALE'] = float(os.environ.get('RESULT_CACHE_MAX_STALE', 5))
+# Optional Redis shared by all workers and hosts, e.g. redis://localhost:6379/0
+app.config['CACHE_REDIS_URL'] = os.environ.get('CACHE_REDIS_URL', '')
+app.config['SHARED_CACHE_TTL'] = int(os.environ.get('SHARED_CACHE_TTL', 300))
+# Seconds between archiving runs in each serving process; 0 leaves archiving
+# to `flask --app app archive-events` (e.g. from cron)
+app.config['EVENT_ARCHIVE_INTERVAL'] = int(os.environ.get('EVENT_ARCHIVE_INTERVAL', 60))
+
 db = SQLAlchemy(app)
+metrics.instrument_models(db.Model)
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -65,6 +106,10 @@ class College(db.Model):
         return {'id': self.id, 'name': self.name, 'code': self.code}
 
 class Location(db.Model):
+    __table_args__ = (
+        db.Index('uq_location_osm_id', 'osm_id', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     latitude = db.Column(db.Float)
@@ -73,6 +118,8 @@ class Location(db.Model):
     college_id = db.Column(db.Integer, db.ForeignKey('college.id'))
     description = db.Column(db.String(500))
     fun_facts = db.Column(db.Text)
+    # OpenStreetMap element ('way/123'), for buildings imported from OSM
+    osm_id = db.Column(db.String(32))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     college = db.relationship('College', backref='locations')
@@ -88,6 +135,43 @@ class Location(db.Model):
             'description': self.description,
             'fun_facts': self.fun_facts
         }
+    
+    def to_normalized_dict(self):
+        """to_dict() with the college referenced by id instead of name"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'category': self.category,
+            'college_id': self.college_id,
+            'description': self.description,
+            'fun_facts': self.fun_facts
+        }
+
+class BuildingFootprint(db.Model):
+    """A building's outline as encoded polylines (see geo.py), imported from OSM.
+
+    Simplified copies for zoomed-out maps are computed at import time; an
+    outline_z<zoom> is NULL when the building is under a pixel wide there.
+    """
+    __table_args__ = (
+        db.Index('uq_building_footprint_location', 'location_id', unique=True),
+        db.Index('ix_building_footprint_lat', 'min_lat', 'max_lat'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    location_id = db.Column(db.Integer, db.ForeignKey('location.id'), nullable=False)
+    min_lat = db.Column(db.Float, nullable=False)
+    min_lon = db.Column(db.Float, nullable=False)
+    max_lat = db.Column(db.Float, nullable=False)
+    max_lon = db.Column(db.Float, nullable=False)
+    outline = db.Column(db.Text, nullable=False)
+    outline_z14 = db.Column(db.Text)
+    outline_z15 = db.Column(db.Text)
+    outline_z16 = db.Column(db.Text)
+    outline_z17 = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class LocationPost(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -114,12 +198,20 @@ class LocationPost(db.Model):
         }
 
 class Event(db.Model):
+    __table_args__ = (
+        db.Index('ix_event_start_at', 'start_at'),
+        db.Index('ix_event_status_start_at', 'status', 'start_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     event_type = db.Column(db.String(50), nullable=False)
     date_time = db.Column(db.String(100), nullable=False)
     event_date = db.Column(db.String(20))
     event_time = db.Column(db.String(10))
+    # Parsed from the strings above (see event_times.py), in UTC
+    start_at = db.Column(db.DateTime)
+    end_at = db.Column(db.DateTime)
     location_id = db.Column(db.Integer, db.ForeignKey('location.id'))
     description = db.Column(db.String(500))
     status = db.Column(db.String(20), default='pending')
@@ -136,14 +228,47 @@ class Event(db.Model):
             'date_time': self.date_time,
             'event_date': self.event_date,
             'event_time': self.event_time,
+            'start_at': event_times.isoformat_utc(self.start_at),
+            'end_at': event_times.isoformat_utc(self.end_at),
             'location': self.location.to_dict() if self.location else None,
             'description': self.description,
             'status': self.status,
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat()
         }
+    
+    def to_normalized_dict(self):
+        """to_dict() with the location referenced by id instead of embedded"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'event_type': self.event_type,
+            'date_time': self.date_time,
+            'event_date': self.event_date,
+            'event_time': self.event_time,
+            'start_at': event_times.isoformat_utc(self.start_at),
+            'end_at': event_times.isoformat_utc(self.end_at),
+            'location_id': self.location_id,
+            'description': self.description,
+            'status': self.status,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat()
+        }
+
+@event.listens_for(Event, 'before_insert')
+def _fill_event_times(mapper, connection, target):
+    # Clients and the sample data send only the strings
+    if target.start_at is None:
+        target.start_at, end_at = event_times.parse_event_times(target.date_time, target.event_date, target.event_time)
+        target.end_at = target.end_at or end_at
+    elif target.end_at is None:
+        target.end_at = target.start_at + event_times.DEFAULT_DURATION
 
 class StarredItem(db.Model):
+    __table_args__ = (
+        db.Index('uq_starred_item_user_item', 'user_id', 'item_type', 'item_id', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     item_type = db.Column(db.String(20), nullable=False)
@@ -213,9 +338,32 @@ class Course(db.Model):
             'semester': self.semester,
             'notes': self.notes
         }
+    
+    def to_normalized_dict(self):
+        """to_dict() with the college and location referenced by id"""
+        return {
+            'id': self.id,
+            'course_code': self.course_code,
+            'section': self.section,
+            'title': self.title,
+            'department_code': self.department_code,
+            'college_id': self.college_id,
+            'location_id': self.location_id,
+            'instructors': self.instructors,
+            'days': self.days,
+            'time': self.time,
+            'seats_available': self.seats_available,
+            'credit': self.credit,
+            'semester': self.semester,
+            'notes': self.notes
+        }
 
 
 class UserCourse(db.Model):
+    __table_args__ = (
+        db.Index('uq_user_course_user_course', 'user_id', 'course_id', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
@@ -253,13 +401,533 @@ class CoursePost(db.Model):
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat(),
             'expires_at': self.expires_at.isoformat() if self.expires_at else None
-        } 
-       
+        }
+
+class TableVersion(db.Model):
+    """Write counter per table, used to tell when cached data has gone stale"""
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Eager loads for the nested to_dict() of list endpoints
+LOCATION_LOAD_OPTIONS = [joinedload(Location.college)]
+EVENT_LOAD_OPTIONS = [joinedload(Event.location).joinedload(Location.college)]
+COURSE_LOAD_OPTIONS = [
+    joinedload(Course.college),
+    joinedload(Course.location).joinedload(Location.college)
+]
+DEPARTMENT_LOAD_OPTIONS = [joinedload(Department.college)]
+
+# Models a StarredItem.item_type can point at, with the eager loads their
+# to_dict() needs so hydrating a whole list costs one query per type
+STARRABLE_MODELS = {
+    'location': (Location, LOCATION_LOAD_OPTIONS),
+    'event': (Event, EVENT_LOAD_OPTIONS),
+    'course': (Course, COURSE_LOAD_OPTIONS),
+}
+
+USER_COURSE_LOAD_OPTIONS = [
+    joinedload(UserCourse.course).joinedload(Course.college),
+    joinedload(UserCourse.course).joinedload(Course.location).joinedload(Location.college)
+]
+
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
+def dialect_insert(bind):
+    """The insert() construct with ON CONFLICT support for this database"""
+    if bind.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def insert_ignore(model):
+    """INSERT ... ON CONFLICT DO NOTHING for the configured database"""
+    return dialect_insert(db.engine)(model).on_conflict_do_nothing()
+
+def bump_table_versions(connection, table_names):
+    """Increment each table's version inside the caller's transaction"""
+    table = TableVersion.__table__
+    insert = dialect_insert(connection)
+    for name in sorted(table_names):
+        connection.execute(
+            insert(table)
+            .values(table_name=name, version=1)
+            .on_conflict_do_update(
+                index_elements=[table.c.table_name],
+                set_={'version': table.c.version + 1}
+            )
+        )
+
+def get_table_versions(*table_names):
+    """Current version of each named table, in the order given"""
+    rows = db.session.query(TableVersion.table_name, TableVersion.version).filter(
+        TableVersion.table_name.in_(table_names)
+    )
+    versions = dict(rows.all())
+    return tuple(versions.get(name, 0) for name in table_names)
+
+def load_table_versions():
+    return dict(db.session.query(TableVersion.table_name, TableVersion.version).all())
+
+def _record_bumped_tables(session, tables):
+    session.info.setdefault('bumped_tables', set()).update(tables)
+
+# Tables a response cache or index depends on, registered as they're declared.
+# Writes to the rest (stars, posts, users) skip the bump, so their writers
+# don't all queue on the same table_version rows.
+TRACKED_TABLES = set()
+
+def _versioned_table(mapper):
+    table = mapper.local_table
+    return table.metadata is db.metadata and table.name in TRACKED_TABLES
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_table_versions(session, flush_context):
+    # A staged import's writes go live, and are bumped once, when it's swapped in
+    if session.info.get(STAGING_SESSION_INFO):
+        return
+    changed = chain(
+        session.new,
+        session.deleted,
+        (obj for obj in session.dirty if session.is_modified(obj, include_collections=False))
+    )
+    tables = {
+        db.inspect(obj).mapper.local_table.name
+        for obj in changed
+        if _versioned_table(db.inspect(obj).mapper)
+    }
+    if tables:
+        bump_table_versions(session.connection(), tables)
+        _record_bumped_tables(session, tables)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_bulk_table_versions(orm_execute_state):
+    # Bulk statements (upserts, query.delete()) never reach after_flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if orm_execute_state.session.info.get(STAGING_SESSION_INFO):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and _versioned_table(mapper):
+        bump_table_versions(orm_execute_state.session.connection(), {mapper.local_table.name})
+        _record_bumped_tables(orm_execute_state.session, {mapper.local_table.name})
+
+# When this process last committed a write to each tracked table, on the
+# time.monotonic() clock; cached_response won't serve older stale entries
+_local_writes = {}
+
+@event.listens_for(Session, 'after_commit')
+def _publish_committed_table_versions(session):
+    tables = session.info.pop('bumped_tables', None)
+    if tables:
+        now = time.monotonic()
+        _local_writes.update(dict.fromkeys(tables, now))
+        version_snapshot.invalidate()
+        if shared_cache is not None:
+            shared_cache.publish_invalidation(tables)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_table_versions(session):
+    session.info.pop('bumped_tables', None)
+
+def build_autocomplete_index():
+    entries = []
+    courses = db.session.query(Course.id, Course.course_code, Course.title, Course.instructors)
+    for course_id, course_code, title, instructors in courses:
+        entries.append(('course_code', course_code, course_id))
+        entries.append(('title', title, course_id))
+        entries.append(('instructor', instructors, None))
+    
+    for location_id, name in db.session.query(Location.id, Location.name):
+        entries.append(('location', name, location_id))
+    
+    return PrefixIndex(entries)
+
+def build_fuzzy_index():
+    entries = []
+    for course_id, course_code, title in db.session.query(Course.id, Course.course_code, Course.title):
+        entries.append(('course_code', course_code, course_id))
+        entries.append(('title', title, course_id))
+    
+    for location_id, name in db.session.query(Location.id, Location.name):
+        entries.append(('location', name, location_id))
+    
+    return FuzzyIndex(entries)
+
+def build_building_index():
+    entries = [
+        (location_id, geo.decode_polyline(outline))
+        for location_id, outline in db.session.query(BuildingFootprint.location_id, BuildingFootprint.outline)
+    ]
+    # Locations without an outline can still be the nearest building
+    points = db.session.query(Location.id, Location.latitude, Location.longitude).outerjoin(
+        BuildingFootprint, BuildingFootprint.location_id == Location.id
+    ).filter(
+        BuildingFootprint.id.is_(None), Location.latitude.isnot(None), Location.longitude.isnot(None)
+    )
+    entries.extend((location_id, (lat, lon)) for location_id, lat, lon in points)
+    return BuildingIndex(entries)
+
+shared_cache = None
+if app.config['CACHE_REDIS_URL']:
+    shared_cache = RedisBackend.from_url(app.config['CACHE_REDIS_URL'], ttl=app.config['SHARED_CACHE_TTL'])
+
+# With a shared cache, versions come from memory and reload at most once a
+# second or on an invalidation message, instead of a query per request
+version_snapshot = VersionSnapshot(load_table_versions)
+
+def cache_versions(*table_names):
+    """Table versions for cache validation"""
+    if shared_cache is None:
+        return get_table_versions(*table_names)
+    return version_snapshot.get(*table_names)
+
+def tracked_versions(*table_names):
+    """A version function for table_names, registering them to be bumped on write"""
+    TRACKED_TABLES.update(table_names)
+    return lambda: cache_versions(*table_names)
+
+# Rebuilt whenever a course or location write bumps the catalog's table versions
+autocomplete_index = VersionedIndex(build_autocomplete_index, tracked_versions('course', 'location'))
+fuzzy_index = VersionedIndex(build_fuzzy_index, tracked_versions('course', 'location'))
+building_index = VersionedIndex(build_building_index, tracked_versions('location', 'building_footprint'))
+
+result_cache = ResultCache(app.config['RESULT_CACHE_MAX_BYTES'], app.config['RESULT_CACHE_MAX_STALE'])
+request_metrics.add_gauges(lambda: {
+    f'chizu_result_cache_{name}': (f'Response cache {name.replace("_", " ")}.', value)
+    for name, value in result_cache.stats().items()
+})
+
+def _on_remote_invalidation(tables):
+    version_snapshot.invalidate()
+    if tables & {'course', 'location'}:
+        autocomplete_index.invalidate()
+        fuzzy_index.invalidate()
+    if tables & {'location', 'building_footprint'}:
+        building_index.invalidate()
+
+_listener_pid = None
+
+def start_invalidation_listener():
+    """Subscribe this process to writes made by other workers and hosts.
+
+    Threads don't survive a fork, so every worker process starts its own.
+    """
+    global _listener_pid
+    if shared_cache is not None and _listener_pid != os.getpid():
+        shared_cache.subscribe(_on_remote_invalidation)
+        _listener_pid = os.getpid()
+
+def catalog_table_versions(connection):
+    table = TableVersion.__table__
+    return dict(connection.execute(
+        db.select(table.c.table_name, table.c.version).where(table.c.table_name.in_(CATALOG_TABLES))
+    ).all())
+
+def import_catalog_staged(import_into):
+    """Run import_into(session) on a staging copy, then swap the catalog in.
+
+    Needs an app context and a file-backed SQLite database. import_into may
+    run more than once if the catalog is written meanwhile. Returns the
+    catalog row counts now live.
+    """
+    counts = staged_import(db.engine, db.metadata, import_into, bump_table_versions, catalog_table_versions)
+    # The staging session bumped nothing; the swap bumped every catalog table once
+    _local_writes.update(dict.fromkeys(CATALOG_TABLES, time.monotonic()))
+    version_snapshot.invalidate()
+    if shared_cache is not None:
+        shared_cache.publish_invalidation(set(CATALOG_TABLES))
+    return counts
+
+def cached_response(*tables):
+    """Serve the view from result_cache until one of `tables` is written.
+
+    Only 200 responses are cached. Concurrent misses on one key run the view
+    once; an invalidated entry keeps being served while a single background
+    refresh recomputes it. Compressed variants are kept with the entry so a
+    hit skips both the query and the compression. With CACHE_REDIS_URL set, a
+    local miss is looked up in the shared cache before running the view.
+    """
+    TRACKED_TABLES.update(tables)
+    
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            key = ResultCache.make_key(request.endpoint, request.args, view_args)
+            
+            def compute(versions=None, versions_at=None):
+                if versions is None:
+                    versions_at = time.monotonic()
+                    versions = cache_versions(*tables)
+                stored = shared_cache.get(key, versions) if shared_cache is not None else None
+                if stored is not None:
+                    status, mimetype, body = stored
+                    entry = CacheEntry(key, versions, mimetype, body, status, versions_at)
+                else:
+                    response = make_response(view(**view_args))
+                    entry = CacheEntry(key, versions, response.mimetype, response.get_data(), response.status_code,
+                                       versions_at)
+                    if shared_cache is not None and entry.status == 200:
+                        shared_cache.set(key, versions, entry.status, entry.mimetype, entry.bodies[None])
+                result_cache.store(entry)
+                return entry
+            
+            versions_at = time.monotonic()
+            versions = cache_versions(*tables)
+            written_at = max((_local_writes[table] for table in tables if table in _local_writes), default=None)
+            entry, state = result_cache.lookup(key, versions, written_at)
+            if state == FRESH:
+                cache_status = 'HIT'
+            elif state == STALE:
+                # The refresh runs later, so it reads the versions again
+                result_cache.refresh(key, copy_current_request_context(compute))
+                cache_status = 'STALE'
+            else:
+                entry, shared = result_cache.compute(key, lambda: compute(versions, versions_at))
+                cache_status = 'COALESCED' if shared else 'MISS'
+            
+            response = cached_entry_response(entry)
+            response.headers['X-Cache'] = cache_status
+            return response
+        return wrapper
+    return decorator
+
+def cached_entry_response(entry):
+    response = app.response_class(status=entry.status, mimetype=entry.mimetype)
+    response.vary.add('Accept-Encoding')
+    
+    body = entry.bodies[None]
+    encoding = None
+    if len(body) >= app.config['COMPRESS_MIN_SIZE']:
+        encoding = json_responses.choose_encoding(request.accept_encodings)
+    
+    if encoding:
+        compressed = entry.bodies.get(encoding)
+        if compressed is None:
+            compressed = json_responses.compress(body, encoding, app.config['COMPRESS_LEVEL'])
+            result_cache.add_variant(entry, encoding, compressed)
+        response.headers['Content-Encoding'] = encoding
+        body = compressed
+    
+    response.set_data(body)
+    return response
+
+FUZZY_KINDS = {
+    'courses': {'course_code', 'title'},
+    'locations': {'location'},
+    'all': None
+}
+
+def upgrade_schema():
+    """Apply columns and indexes added to existing models.
+
+    db.create_all() only creates missing tables, so an existing database never
+    picks up new columns or indexes on its own. New columns are added as
+    nullable; fill them in afterwards if they need values. Building a new
+    unique index deletes the duplicates it would reject, and says how many.
+    """
+    inspector = db.inspect(db.engine)
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                print(f"✅ Added column {table.name}.{column.name}")
+
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+
+                # Drop duplicate rows first, keeping the oldest of each, or the
+                # unique index can't be built; rows with a NULL in the key never conflict
+                if index.unique:
+                    columns = ', '.join(c.name for c in index.columns)
+                    not_null = ' AND '.join(f'{c.name} IS NOT NULL' for c in index.columns)
+                    removed = conn.execute(db.text(
+                        f'DELETE FROM {table.name} WHERE {not_null} AND id NOT IN '
+                        f'(SELECT MIN(id) FROM {table.name} WHERE {not_null} GROUP BY {columns})'
+                    )).rowcount
+                    if removed:
+                        print(f"⚠️  Removed {removed} duplicate {table.name} rows (same {columns}) "
+                              f"to build unique index {index.name}")
+                index.create(conn)
+                print(f"✅ Created index {index.name}")
+
+def backfill_event_times():
+    """Parse start and end times for events saved before the columns existed"""
+    rows = []
+    unparsed = db.session.query(Event.id, Event.date_time, Event.event_date, Event.event_time).filter(
+        Event.start_at.is_(None)
+    )
+    for event_id, date_time, event_date, event_time in unparsed:
+        start_at, end_at = event_times.parse_event_times(date_time, event_date, event_time)
+        if start_at is not None:
+            rows.append({'id': event_id, 'start_at': start_at, 'end_at': end_at})
+    if rows:
+        db.session.execute(db.update(Event), rows)
+        db.session.commit()
+        print(f"✅ Backfilled start/end times for {len(rows)} events")
+
+# Statuses listed by default; approved events that have ended move to
+# 'archived', pending ones stay in the moderation queue
+ACTIVE_EVENT_STATUSES = ('pending', 'approved')
+# Statuses listed by default for an explicit ?from=/?to= window, which may
+# well lie in the past
+WINDOW_EVENT_STATUSES = ACTIVE_EVENT_STATUSES + ('archived',)
+
+def archive_past_events(now=None):
+    """Mark approved events that have ended as archived; returns how many"""
+    archived = Event.query.filter(
+        Event.status == 'approved',
+        Event.end_at < (now or datetime.utcnow())
+    ).update({'status': 'archived'}, synchronize_session=False)
+    # The bulk update bumped the event table's version whether or not it
+    # matched anything; don't invalidate cached event lists for nothing
+    if archived:
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return archived
+
+_archiver_pid = None
+
+def start_event_archiver():
+    """Archive ended events every EVENT_ARCHIVE_INTERVAL seconds in a daemon thread.
+
+    Keeps the write off the request path. Archiving bumps the event table's
+    version, so cached lists still showing those events are recomputed.
+    Runs at most once per process; workers racing to archive the same events
+    are harmless, since the loser matches nothing and rolls back.
+    """
+    global _archiver_pid
+    interval = app.config['EVENT_ARCHIVE_INTERVAL']
+    if interval <= 0 or _archiver_pid == os.getpid():
+        return
+    _archiver_pid = os.getpid()
+
+    def archive_forever():
+        while True:
+            try:
+                with app.app_context():
+                    archive_past_events()
+            except Exception as e:
+                app.logger.warning(f"⚠️  Archiving past events failed: {e}")
+            time.sleep(interval)
+
+    Thread(target=archive_forever, name='event-archiver', daemon=True).start()
+
+def filter_events(query, args):
+    """Apply ?status=, ?from=, ?to= and ?upcoming= to an Event query, ordered by start.
+
+    Without ?status=, a from/to window also lists archived events;
+    ?status=all lists every status. Raises ValueError for a from/to that
+    isn't an ISO date or datetime.
+    """
+    statuses = [status for status in args.get('status', '').split(',') if status]
+    if not statuses:
+        statuses = WINDOW_EVENT_STATUSES if args.get('from') or args.get('to') else ACTIVE_EVENT_STATUSES
+    if 'all' not in statuses:
+        query = query.filter(Event.status.in_(statuses))
+    
+    # Events overlapping the window: ending after it opens, starting before it closes
+    if args.get('from'):
+        query = query.filter(Event.end_at >= event_times.parse_query_time(args['from']))
+    if args.get('to'):
+        query = query.filter(Event.start_at < event_times.parse_query_time(args['to'], end_of_day=True))
+    if args.get('upcoming') in ('1', 'true'):
+        query = query.filter(Event.end_at >= datetime.utcnow())
+    
+    return query.order_by(Event.start_at.asc().nulls_last(), Event.id)
+
+def _parse_id(value, message):
+    # bool is an int, but true isn't an id; nor is 1.5, which int() would truncate
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(message)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(message) from None
+
+def _batch_list(data, key):
+    items = data.get(key, [])
+    if not isinstance(items, list):
+        raise ValueError(f'{key} must be a list')
+    return items
+
+def parse_starred_items(data):
+    """Normalize a batch body's items into unique (item_type, item_id) pairs.
+
+    Raises ValueError, with a message fit for the client, for malformed items.
+    """
+    pairs = []
+    for item in _batch_list(data, 'items'):
+        if not isinstance(item, dict) or not item.get('item_type') or 'item_id' not in item:
+            raise ValueError('each item needs an item_type and an item_id')
+        if item['item_type'] not in STARRABLE_MODELS:
+            raise ValueError(f"item_type must be one of {', '.join(sorted(STARRABLE_MODELS))}")
+        pairs.append((item['item_type'], _parse_id(item['item_id'], 'item_id must be an integer')))
+    return list(dict.fromkeys(pairs))
+
+def parse_course_ids(data):
+    """A batch body's course_ids as unique ints; raises ValueError if malformed"""
+    return list(dict.fromkeys(_parse_id(course_id, 'course_ids must be integers') for course_id in _batch_list(data, 'course_ids')))
+
+def batch_request(parse):
+    """(user_id, parsed items, None) from the JSON body, or (None, None, 400 response)"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None, None, (jsonify({'error': 'JSON object body required'}), 400)
+    if not data.get('user_id'):
+        return None, None, (jsonify({'error': 'user_id required'}), 400)
+    try:
+        return _parse_id(data['user_id'], 'user_id must be an integer'), parse(data), None
+    except ValueError as e:
+        return None, None, (jsonify({'error': str(e)}), 400)
+
+def wants_normalized():
+    """?shape=normalized: related rows by id, listed once in side tables"""
+    return request.args.get('shape') == 'normalized'
+
+def serialize_rows(rows, fields):
+    """Serialize rows in the requested shape, trimmed to ?fields= if given"""
+    if wants_normalized():
+        dicts = [row.to_normalized_dict() for row in rows]
+    else:
+        dicts = [row.to_dict() for row in rows]
+    return [json_responses.pick_fields(d, fields) for d in dicts]
+
+def side_tables(rows):
+    """Locations and colleges the normalized rows reference, each serialized once"""
+    locations = {}
+    location_ids = {row.get('location_id') for row in rows} - {None}
+    if location_ids:
+        for location in Location.query.filter(Location.id.in_(location_ids)):
+            locations[location.id] = location.to_normalized_dict()
+    
+    colleges = {}
+    college_ids = {row.get('college_id') for row in chain(rows, locations.values())} - {None}
+    if college_ids:
+        for college in College.query.filter(College.id.in_(college_ids)):
+            colleges[college.id] = college.to_dict()
+    
+    return {'locations': locations, 'colleges': colleges}
+
 def send_email(to_email, subject, html_content):
     """Send an email using SMTP"""
+    # Only registration and password resets send mail, so load SMTP on first use
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    
     try:
         msg = MIMEMultipart('alternative')
         msg['Subject'] = subject
@@ -509,6 +1177,8 @@ def verify_reset_token(token):
         return jsonify({'error': 'Verification failed'}), 500
 
 @app.route('/api/v1/colleges')
+@max_queries(2)
+@cached_response('college')
 def get_colleges():
     try:
         return jsonify([c.to_dict() for c in College.query.all()])
@@ -517,10 +1187,18 @@ def get_colleges():
         return jsonify({'error': 'Failed to fetch colleges'}), 500
 
 @app.route('/api/v1/locations')
+@max_queries(3)
+@cached_response('location', 'college')
 def get_locations():
     try:
-        locations = Location.query.all()
-        return jsonify([l.to_dict() for l in locations])
+        fields = json_responses.parse_fields(request.args.get('fields'))
+        
+        if wants_normalized():
+            locations = serialize_rows(Location.query.all(), fields)
+            return jsonify({'locations': locations, 'colleges': side_tables(locations)['colleges']})
+        
+        locations = Location.query.options(*LOCATION_LOAD_OPTIONS).all()
+        return jsonify(serialize_rows(locations, fields))
     except Exception as e:
         print(f"❌ Get locations error: {e}")
         import traceback
@@ -528,33 +1206,105 @@ def get_locations():
         return jsonify({'error': 'Failed to fetch locations'}), 500
 
 @app.route('/api/v1/locations/<int:location_id>', methods=['GET'])
+@max_queries(4)
 def get_location_details(location_id):
     try:
-        location = Location.query.get_or_404(location_id)
+        location = db.session.get(Location, location_id, options=LOCATION_LOAD_OPTIONS) or abort(404)
         
         now = datetime.utcnow()
         posts = LocationPost.query.filter_by(location_id=location_id).all()
         
         active_posts = []
+        newly_expired = []
         for post in posts:
             if post.post_type == 'temporary' and post.expires_at and post.expires_at < now:
-                post.status = 'expired'
+                if post.status != 'expired':
+                    newly_expired.append(post.id)
                 continue
             
             if post.status == 'approved':
                 active_posts.append(post.to_dict())
         
-        db.session.commit()
-        
-        return jsonify({
+        # Serialize before committing: the commit expires every loaded object
+        result = {
             'location': location.to_dict(),
             'posts': active_posts
-        })
+        }
+        if newly_expired:
+            # One UPDATE for all of them rather than one per post at flush
+            LocationPost.query.filter(LocationPost.id.in_(newly_expired)).update(
+                {'status': 'expired'}, synchronize_session=False
+            )
+            db.session.commit()
+        
+        return jsonify(result)
     except Exception as e:
         print(f"❌ Get location details error: {e}")
         return jsonify({'error': 'Failed to fetch location'}), 500
 
+@app.route('/api/v1/locations/at', methods=['GET'])
+@max_queries(4)
+def locate_building():
+    """The building containing ?lat=&lon=, else the nearest one within ?radius= meters"""
+    try:
+        lat = request.args.get('lat', type=float)
+        lon = request.args.get('lon', type=float)
+        if lat is None or lon is None:
+            return jsonify({'error': 'lat and lon are required'}), 400
+        radius = min(request.args.get('radius', NEAREST_RADIUS, type=float), MAX_NEAREST_RADIUS)
+        
+        located = building_index.get().locate(lat, lon, radius)
+        location = None
+        if located is not None:
+            location = db.session.get(Location, located.location_id, options=LOCATION_LOAD_OPTIONS)
+        # The index can trail a just-deleted location by a moment
+        if location is None:
+            return jsonify({'location': None, 'inside': False, 'distance_m': None})
+        
+        return jsonify({'location': location.to_dict(), **located.to_dict()})
+    except Exception as e:
+        print(f"❌ Locate building error: {e}")
+        return jsonify({'error': 'Failed to locate building'}), 500
+
+@app.route('/api/v1/footprints', methods=['GET'])
+@max_queries(1)
+def get_footprints():
+    """Outlines of buildings in ?bbox=west,south,east,north, simplified for ?zoom=.
+
+    Outlines are encoded polylines (precision 6); without a zoom, or zoomed
+    in past the last simplified level, they are full resolution.
+    """
+    try:
+        try:
+            west, south, east, north = (float(value) for value in request.args.get('bbox', '').split(','))
+        except ValueError:
+            return jsonify({'error': 'bbox must be west,south,east,north'}), 400
+        if west > east or south > north:
+            return jsonify({'error': 'bbox must be west,south,east,north'}), 400
+        
+        zoom = request.args.get('zoom', type=int)
+        level = geo.footprint_level(zoom) if zoom is not None else None
+        outline = BuildingFootprint.outline if level is None else getattr(BuildingFootprint, f'outline_z{level}')
+        
+        rows = db.session.query(BuildingFootprint.location_id, outline).filter(
+            BuildingFootprint.min_lat <= north,
+            BuildingFootprint.max_lat >= south,
+            BuildingFootprint.min_lon <= east,
+            BuildingFootprint.max_lon >= west,
+            outline.isnot(None)
+        )
+        
+        return jsonify({
+            'zoom': zoom,
+            'precision': geo.POLYLINE_PRECISION,
+            'footprints': [{'location_id': location_id, 'outline': encoded} for location_id, encoded in rows]
+        })
+    except Exception as e:
+        print(f"❌ Get footprints error: {e}")
+        return jsonify({'error': 'Failed to fetch footprints'}), 500
+
 @app.route('/api/v1/locations/<int:location_id>/posts', methods=['POST'])
+@max_queries(3)
 def create_location_post(location_id):
     try:
         data = request.json
@@ -586,6 +1336,7 @@ def create_location_post(location_id):
         return jsonify({'error': 'Failed to create post'}), 500
 
 @app.route('/api/v1/posts/pending', methods=['GET'])
+@max_queries(1)
 def get_pending_posts():
     try:
         pending = LocationPost.query.filter_by(post_type='permanent', status='pending').all()
@@ -617,10 +1368,29 @@ def delete_post(post_id):
         return jsonify({'error': 'Failed to delete post'}), 500
 
 @app.route('/api/v1/events')
+@max_queries(4)
+@cached_response('event', 'location', 'college')
 def get_events():
+    """Pending and approved events by start time, or ?status= (comma-separated, or all).
+
+    ?from= and ?to= (ISO dates or datetimes, campus time unless they carry
+    an offset) keep events overlapping that window, archived ones included
+    unless ?status= says otherwise; ?upcoming=1 keeps events that haven't
+    ended yet.
+    """
     try:
-        events = Event.query.all()
-        return jsonify([e.to_dict() for e in events])
+        fields = json_responses.parse_fields(request.args.get('fields'))
+        try:
+            query = filter_events(Event.query, request.args)
+        except ValueError:
+            return jsonify({'error': 'from and to must be ISO dates or datetimes'}), 400
+        
+        if wants_normalized():
+            events = serialize_rows(query.all(), fields)
+            return jsonify({'events': events, **side_tables(events)})
+        
+        events = query.options(*EVENT_LOAD_OPTIONS).all()
+        return jsonify(serialize_rows(events, fields))
     except Exception as e:
         print(f"❌ Get events error: {e}")
         import traceback
@@ -628,15 +1398,28 @@ def get_events():
         return jsonify({'error': 'Failed to fetch events'}), 500
 
 @app.route('/api/v1/events', methods=['POST'])
+@max_queries(5)
 def create_event():
     try:
         data = request.json
+        # Explicit times win; otherwise they're parsed from the strings on insert
+        try:
+            start_at, end_at = (
+                event_times.parse_query_time(data[key]) if data.get(key) else None for key in ('start_at', 'end_at')
+            )
+        except ValueError:
+            return jsonify({'error': 'start_at and end_at must be ISO datetimes'}), 400
+        if start_at and end_at and end_at < start_at:
+            return jsonify({'error': 'end_at must not be before start_at'}), 400
+        
         event = Event(
             title=data['title'],
             event_type=data['event_type'],
             date_time=data.get('date_time', ''),
             event_date=data.get('event_date'),
             event_time=data.get('event_time'),
+            start_at=start_at,
+            end_at=end_at,
             location_id=data.get('location_id'),
             description=data.get('description'),
             status=data.get('status', 'pending'),
@@ -650,6 +1433,7 @@ def create_event():
         return jsonify({'error': 'Failed to create event'}), 500
 
 @app.route('/api/v1/starred', methods=['GET'])
+@max_queries(4)
 def get_starred():
     try:
         user_id = request.args.get('user_id')
@@ -657,37 +1441,102 @@ def get_starred():
             return jsonify([])
         
         starred = StarredItem.query.filter_by(user_id=user_id).all()
-        return jsonify([s.to_dict() for s in starred])
+        results = [s.to_dict() for s in starred]
+        
+        # ?hydrate=1 resolves each star to its full item, one query per item_type
+        if request.args.get('hydrate') in ('1', 'true'):
+            ids_by_type = defaultdict(set)
+            for s in starred:
+                ids_by_type[s.item_type].add(s.item_id)
+            
+            resolved = {}
+            for item_type, ids in ids_by_type.items():
+                if item_type not in STARRABLE_MODELS:
+                    continue
+                model, options = STARRABLE_MODELS[item_type]
+                items = model.query.options(*options).filter(model.id.in_(ids)).all()
+                resolved[item_type] = {item.id: item.to_dict() for item in items}
+            
+            for result in results:
+                result['item'] = resolved.get(result['item_type'], {}).get(result['item_id'])
+        
+        return jsonify(results)
     except Exception as e:
         print(f"❌ Get starred error: {e}")
         return jsonify({'error': 'Failed to fetch starred items'}), 500
 
 @app.route('/api/v1/starred', methods=['POST'])
+@max_queries(2)
 def add_starred():
     try:
         data = request.json
         
-        existing = StarredItem.query.filter_by(
-            user_id=data['user_id'],
-            item_type=data['item_type'],
-            item_id=data['item_id']
-        ).first()
-        
-        if existing:
-            return jsonify({'message': 'Already starred'}), 200
-        
         starred = StarredItem(
             user_id=data['user_id'],
             item_type=data['item_type'],
             item_id=data['item_id']
         )
-        db.session.add(starred)
+        
+        # The unique index does the existence check in the same statement
+        starred.id = db.session.execute(
+            insert_ignore(StarredItem)
+            .values(user_id=starred.user_id, item_type=starred.item_type, item_id=starred.item_id)
+            .returning(StarredItem.id)
+        ).scalar()
         db.session.commit()
+        
+        if starred.id is None:
+            return jsonify({'message': 'Already starred'}), 200
+        
         return jsonify(starred.to_dict()), 201
     except Exception as e:
         print(f"❌ Add starred error: {e}")
         return jsonify({'error': 'Failed to star item'}), 500
 
+@app.route('/api/v1/starred/batch', methods=['POST'])
+@max_queries(3)
+def add_starred_batch():
+    try:
+        user_id, pairs, error = batch_request(parse_starred_items)
+        if error:
+            return error
+        
+        if pairs:
+            db.session.execute(insert_ignore(StarredItem), [
+                {'user_id': user_id, 'item_type': item_type, 'item_id': item_id}
+                for item_type, item_id in pairs
+            ])
+            db.session.commit()
+        
+        starred = StarredItem.query.filter_by(user_id=user_id).all()
+        return jsonify([s.to_dict() for s in starred]), 200
+    except Exception as e:
+        print(f"❌ Add starred batch error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to star items'}), 500
+
+@app.route('/api/v1/starred/batch', methods=['DELETE'])
+@max_queries(2)
+def remove_starred_batch():
+    try:
+        user_id, pairs, error = batch_request(parse_starred_items)
+        if error:
+            return error
+        
+        removed = 0
+        if pairs:
+            removed = StarredItem.query.filter(
+                StarredItem.user_id == user_id,
+                db.tuple_(StarredItem.item_type, StarredItem.item_id).in_(pairs)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        
+        return jsonify({'message': 'Unstarred', 'removed': removed}), 200
+    except Exception as e:
+        print(f"❌ Remove starred batch error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to unstar items'}), 500
+
 @app.route('/api/v1/starred/<int:starred_id>', methods=['DELETE'])
 def remove_starred(starred_id):
     try:
@@ -726,6 +1575,8 @@ def delete_event(event_id):
         return jsonify({'error': 'Failed to delete event'}), 500
 
 @app.route('/api/v1/courses', methods=['GET'])
+@max_queries(6)
+@cached_response('course', 'college', 'location')
 def get_courses():
     try:
         college = request.args.get('college')
@@ -752,26 +1603,90 @@ def get_courses():
                 )
             )
         
+        fields = json_responses.parse_fields(request.args.get('fields'))
+        if not wants_normalized():
+            query = query.options(*COURSE_LOAD_OPTIONS)
         courses = query.all()
         
-        return jsonify({
-            'courses': [c.to_dict() for c in courses],
+        response = {
+            'courses': serialize_rows(courses, fields),
             'total': len(courses),
             'semester': semester
-        })
+        }
+        if wants_normalized():
+            response.update(side_tables(response['courses']))
+        
+        # Nothing matched: offer typo corrections instead of an empty list
+        if search and not courses:
+            response['did_you_mean'] = [
+                s.to_dict() for s in fuzzy_index.get().search(search, 5, FUZZY_KINDS['courses'])
+            ]
+        
+        return jsonify(response)
     except Exception as e:
         print(f"❌ Get courses error: {e}")
         return jsonify({'error': 'Failed to fetch courses'}), 500
 
 
+@app.route('/api/v1/autocomplete', methods=['GET'])
+@max_queries(3)
+def autocomplete():
+    """Typeahead suggestions across course codes, titles, instructors and buildings"""
+    try:
+        q = request.args.get('q', '')
+        limit = min(request.args.get('limit', 10, type=int), MAX_SUGGESTIONS)
+        
+        suggestions = autocomplete_index.get().search(q, limit)
+        
+        return jsonify({
+            'query': q,
+            'suggestions': [s.to_dict() for s in suggestions]
+        })
+    except Exception as e:
+        print(f"❌ Autocomplete error: {e}")
+        return jsonify({'error': 'Failed to fetch suggestions'}), 500
+
+
+@app.route('/api/v1/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters and memory use of the response cache"""
+    stats = result_cache.stats()
+    stats['shared'] = shared_cache.stats() if shared_cache is not None else None
+    return jsonify(stats)
+
+
+@app.route('/api/v1/search/fuzzy', methods=['GET'])
+@max_queries(3)
+def fuzzy_search():
+    """Typo-tolerant matches for building names and course titles/codes"""
+    try:
+        q = request.args.get('q', '')
+        search_type = request.args.get('type', 'all')
+        limit = min(request.args.get('limit', 10, type=int), MAX_SUGGESTIONS)
+        
+        if search_type not in FUZZY_KINDS:
+            return jsonify({'error': 'type must be courses, locations or all'}), 400
+        
+        results = fuzzy_index.get().search(q, limit, FUZZY_KINDS[search_type])
+        
+        return jsonify({
+            'query': q,
+            'results': [r.to_dict() for r in results]
+        })
+    except Exception as e:
+        print(f"❌ Fuzzy search error: {e}")
+        return jsonify({'error': 'Failed to search'}), 500
+
+
 @app.route('/api/v1/user/courses', methods=['GET'])
+@max_queries(1)
 def get_user_courses():
     try:
         user_id = request.args.get('user_id')
         if not user_id:
             return jsonify({'error': 'user_id required'}), 400
         
-        user_courses = UserCourse.query.filter_by(user_id=user_id).all()
+        user_courses = UserCourse.query.options(*USER_COURSE_LOAD_OPTIONS).filter_by(user_id=user_id).all()
         return jsonify([uc.to_dict() for uc in user_courses])
     except Exception as e:
         print(f"❌ Get user courses error: {e}")
@@ -779,6 +1694,7 @@ def get_user_courses():
 
 
 @app.route('/api/v1/user/courses', methods=['POST'])
+@max_queries(3)
 def add_user_course():
     try:
         data = request.json
@@ -788,24 +1704,68 @@ def add_user_course():
         if not user_id or not course_id:
             return jsonify({'error': 'user_id and course_id required'}), 400
         
-        existing = UserCourse.query.filter_by(
-            user_id=user_id,
-            course_id=course_id
-        ).first()
+        user_course_id = db.session.execute(
+            insert_ignore(UserCourse)
+            .values(user_id=user_id, course_id=course_id)
+            .returning(UserCourse.id)
+        ).scalar()
+        db.session.commit()
         
-        if existing:
+        if user_course_id is None:
             return jsonify({'message': 'Already enrolled in this course'}), 200
         
-        user_course = UserCourse(user_id=user_id, course_id=course_id)
-        db.session.add(user_course)
-        db.session.commit()
-        
+        user_course = db.session.get(UserCourse, user_course_id, options=USER_COURSE_LOAD_OPTIONS)
         return jsonify(user_course.to_dict()), 201
     except Exception as e:
         print(f"❌ Add user course error: {e}")
         return jsonify({'error': 'Failed to add course'}), 500
 
 
+@app.route('/api/v1/user/courses/batch', methods=['POST'])
+@max_queries(3)
+def add_user_courses_batch():
+    try:
+        user_id, course_ids, error = batch_request(parse_course_ids)
+        if error:
+            return error
+        
+        if course_ids:
+            db.session.execute(insert_ignore(UserCourse), [
+                {'user_id': user_id, 'course_id': course_id} for course_id in course_ids
+            ])
+            db.session.commit()
+        
+        user_courses = UserCourse.query.options(*USER_COURSE_LOAD_OPTIONS).filter_by(user_id=user_id).all()
+        return jsonify([uc.to_dict() for uc in user_courses]), 200
+    except Exception as e:
+        print(f"❌ Add user courses batch error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to add courses'}), 500
+
+
+@app.route('/api/v1/user/courses/batch', methods=['DELETE'])
+@max_queries(2)
+def remove_user_courses_batch():
+    try:
+        user_id, course_ids, error = batch_request(parse_course_ids)
+        if error:
+            return error
+        
+        removed = 0
+        if course_ids:
+            removed = UserCourse.query.filter(
+                UserCourse.user_id == user_id,
+                UserCourse.course_id.in_(course_ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        
+        return jsonify({'message': 'Courses removed from schedule', 'removed': removed}), 200
+    except Exception as e:
+        print(f"❌ Remove user courses batch error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to remove courses'}), 500
+
+
 @app.route('/api/v1/user/courses/<int:user_course_id>', methods=['DELETE'])
 def remove_user_course(user_course_id):
     try:
@@ -818,38 +1778,49 @@ def remove_user_course(user_course_id):
         return jsonify({'error': 'Failed to remove course'}), 500
 
 @app.route('/api/v1/courses/<int:course_id>', methods=['GET'])
+@max_queries(4)
 def get_course_detail(course_id):
     """Get detailed info about a specific course including posts"""
     try:
-        course = Course.query.get_or_404(course_id)
+        course = db.session.get(Course, course_id, options=COURSE_LOAD_OPTIONS) or abort(404)
         
         # Get active posts
         now = datetime.utcnow()
         posts = CoursePost.query.filter_by(course_id=course_id).all()
         
         active_posts = []
+        newly_expired = []
         for post in posts:
             # Expire old temporary posts
             if post.post_type == 'temporary' and post.expires_at and post.expires_at < now:
-                post.status = 'expired'
+                if post.status != 'expired':
+                    newly_expired.append(post.id)
                 continue
             
             # Only show approved posts
             if post.status == 'approved':
                 active_posts.append(post.to_dict())
         
-        db.session.commit()
-        
-        return jsonify({
+        # Serialize before committing: the commit expires every loaded object
+        result = {
             'course': course.to_dict(),
             'posts': active_posts
-        })
+        }
+        if newly_expired:
+            # One UPDATE for all of them rather than one per post at flush
+            CoursePost.query.filter(CoursePost.id.in_(newly_expired)).update(
+                {'status': 'expired'}, synchronize_session=False
+            )
+            db.session.commit()
+        
+        return jsonify(result)
     except Exception as e:
         print(f"❌ Get course detail error: {e}")
         return jsonify({'error': 'Failed to fetch course'}), 500
 
 
 @app.route('/api/v1/courses/<int:course_id>/posts', methods=['POST'])
+@max_queries(3)
 def create_course_post(course_id):
     """Create a post/review about a course"""
     try:
@@ -885,6 +1856,7 @@ def create_course_post(course_id):
 
 
 @app.route('/api/v1/course-posts/pending', methods=['GET'])
+@max_queries(1)
 def get_pending_course_posts():
     """Get pending course posts for admin approval"""
     try:
@@ -921,194 +1893,291 @@ def delete_course_post(post_id):
         return jsonify({'error': 'Failed to delete post'}), 500
     
 @app.route('/api/v1/departments', methods=['GET'])
+@max_queries(2)
+@cached_response('department', 'college')
 def get_departments():
     try:
-        departments = Department.query.all()
+        departments = Department.query.options(*DEPARTMENT_LOAD_OPTIONS).all()
         return jsonify([d.to_dict() for d in departments])
     except Exception as e:
         print(f"❌ Get departments error: {e}")
         return jsonify({'error': 'Failed to fetch departments'}), 500
 
-# Initialize database when module loads (works with gunicorn)
-with app.app_context():
-    db.create_all()
-    print("✅ Database tables created")
+def seed_database():
+    """Load the sample colleges, locations, events and courses into an empty database.
+
+    Returns False without touching anything if colleges already exist.
+    """
+    if College.query.count() > 0:
+        return False
     
-    # Check if already initialized
-    if College.query.count() == 0:
-        print("🔄 Initializing database with sample data...")
+    print("🔄 Initializing database with sample data...")
+
+    # Create admin user
+    admin = User(
+        username='admin',
+        password_hash=hash_password('admin123'),
+        name='Admin User',
+        email='admin@chizu.app',
+        role='admin',
+        college='Pomona College'
+    )
+    db.session.add(admin)
     
-        # Create admin user
-        admin = User(
-            username='admin',
-            password_hash=hash_password('admin123'),
-            name='Admin User',
-            email='admin@chizu.app',
-            role='admin',
-            college='Pomona College'
-        )
-        db.session.add(admin)
-        
-        # Create student user
-        student = User(
-            username='student',
-            password_hash=hash_password('student123'),
-            name='Demo Student',
-            email='student@chizu.app',
-            role='student',
-            college='Claremont McKenna College'
-        )
-        db.session.add(student)
-        
-        # Create colleges
-        colleges = [
-            College(name="Pomona College", code="PO"),
-            College(name="Claremont McKenna College", code="CMC"),
-            College(name="Scripps College", code="SC"),
-            College(name="Harvey Mudd College", code="HMC"),
-            College(name="Pitzer College", code="PZ")
-        ]
-        
-        for c in colleges:
-            db.session.add(c)
-        db.session.commit()
-        
-        # Create locations
-        locations = [
-            Location(name="Frank Dining Hall", latitude=34.0975, longitude=-117.7080, category="dining", college_id=1, 
-                    description="Main dining hall at Pomona College", 
-                    fun_facts='["Open 7am-9pm daily", "Has vegan options", "Great breakfast burritos"]'),
-            Location(name="Frary Dining Hall", latitude=34.0970, longitude=-117.7075, category="dining", college_id=1,
-                    description="Historic dining hall with beautiful architecture", 
-                    fun_facts='["Built in 1929", "Features murals by Jose Clemente Orozco", "Known for themed dinners"]'),
-            Location(name="Collins Dining Hall", latitude=34.1018148, longitude=-117.709251, category="dining", college_id=2,
-                    description="CMC dining hall", 
-                    fun_facts='["Modern facility", "Wide variety of food stations"]'),
-            Location(name="Malott Commons", latitude=34.1018, longitude=-117.7055, category="dining", college_id=3,
-                    description="Scripps dining commons", 
-                    fun_facts='["Beautiful garden views", "Fresh salad bar"]'),
-            Location(name="Hoch-Shanahan Dining Commons", latitude=34.1055982, longitude=-117.7091323, category="dining", college_id=4,
-                    description="Harvey Mudd dining hall", 
-                    fun_facts='["Late night snacks available", "Popular study spot"]'),
-            Location(name="McConnell Dining Hall", latitude=34.102886, longitude=-117.7059549, category="dining", college_id=5,
-                    description="Pitzer dining hall", 
-                    fun_facts='["Sustainable food practices", "Vegetarian-friendly"]'),
-            Location(name="The Coop", latitude=34.0965, longitude=-117.7082, category="dining", college_id=1,
-                    description="Campus store and café", 
-                    fun_facts='["Quick snacks and drinks", "Student hangout spot"]'),
-            Location(name="Rains Center", latitude=34.0960, longitude=-117.7065, category="recreation", college_id=1,
-                    description="Athletic and recreation center at Pomona", 
-                    fun_facts='["Two basketball courts", "Indoor swimming pool", "Rock climbing wall", "Full fitness center with cardio and weights"]'),
-            Location(name="Ducey Gymnasium", latitude=34.0955, longitude=-117.7100, category="recreation", college_id=2,
-                    description="CMC athletic facility", 
-                    fun_facts='["Basketball courts", "Weight room", "Group fitness classes"]'),
-            Location(name="Voelkel Gym", latitude=34.1022, longitude=-117.7050, category="recreation", college_id=3,
-                    description="Scripps athletics center", 
-                    fun_facts='["Yoga studio", "Dance studio", "Outdoor pool"]'),
-            Location(name="Seaver North", latitude=34.0980, longitude=-117.7070, category="academic", college_id=1,
-                    description="Science building at Pomona", 
-                    fun_facts='["State-of-the-art science labs", "Research facilities"]'),
-            Location(name="Seaver South", latitude=34.0978, longitude=-117.7068, category="academic", college_id=1,
-                    description="Academic building", 
-                    fun_facts='["Lecture halls", "Study spaces"]'),
-            Location(name="Carnegie Hall", latitude=34.0968, longitude=-117.7077, category="academic", college_id=1,
-                    description="Humanities building", 
-                    fun_facts='["Beautiful historic architecture", "Language labs"]'),
-            Location(name="Kravis Center", latitude=34.0948, longitude=-117.7090, category="academic", college_id=2,
-                    description="CMC's main academic building", 
-                    fun_facts='["Modern classrooms", "Leadership institute"]'),
-            Location(name="Parsons Engineering", latitude=34.1065, longitude=-117.7092, category="academic", college_id=4,
-                    description="Harvey Mudd engineering building", 
-                    fun_facts='["Maker space", "Engineering labs", "Senior design projects"]'),
-            Location(name="Bridges Auditorium", latitude=34.0969, longitude=-117.7073, category="events", college_id=1,
-                    description="Large performance venue", 
-                    fun_facts='["Seats 2,500 people", "Hosts concerts and lectures", "Beautiful acoustics"]'),
-        ]
-        
-        for l in locations:
-            db.session.add(l)
-        db.session.commit()
-        
-        # Create sample events
-        events = [
-            Event(title="Welcome Week", event_type="fun", 
-                date_time="Oct 15, 2024 at 6:00 PM",
-                event_date="2024-10-15",
-                event_time="6:00 PM",
-                location_id=1, description="Welcome new students!", status="approved", created_by="admin"),
-            Event(title="Career Fair", event_type="career", 
-                date_time="Oct 20, 2024 at 2:00 PM",
-                event_date="2024-10-20",
-                event_time="2:00 PM",
-                location_id=16, description="Meet employers", status="approved", created_by="admin"),
-            Event(title="Movie Night", event_type="fun", 
-                date_time="Oct 25, 2024 at 8:00 PM",
-                event_date="2024-10-25",
-                event_time="8:00 PM",
-                location_id=16, description="Free popcorn!", status="pending", created_by="student"),
-        ]
-        
-        for e in events:
-            db.session.add(e)
-        db.session.commit()
-        
-        # Create departments (ADD THIS HERE - inside the if College.query.count() == 0 block)
-        print("🔄 Creating departments...")
-        departments_data = [
-            {'name': 'Computer Science', 'code': 'CSCI', 'college_id': 1},
-            {'name': 'Biology', 'code': 'BIOL', 'college_id': 1},
-            {'name': 'Mathematics', 'code': 'MATH', 'college_id': 1},
-            {'name': 'English', 'code': 'ENGL', 'college_id': 1},
-            {'name': 'History', 'code': 'HIST', 'college_id': 1},
-            {'name': 'Economics', 'code': 'ECON', 'college_id': 2},
-            {'name': 'Psychology', 'code': 'PSYC', 'college_id': 1},
-            {'name': 'Chemistry', 'code': 'CHEM', 'college_id': 1},
-            {'name': 'Physics', 'code': 'PHYS', 'college_id': 4},
-            {'name': 'African Studies', 'code': 'AFRI', 'college_id': 1},
-        ]
-        
-        for dept_data in departments_data:
-            dept = Department(**dept_data)
-            db.session.add(dept)
-        
-        db.session.commit()
-        print("✅ Departments created")
-        
-        # Create sample courses (ADD THIS HERE TOO)
-        print("🔄 Creating sample courses...")
-        sample_courses = [
-            Course(
-                course_code='CSCI051', section='01',
-                title='Introduction to Computer Science',
-                department_code='CSCI', college_id=1, location_id=11,
-                instructors='Prof. Smith', days='MWF', time='9:00AM-9:50AM',
-                seats_available='0/24 (Closed)', credit='1.00', semester='Fall 2024'
-            ),
-            Course(
-                course_code='BIOL044', section='01',
-                title='General Biology',
-                department_code='BIOL', college_id=1, location_id=12,
-                instructors='Prof. Johnson', days='TR', time='10:00AM-11:15AM',
-                seats_available='12/30 (Open)', credit='1.00', semester='Fall 2024'
-            ),
-            Course(
-                course_code='MATH058', section='01',
-                title='Calculus I',
-                department_code='MATH', college_id=1, location_id=13,
-                instructors='Prof. Williams', days='MWF', time='11:00AM-11:50AM',
-                seats_available='5/25 (Open)', credit='1.00', semester='Fall 2024'
-            ),
-        ]
-        
-        for course in sample_courses:
-            db.session.add(course)
-        
-        db.session.commit()
-        print("✅ Sample courses created")
-        
-        print(f"✅ Database initialized with {len(locations)} locations and {len(events)} events")
+    # Create student user
+    student = User(
+        username='student',
+        password_hash=hash_password('student123'),
+        name='Demo Student',
+        email='student@chizu.app',
+        role='student',
+        college='Claremont McKenna College'
+    )
+    db.session.add(student)
+    
+    # Create colleges
+    colleges = [
+        College(name="Pomona College", code="PO"),
+        College(name="Claremont McKenna College", code="CMC"),
+        College(name="Scripps College", code="SC"),
+        College(name="Harvey Mudd College", code="HMC"),
+        College(name="Pitzer College", code="PZ")
+    ]
+    
+    for c in colleges:
+        db.session.add(c)
+    db.session.commit()
+    
+    # Create locations
+    locations = [
+        Location(name="Frank Dining Hall", latitude=34.0975, longitude=-117.7080, category="dining", college_id=1, 
+                description="Main dining hall at Pomona College", 
+                fun_facts='["Open 7am-9pm daily", "Has vegan options", "Great breakfast burritos"]'),
+        Location(name="Frary Dining Hall", latitude=34.0970, longitude=-117.7075, category="dining", college_id=1,
+                description="Historic dining hall with beautiful architecture", 
+                fun_facts='["Built in 1929", "Features murals by Jose Clemente Orozco", "Known for themed dinners"]'),
+        Location(name="Collins Dining Hall", latitude=34.1018148, longitude=-117.709251, category="dining", college_id=2,
+                description="CMC dining hall", 
+                fun_facts='["Modern facility", "Wide variety of food stations"]'),
+        Location(name="Malott Commons", latitude=34.1018, longitude=-117.7055, category="dining", college_id=3,
+                description="Scripps dining commons", 
+                fun_facts='["Beautiful garden views", "Fresh salad bar"]'),
+        Location(name="Hoch-Shanahan Dining Commons", latitude=34.1055982, longitude=-117.7091323, category="dining", college_id=4,
+                description="Harvey Mudd dining hall", 
+                fun_facts='["Late night snacks available", "Popular study spot"]'),
+        Location(name="McConnell Dining Hall", latitude=34.102886, longitude=-117.7059549, category="dining", college_id=5,
+                description="Pitzer dining hall", 
+                fun_facts='["Sustainable food practices", "Vegetarian-friendly"]'),
+        Location(name="The Coop", latitude=34.0965, longitude=-117.7082, category="dining", college_id=1,
+                description="Campus store and café", 
+                fun_facts='["Quick snacks and drinks", "Student hangout spot"]'),
+        Location(name="Rains Center", latitude=34.0960, longitude=-117.7065, category="recreation", college_id=1,
+                description="Athletic and recreation center at Pomona", 
+                fun_facts='["Two basketball courts", "Indoor swimming pool", "Rock climbing wall", "Full fitness center with cardio and weights"]'),
+        Location(name="Ducey Gymnasium", latitude=34.0955, longitude=-117.7100, category="recreation", college_id=2,
+                description="CMC athletic facility", 
+                fun_facts='["Basketball courts", "Weight room", "Group fitness classes"]'),
+        Location(name="Voelkel Gym", latitude=34.1022, longitude=-117.7050, category="recreation", college_id=3,
+                description="Scripps athletics center", 
+                fun_facts='["Yoga studio", "Dance studio", "Outdoor pool"]'),
+        Location(name="Seaver North", latitude=34.0980, longitude=-117.7070, category="academic", college_id=1,
+                description="Science building at Pomona", 
+                fun_facts='["State-of-the-art science labs", "Research facilities"]'),
+        Location(name="Seaver South", latitude=34.0978, longitude=-117.7068, category="academic", college_id=1,
+                description="Academic building", 
+                fun_facts='["Lecture halls", "Study spaces"]'),
+        Location(name="Carnegie Hall", latitude=34.0968, longitude=-117.7077, category="academic", college_id=1,
+                description="Humanities building", 
+                fun_facts='["Beautiful historic architecture", "Language labs"]'),
+        Location(name="Kravis Center", latitude=34.0948, longitude=-117.7090, category="academic", college_id=2,
+                description="CMC's main academic building", 
+                fun_facts='["Modern classrooms", "Leadership institute"]'),
+        Location(name="Parsons Engineering", latitude=34.1065, longitude=-117.7092, category="academic", college_id=4,
+                description="Harvey Mudd engineering building", 
+                fun_facts='["Maker space", "Engineering labs", "Senior design projects"]'),
+        Location(name="Bridges Auditorium", latitude=34.0969, longitude=-117.7073, category="events", college_id=1,
+                description="Large performance venue", 
+                fun_facts='["Seats 2,500 people", "Hosts concerts and lectures", "Beautiful acoustics"]'),
+    ]
+    
+    for l in locations:
+        db.session.add(l)
+    db.session.commit()
+    
+    # Create sample events
+    events = [
+        Event(title="Welcome Week", event_type="fun", 
+            date_time="Oct 15, 2024 at 6:00 PM",
+            event_date="2024-10-15",
+            event_time="6:00 PM",
+            location_id=1, description="Welcome new students!", status="approved", created_by="admin"),
+        Event(title="Career Fair", event_type="career", 
+            date_time="Oct 20, 2024 at 2:00 PM",
+            event_date="2024-10-20",
+            event_time="2:00 PM",
+            location_id=16, description="Meet employers", status="approved", created_by="admin"),
+        Event(title="Movie Night", event_type="fun", 
+            date_time="Oct 25, 2024 at 8:00 PM",
+            event_date="2024-10-25",
+            event_time="8:00 PM",
+            location_id=16, description="Free popcorn!", status="pending", created_by="student"),
+    ]
+    
+    for e in events:
+        db.session.add(e)
+    db.session.commit()
+    
+    # Create departments (ADD THIS HERE - inside the if College.query.count() == 0 block)
+    print("🔄 Creating departments...")
+    departments_data = [
+        {'name': 'Computer Science', 'code': 'CSCI', 'college_id': 1},
+        {'name': 'Biology', 'code': 'BIOL', 'college_id': 1},
+        {'name': 'Mathematics', 'code': 'MATH', 'college_id': 1},
+        {'name': 'English', 'code': 'ENGL', 'college_id': 1},
+        {'name': 'History', 'code': 'HIST', 'college_id': 1},
+        {'name': 'Economics', 'code': 'ECON', 'college_id': 2},
+        {'name': 'Psychology', 'code': 'PSYC', 'college_id': 1},
+        {'name': 'Chemistry', 'code': 'CHEM', 'college_id': 1},
+        {'name': 'Physics', 'code': 'PHYS', 'college_id': 4},
+        {'name': 'African Studies', 'code': 'AFRI', 'college_id': 1},
+    ]
+    
+    for dept_data in departments_data:
+        dept = Department(**dept_data)
+        db.session.add(dept)
+    
+    db.session.commit()
+    print("✅ Departments created")
+    
+    # Create sample courses (ADD THIS HERE TOO)
+    print("🔄 Creating sample courses...")
+    sample_courses = [
+        Course(
+            course_code='CSCI051', section='01',
+            title='Introduction to Computer Science',
+            department_code='CSCI', college_id=1, location_id=11,
+            instructors='Prof. Smith', days='MWF', time='9:00AM-9:50AM',
+            seats_available='0/24 (Closed)', credit='1.00', semester='Fall 2024'
+        ),
+        Course(
+            course_code='BIOL044', section='01',
+            title='General Biology',
+            department_code='BIOL', college_id=1, location_id=12,
+            instructors='Prof. Johnson', days='TR', time='10:00AM-11:15AM',
+            seats_available='12/30 (Open)', credit='1.00', semester='Fall 2024'
+        ),
+        Course(
+            course_code='MATH058', section='01',
+            title='Calculus I',
+            department_code='MATH', college_id=1, location_id=13,
+            instructors='Prof. Williams', days='MWF', time='11:00AM-11:50AM',
+            seats_available='5/25 (Open)', credit='1.00', semester='Fall 2024'
+        ),
+    ]
+    
+    for course in sample_courses:
+        db.session.add(course)
+    
+    db.session.commit()
+    print("✅ Sample courses created")
+    
+    print(f"✅ Database initialized with {len(locations)} locations and {len(events)} events")
+    return True
+
+_database_ready = False
+
+def init_database():
+    """Hook up the engine and bring the schema up to date; enough for scripts"""
+    global _database_ready
+    if _database_ready:
+        return
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config)
+        metrics.instrument_engine(db.engine)
+        query_budget.init_app(app, db.engine)
+        db.create_all()
+        upgrade_schema()
+        backfill_event_times()
+    _database_ready = True
+
+_app_ready = False
+_app_setup_lock = Lock()
+
+def create_app(listen=True):
+    """The app ready to serve: database initialized and read-only state warmed.
+
+    Importing this module only defines the app, so scripts and CLI commands
+    start quickly. Sample data is loaded separately with
+    `flask --app app seed-db`. Under gunicorn's preload this runs once in the
+    master and workers inherit the warmed indexes copy-on-write; threads
+    don't survive that fork, so gunicorn.conf.py passes listen=False and
+    starts the listener and event archiver in each worker instead.
+    """
+    global _app_ready
+    init_database()
+    with app.app_context():
+        # Built on first use otherwise, i.e. in every worker's first search
+        autocomplete_index.get()
+        fuzzy_index.get()
+        building_index.get()
+    if listen:
+        start_invalidation_listener()
+        start_event_archiver()
+    _app_ready = True
+    return app
+
+class _CreateAppOnFirstRequest:
+    """WSGI wrapper that runs create_app() before the first request if nothing did.
+
+    Deploys serving the module-level app directly (`gunicorn app:app`) never
+    call create_app(); without this they'd serve with no schema, pragmas or
+    metrics. The check is a flag read once set up.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if not _app_ready:
+            with _app_setup_lock:
+                if not _app_ready:
+                    # Scripts call init_database() themselves; only a server is worth warning about
+                    if not _database_ready:
+                        app.logger.warning("⚠️  Serving without create_app(); setting up on the first request. "
+                                           "Use gunicorn -c gunicorn.conf.py to set up once before forking.")
+                    create_app()
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = _CreateAppOnFirstRequest(app.wsgi_app)
+
+def init_worker():
+    """Per-process setup after a fork from a preloaded master"""
+    with app.app_context():
+        # Pooled connections opened in the master must not be shared
+        db.engine.dispose(close=False)
+    start_invalidation_listener()
+    start_event_archiver()
+
+@app.cli.command('seed-db')
+def seed_db_command():
+    """Create the schema and load sample data into an empty database."""
+    init_database()
+    if seed_database():
+        print("✅ Database seeded")
+    else:
+        print("✅ Database already has data, nothing to seed")
+
+@app.cli.command('archive-events')
+def archive_events_command():
+    """Archive approved events that have ended."""
+    init_database()
+    with app.app_context():
+        print(f"✅ Archived {archive_past_events()} ended events")
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
+    create_app()
+    with app.app_context():
+        seed_database()
     print(f"🚀 Starting Chizu backend on port {port}")
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Benchmark PrefixIndex typeahead latency on the scraped catalog
+Run from backend/: python -m benchmarks.bench_autocomplete
+"""
+
+import json
+import os
+import random
+import time
+
+from search_index import PrefixIndex
+
+COURSES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'courses_data.json')
+QUERIES = 20000
+
+
+def catalog_entries(courses, copies):
+    entries = []
+    for copy in range(copies):
+        for n, course in enumerate(courses):
+            course_id = copy * len(courses) + n
+            suffix = f' {copy}' if copy else ''
+            entries.append(('course_code', course['course_code'] + suffix, course_id))
+            entries.append(('title', course['title'] + suffix, course_id))
+            entries.append(('instructor', course['instructors'], None))
+            if course['building']:
+                entries.append(('location', course['building'], None))
+    return entries
+
+
+def typed_prefixes(courses, rng):
+    """What a user types: 1-8 leading characters of a real title, code or name"""
+    prefixes = []
+    for _ in range(QUERIES):
+        course = rng.choice(courses)
+        text = rng.choice([course['title'], course['course_code'], course['instructors']]) or 'a'
+        prefixes.append(text[:rng.randint(1, 8)])
+    return prefixes
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+if __name__ == '__main__':
+    with open(COURSES_FILE) as f:
+        courses = json.load(f)
+
+    rng = random.Random(0)
+    queries = typed_prefixes(courses, rng)
+
+    print(f"{'courses':>8} {'suggestions':>11} {'build s':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    for copies in (1, 10, 50):
+        start = time.perf_counter()
+        index = PrefixIndex(catalog_entries(courses, copies))
+        build = time.perf_counter() - start
+
+        samples = []
+        for q in queries:
+            start = time.perf_counter()
+            index.search(q, 10)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+
+        print(f"{len(courses) * copies:>8} {len(index):>11} {build:>8.2f} "
+              f"{percentile(samples, 0.5):>7.3f} {percentile(samples, 0.99):>7.3f} {samples[-1]:>7.3f}")
@@ -0,0 +1,116 @@
+"""
+Cold start: import time, gunicorn time-to-first-response and worker memory,
+with every worker initializing itself vs the preloaded gunicorn.conf.py.
+Run from backend/: python -m benchmarks.bench_cold_start [--workers 4]
+
+Uses DATABASE_URL when set (point it at a generate_data.py database for
+realistic index sizes), otherwise generates a mid-sized one. Memory is
+proportional set size from /proc, so it needs Linux.
+"""
+
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.loadtest import BACKEND_DIR, free_port
+
+IMPORT_RUNS = 5
+SEARCH_PATH = '/api/v1/autocomplete?q=intro'
+# Enough searches that every worker has served some
+WARM_REQUESTS = 50
+SCALE = ['--users', '2000', '--locations', '500', '--courses', '20000', '--location-posts', '20000',
+         '--course-posts', '20000', '--events', '2000']
+
+MODES = {
+    'per worker': lambda workers: ['-w', str(workers), 'app:create_app()'],
+    'preload': lambda workers: ['-c', 'gunicorn.conf.py', '-w', str(workers)],
+}
+
+
+def seconds(command, env):
+    start = time.perf_counter()
+    subprocess.run(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def import_seconds(env):
+    """Median time to import app, minus a bare interpreter's startup"""
+    bare = statistics.median(seconds([sys.executable, '-c', 'pass'], env) for _ in range(IMPORT_RUNS))
+    full = statistics.median(seconds([sys.executable, '-c', 'import app'], env) for _ in range(IMPORT_RUNS))
+    return full - bare
+
+
+def get(port, path):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request('GET', path)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def pss_kib(pid):
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+    return 0
+
+
+def worker_pids(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure(args, env):
+    """(seconds until the first answer, first search ms, master plus workers PSS MiB)"""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-b', f'127.0.0.1:{port}'] + args,
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if server.poll() is not None:
+                raise SystemExit(f"❌ gunicorn exited with status {server.returncode}")
+            try:
+                if get(port, '/') == 200:
+                    break
+            except OSError:
+                time.sleep(0.01)
+        ready = time.perf_counter() - start
+
+        search_start = time.perf_counter()
+        get(port, SEARCH_PATH)
+        first_search = (time.perf_counter() - search_start) * 1000
+
+        for _ in range(WARM_REQUESTS):
+            get(port, SEARCH_PATH)
+        memory = sum(pss_kib(pid) for pid in [server.pid] + worker_pids(server.pid)) / 1024
+        return ready, first_search, memory
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if 'DATABASE_URL' not in env:
+        env['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'cold_start.db')
+        print("🏗️  Generating a database to start against...")
+        subprocess.run([sys.executable, 'generate_data.py'] + SCALE, cwd=BACKEND_DIR, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+
+    print(f"import app: {import_seconds(env) * 1000:.0f} ms")
+    print(f"\n{args.workers} workers")
+    print(f"{'mode':>10} {'ready s':>8} {'first search ms':>16} {'total PSS MiB':>14}")
+    for name, mode_args in MODES.items():
+        ready, first_search, memory = measure(mode_args(args.workers), env)
+        print(f"{name:>10} {ready:>8.2f} {first_search:>16.1f} {memory:>14.1f}")
@@ -0,0 +1,135 @@
+"""
+Read/write contention across worker processes sharing one SQLite file, the
+way several gunicorn sync workers do. Each process runs a mix of location
+reads, event list reads, post creation and event creation, and the run is
+repeated for the pre-WAL settings and the default engine profile.
+Run from backend/: python -m benchmarks.bench_contention
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.bench_autocomplete import percentile
+
+WORKERS = 8
+DURATION = 5.0
+
+# What app.py effectively ran with before db.py: rollback journal, full
+# fsync, small page cache and the driver's default 5 s lock wait
+PROFILES = {
+    'legacy': {
+        'SQLITE_JOURNAL_MODE': 'delete',
+        'SQLITE_SYNCHRONOUS': 'full',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE': '-2000',
+        'SQLITE_BUSY_TIMEOUT_MS': '5000',
+    },
+    'tuned': {},
+}
+
+# (operation, share of requests)
+MIX = [('read_location', 0.55), ('read_events', 0.25), ('create_post', 0.1), ('create_event', 0.1)]
+
+
+def import_app(database_url, profile):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.update(profile)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        app.init_database()
+        with app.app.app_context():
+            app.seed_database()
+    return app
+
+
+def seed(database_url, profile):
+    import_app(database_url, profile)
+
+
+def run_operation(client, operation, rng, location_ids):
+    location_id = rng.choice(location_ids)
+    if operation == 'read_location':
+        return client.get(f'/api/v1/locations/{location_id}')
+    if operation == 'read_events':
+        return client.get('/api/v1/events')
+    if operation == 'create_post':
+        return client.post(f'/api/v1/locations/{location_id}/posts', json={'content': 'Line out the door'})
+    return client.post('/api/v1/events', json={
+        'title': 'Study group', 'event_type': 'academic', 'location_id': location_id
+    })
+
+
+def worker(number, database_url, profile, barrier, results):
+    app = import_app(database_url, profile)
+    with app.app.app_context():
+        location_ids = [location_id for location_id, in app.db.session.query(app.Location.id)]
+    client = app.app.test_client()
+    rng = random.Random(number)
+    operations, weights = zip(*MIX)
+
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    barrier.wait()
+    deadline = time.perf_counter() + DURATION
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            start = time.perf_counter()
+            response = run_operation(client, operation, rng, location_ids)
+            samples[operation].append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors[operation] += 1
+    results.put((dict(samples), dict(errors)))
+
+
+def run_profile(profile):
+    database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'contention.db')
+    context = multiprocessing.get_context('spawn')
+
+    # Create and seed the file once so workers don't race on it
+    setup = context.Process(target=seed, args=(database_url, profile))
+    setup.start()
+    setup.join()
+
+    barrier = context.Barrier(WORKERS)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(n, database_url, profile, barrier, results))
+        for n in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    for _ in processes:
+        worker_samples, worker_errors = results.get()
+        for operation, values in worker_samples.items():
+            samples[operation].extend(values)
+        for operation, count in worker_errors.items():
+            errors[operation] += count
+    for process in processes:
+        process.join()
+    return samples, errors
+
+
+if __name__ == '__main__':
+    print(f"{WORKERS} processes, {DURATION:.0f} s per profile")
+    print(f"{'profile':>8} {'operation':>14} {'requests':>9} {'req/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, profile in PROFILES.items():
+        samples, errors = run_profile(profile)
+        every = sorted(value for values in samples.values() for value in values)
+        rows = [(operation, sorted(samples[operation])) for operation, _ in MIX] + [('all', every)]
+        for operation, values in rows:
+            if not values:
+                continue
+            failed = sum(errors.values()) if operation == 'all' else errors.get(operation, 0)
+            print(f"{name:>8} {operation:>14} {len(values):>9} {len(values) / DURATION:>7.0f} "
+                  f"{percentile(values, 0.5):>8.2f} {percentile(values, 0.99):>8.2f} "
+                  f"{failed / len(values):>7.2%}")
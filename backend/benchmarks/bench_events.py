@@ -0,0 +1,103 @@
+"""
+Benchmark event window queries: generated events (half past, half upcoming),
+asked for a week's window and for what's upcoming, through the indexed
+start_at/end_at columns in SQL against the old way of loading every event
+and parsing its date strings in Python. Checks both pick the same events,
+then archives the past approved ones and times the default /api/v1/events
+list before and after.
+Run from backend/: python -m benchmarks.bench_events
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import event_times
+
+EVENTS = 50000
+NOW = datetime(2024, 10, 15, 12)
+REPEATS = 5
+
+
+def timed(fn):
+    """(result, best seconds of REPEATS)"""
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def python_window(app, start, end):
+    """Ids of events overlapping [start, end), parsed from the strings of every event"""
+    ids = []
+    for event in app.Event.query.all():
+        start_at, end_at = event_times.parse_event_times(event.date_time, event.event_date, event.event_time)
+        if start_at is not None and end_at >= start and start_at < end:
+            ids.append(event.id)
+    return sorted(ids)
+
+
+def sql_window(app, start, end):
+    return sorted(event_id for event_id, in app.db.session.query(app.Event.id).filter(
+        app.Event.end_at >= start, app.Event.start_at < end
+    ))
+
+
+if __name__ == '__main__':
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'events.db')
+    # Archive only when timed below, against the generated clock
+    os.environ['EVENT_ARCHIVE_INTERVAL'] = '0'
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        import generate_data
+        app.init_database()
+        with app.app.app_context():
+            generate_data.Generator(generate_data.parse_args([
+                '--users', '50', '--locations', '40', '--courses', '20', '--location-posts', '0',
+                '--course-posts', '0', '--events', str(EVENTS), '--now', NOW.isoformat()
+            ])).run()
+
+    utc_now = event_times.to_utc(NOW)
+    windows = [
+        ('next week', utc_now, utc_now + timedelta(days=7)),
+        ('upcoming', utc_now, datetime.max),
+    ]
+
+    mismatches = 0
+    print(f"{EVENTS} events\n\n{'query':<11} {'events':>7} {'parse all':>10} {'indexed':>9} {'speedup':>8}")
+    with app.app.app_context():
+        for label, start, end in windows:
+            expected, python_seconds = timed(lambda: python_window(app, start, end))
+            got, sql_seconds = timed(lambda: sql_window(app, start, end))
+            if got != expected:
+                mismatches += 1
+            print(f"{label:<11} {len(got):>7} {python_seconds * 1000:>8.0f}ms {sql_seconds * 1000:>7.1f}ms "
+                  f"{python_seconds / sql_seconds:>7.0f}x")
+
+    # The default list before and after ended approved events move to 'archived'; a
+    # fresh query string each time keeps the response cache out of it
+    client = app.app.test_client()
+    requests = iter(range(4 * REPEATS))
+    listed = lambda: client.get(f'/api/v1/events?request={next(requests)}').get_json()
+    before, before_seconds = timed(listed)
+    with app.app.app_context():
+        archived = app.archive_past_events(utc_now)
+    after, after_seconds = timed(listed)
+    print(f"\narchived {archived} ended approved events; /api/v1/events lists {len(before)} "
+          f"in {before_seconds * 1000:.0f}ms before, {len(after)} in {after_seconds * 1000:.0f}ms after")
+    if any(event['status'] == 'approved' and event_times.parse_query_time(event['end_at']) < utc_now
+           for event in after):
+        print("❌ Ended approved events still listed after archiving")
+        sys.exit(1)
+
+    if mismatches:
+        print(f"❌ {mismatches} window(s) picked different events than parsing every event")
+        sys.exit(1)
+    print("✅ Indexed windows pick the same events as parsing every event")
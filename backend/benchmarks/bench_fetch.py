@@ -0,0 +1,193 @@
+"""
+Scraper fetching against a local stand-in server: the old sleep-then-fetch
+loop vs FetchScheduler, over several hosts with injected 503s, then a
+repeat scrape revalidating against the response cache and an offline replay
+with the server gone. Checks that no host ever sees more than its allowed
+rate, that every page arrives despite the 503s, that connections are
+reused, and that unchanged pages are neither downloaded nor parsed again.
+Exits 1 on a violation.
+Run from backend/: python -m benchmarks.bench_fetch
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scrapers.base_scraper import BaseScraper
+
+# Every 127.x address reaches the loopback server, and each counts as its own host
+HOSTS = ['127.0.0.1', '127.0.0.2', '127.0.0.3']
+PAGES_PER_HOST = 20
+RATE = 10.0
+LATENCY = 0.05
+# Every FLAKY_EVERY-th page answers 503 on its first request
+FLAKY_EVERY = 7
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    arrivals = defaultdict(list)
+    connections = set()
+    failed_once = set()
+    not_modified = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        host = self.headers['Host'].split(':')[0]
+        with self.lock:
+            self.arrivals[host].append(time.monotonic())
+            self.connections.add(self.client_address)
+            flaky = self.path.endswith('/flaky') and (host, self.path) not in self.failed_once
+            if flaky:
+                self.failed_once.add((host, self.path))
+        time.sleep(LATENCY)
+
+        body = f'<html><body><h3 class="course-title">CSCI {self.path}</h3></body></html>'.encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if flaky:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+        elif self.headers.get('If-None-Match') == etag:
+            with self.lock:
+                StandIn.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        else:
+            self.send_response(200)
+            self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+    @classmethod
+    def reset(cls):
+        cls.arrivals.clear()
+        cls.connections.clear()
+        cls.failed_once.clear()
+        cls.not_modified = 0
+
+
+class StandInScraper(BaseScraper):
+    requests_per_second = RATE
+
+    def __init__(self, urls):
+        super().__init__('Stand-in College', 'SI', urls[0])
+        self.urls = urls
+        self.pages_parsed = 0
+
+    def scrape_courses(self):
+        return [self.parse_page(response, self.parse_titles) if response else None
+                for response in self.fetch_all(self.urls)]
+
+    def parse_titles(self, response):
+        self.pages_parsed += 1
+        soup = self.parse_html(response.text)
+        return [self.clean_text(h3.get_text()) for h3 in soup.find_all('h3', class_='course-title')]
+
+    def scrape_locations(self):
+        return []
+
+
+def legacy_fetch(scraper):
+    """The old make_request loop: sleep, then one synchronous request, page after page"""
+    responses = []
+    for url in scraper.urls:
+        time.sleep(1 / RATE)
+        response = scraper.session.get(url, timeout=10)
+        if response.status_code == 503:
+            time.sleep(1 / RATE)
+            response = scraper.session.get(url, timeout=10)
+        responses.append(response if response.ok else None)
+    return responses
+
+
+def busiest_second(arrivals):
+    """Most requests any host received within one second"""
+    busiest = 0
+    for times in arrivals.values():
+        times = sorted(times)
+        start = 0
+        for end, arrived in enumerate(times):
+            while arrived - times[start] >= 1.0:
+                start += 1
+            busiest = max(busiest, end - start + 1)
+    return busiest
+
+
+def run(label, fetch, scraper):
+    StandIn.reset()
+    start = time.perf_counter()
+    responses = fetch(scraper)
+    elapsed = time.perf_counter() - start
+    requests_made = sum(len(times) for times in StandIn.arrivals.values())
+    missing = sum(response is None for response in responses)
+    busiest = busiest_second(StandIn.arrivals)
+    print(f"{label:>10} {elapsed:>7.2f} {requests_made:>9} {StandIn.not_modified:>5} "
+          f"{len(StandIn.connections):>12} {busiest:>13} {scraper.pages_parsed:>7} {missing:>8}")
+    return elapsed, missing, busiest, len(StandIn.connections)
+
+
+if __name__ == '__main__':
+    # Retries and the replay's cache misses are expected here; keep their logs out of the table
+    logging.getLogger('scrapers').setLevel(logging.CRITICAL)
+    os.environ['SCRAPER_CACHE_DIR'] = tempfile.mkdtemp()
+    server = ThreadingHTTPServer(('', 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    urls = [
+        f'http://{host}:{port}/catalog/{page}' + ('/flaky' if page % FLAKY_EVERY == 0 else '')
+        for page in range(PAGES_PER_HOST) for host in HOSTS
+    ]
+    print(f"{len(urls)} pages on {len(HOSTS)} hosts, {RATE:.0f} req/s per host, {LATENCY * 1000:.0f} ms latency")
+    print(f"{'fetcher':>10} {'seconds':>7} {'requests':>9} {'304s':>5} {'connections':>12} "
+          f"{'busiest host/s':>13} {'parsed':>7} {'missing':>8}")
+
+    legacy_seconds, *_ = run('legacy', legacy_fetch, StandInScraper(urls))
+    scraper = StandInScraper(urls)
+    seconds, missing, busiest, connections = run('scheduler', lambda s: s.scrape_courses(), scraper)
+    scraper.fetcher.close()
+
+    # Same pages again: conditional GETs come back 304 and last run's parse results are reused
+    rescraper = StandInScraper(urls)
+    run('revalidate', lambda s: s.scrape_courses(), rescraper)
+    rescraper.fetcher.close()
+    server.shutdown()
+    server.server_close()
+
+    os.environ['SCRAPER_REPLAY'] = '1'
+    replayer = StandInScraper(urls)
+    _, replay_missing, *_ = run('replay', lambda s: s.scrape_courses(), replayer)
+
+    print(f"\n⏱️  {legacy_seconds / seconds:.1f}x faster, {scraper.fetcher.retried} retries")
+    # One token of burst on top of the rate is the most a host may see in any second
+    failures = []
+    if rescraper.pages_parsed:
+        failures.append(f"{rescraper.pages_parsed} unchanged page(s) parsed again on revalidation")
+    if replay_missing or replayer.pages_parsed != len(urls):
+        failures.append(f"replay parsed {replayer.pages_parsed} of {len(urls)} pages offline")
+    if busiest > RATE + 1:
+        failures.append(f"a host received {busiest} requests in one second (limit {RATE + 1:.0f})")
+    if missing:
+        failures.append(f"{missing} page(s) missing")
+    if connections > scraper.max_concurrency:
+        failures.append(f"{connections} connections opened for {scraper.max_concurrency} concurrent requests")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Rate limits held, connections were reused, every page arrived and unchanged pages were skipped")
+    sys.exit(1 if failures else 0)
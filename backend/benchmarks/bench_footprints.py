@@ -0,0 +1,127 @@
+"""
+Benchmark building footprints: import generated OSM outlines, then ask
+/api/v1/footprints for the whole campus at each zoom, comparing payload size
+and vertex counts against sending full outlines. Checks every simplified
+outline stays within its zoom's tolerance of the original and that
+encoded outlines decode back to the original points.
+Run from backend/: python -m benchmarks.bench_footprints
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import geo
+
+BUILDINGS = 2000
+REQUESTS = 50
+
+
+def building_outline(rng, lat, lon):
+    """A rotated, traced-looking rectangle: many nearly collinear points with GPS jitter, in meters"""
+    width, height = rng.uniform(10, 80), rng.uniform(10, 60)
+    angle = rng.uniform(0, math.pi)
+    vertices = rng.randint(8, 200)
+    corners = [(0, 0), (width, 0), (width, height), (0, height)]
+    perimeter = 2 * (width + height)
+    points = []
+    for i in range(vertices):
+        along = perimeter * i / vertices
+        for (x0, y0), (x1, y1) in zip(corners, corners[1:] + corners[:1]):
+            side = math.hypot(x1 - x0, y1 - y0)
+            if along <= side:
+                t = along / side
+                x, y = x0 + t * (x1 - x0) + rng.gauss(0, 0.15), y0 + t * (y1 - y0) + rng.gauss(0, 0.15)
+                break
+            along -= side
+        rx, ry = x * math.cos(angle) - y * math.sin(angle), x * math.sin(angle) + y * math.cos(angle)
+        points.append((round(lat + ry / 111320, 7), round(lon + rx / (111320 * math.cos(math.radians(lat))), 7)))
+    return points + points[:1]
+
+
+def overpass_response(rng):
+    from import_osm_buildings import BBOX
+
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    elements = []
+    for n in range(BUILDINGS):
+        ring = building_outline(rng, rng.uniform(min_lat + 0.001, max_lat - 0.001),
+                                rng.uniform(min_lon + 0.001, max_lon - 0.001))
+        lats, lons = [lat for lat, _ in ring], [lon for _, lon in ring]
+        elements.append({
+            'type': 'way', 'id': 1000 + n,
+            'bounds': {'minlat': min(lats), 'minlon': min(lons), 'maxlat': max(lats), 'maxlon': max(lons)},
+            'geometry': [{'lat': lat, 'lon': lon} for lat, lon in ring],
+            'tags': {'name': f'Building {n}', 'building': 'yes'}
+        })
+    return {'elements': elements}
+
+
+def max_deviation(original, simplified, ref_lat):
+    """Farthest any original vertex lies from the simplified outline, in meters"""
+    kept = geo.project(simplified, ref_lat)
+    edges = list(zip(kept, kept[1:]))
+    return max(min(geo.segment_distance(p, a, b) for a, b in edges) for p in geo.project(original, ref_lat))
+
+
+if __name__ == '__main__':
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'footprints.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        import import_osm_buildings
+        app.init_database()
+
+    response = overpass_response(random.Random(BUILDINGS))
+    response_file = os.path.join(tmp, 'overpass.json')
+    with open(response_file, 'w') as f:
+        json.dump(response, f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = import_osm_buildings.run_import(response_file)
+    timings = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in report['timings'].items())
+    print(f"{report['counts']['footprints']} footprints imported ({timings})")
+
+    min_lat, min_lon, max_lat, max_lon = import_osm_buildings.BBOX
+    client = app.app.test_client()
+    print(f"\n{'zoom':>5} {'level':>6} {'outlines':>9} {'vertices':>9} {'KB':>8} {'ms/request':>11}")
+    for zoom in (None,) + geo.FOOTPRINT_ZOOMS:
+        path = f'/api/v1/footprints?bbox={min_lon},{min_lat},{max_lon},{max_lat}' + (f'&zoom={zoom}' if zoom else '')
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            result = client.get(path)
+        ms = (time.perf_counter() - start) * 1000 / REQUESTS
+        footprints = result.get_json()['footprints']
+        vertices = sum(len(geo.decode_polyline(f['outline'])) for f in footprints)
+        print(f"{zoom or '-':>5} {geo.footprint_level(zoom) if zoom else 'full':>6} {len(footprints):>9} "
+              f"{vertices:>9} {len(result.data) / 1024:>8.1f} {ms:>11.1f}")
+
+    # Every stored simplification is within tolerance of the outline it came from
+    failures = 0
+    worst = {}
+    for building in report['buildings']:
+        ring = building['outline']
+        decoded = geo.decode_polyline(building['footprint']['outline'])
+        if len(decoded) != len(ring) or any(abs(a - b) > 0.6e-6 for p, q in zip(decoded, ring) for a, b in zip(p, q)):
+            failures += 1
+        for zoom in geo.FOOTPRINT_ZOOMS:
+            encoded = building['footprint'][f'outline_z{zoom}']
+            if encoded is None:
+                continue
+            deviation = max_deviation(ring, geo.decode_polyline(encoded), ring[0][0])
+            # Plus up to 0.1 m of encoding rounding
+            tolerance = geo.TOLERANCE_PIXELS * geo.meters_per_pixel(zoom, ring[0][0]) + 0.1
+            worst[zoom] = max(worst.get(zoom, 0), deviation)
+            if deviation > tolerance:
+                failures += 1
+
+    print("\nworst deviation: " + ', '.join(f"z{zoom} {meters:.2f} m" for zoom, meters in worst.items()))
+    if failures:
+        print(f"❌ {failures} outline(s) out of tolerance or not round-tripping")
+        sys.exit(1)
+    print("✅ Simplified outlines within tolerance; full outlines round-trip")
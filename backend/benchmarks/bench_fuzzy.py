@@ -0,0 +1,66 @@
+"""
+Benchmark FuzzyIndex typo correction at 100k entries
+Run from backend/: python -m benchmarks.bench_fuzzy
+"""
+
+import json
+import random
+import string
+import time
+
+from search_index import FuzzyIndex
+from benchmarks.bench_autocomplete import COURSES_FILE, percentile
+
+TARGET_ENTRIES = 100000
+QUERIES = 2000
+
+
+def misspell(text, rng):
+    """Drop, double or swap one letter in a random word"""
+    words = text.split()
+    i = rng.randrange(len(words))
+    word = words[i]
+    if len(word) > 3:
+        j = rng.randrange(1, len(word) - 1)
+        word = rng.choice([
+            word[:j] + word[j + 1:],
+            word[:j] + word[j] + word[j:],
+            word[:j] + word[j + 1] + word[j] + word[j + 2:],
+            word[:j] + rng.choice(string.ascii_lowercase) + word[j + 1:],
+        ])
+    words[i] = word
+    return ' '.join(words)
+
+
+if __name__ == '__main__':
+    with open(COURSES_FILE) as f:
+        courses = json.load(f)
+    rng = random.Random(0)
+
+    # Real titles plus made-up variants until the index is 100k entries deep
+    vocabulary = sorted({word for c in courses for word in c['title'].split() if len(word) > 3})
+    entries = [('title', c['title'], n) for n, c in enumerate(courses)]
+    entries += [('course_code', c['course_code'], n) for n, c in enumerate(courses)]
+    while len(entries) < TARGET_ENTRIES:
+        title = ' '.join(rng.sample(vocabulary, rng.randint(2, 4)))
+        entries.append(('title', title, len(entries)))
+
+    start = time.perf_counter()
+    index = FuzzyIndex(entries)
+    build = time.perf_counter() - start
+
+    targets = [rng.choice(courses)['title'] for _ in range(QUERIES)]
+    samples = []
+    found = 0
+    for target in targets:
+        query = misspell(target, rng)
+        start = time.perf_counter()
+        results = index.search(query, 10)
+        samples.append((time.perf_counter() - start) * 1000)
+        found += any(s.text == target for s in results)
+    samples.sort()
+
+    print(f"entries {len(index)}  build {build:.2f}s")
+    print(f"p50 {percentile(samples, 0.5):.2f} ms  p99 {percentile(samples, 0.99):.2f} ms  "
+          f"max {samples[-1]:.2f} ms")
+    print(f"misspelled title found in top 10: {found / QUERIES:.1%}")
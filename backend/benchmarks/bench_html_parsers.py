@@ -0,0 +1,56 @@
+"""
+Benchmark each installed HTML parser backend on the checked-in courses.html.
+That every backend extracts the same records is tested in
+tests/test_html_parsers.py.
+Run from backend/: python -m benchmarks.bench_html_parsers
+"""
+
+import contextlib
+import io
+import os
+import time
+
+from scrape_courses import scrape_courses_from_html
+from scrapers.soup import PARSER_BACKENDS, available_parsers, default_parser, make_soup
+
+HTML_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'courses.html')
+RUNS = 3
+
+
+def best_of(fn):
+    """Fastest of RUNS calls, in seconds, and the last result"""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def extract(parser):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [course.to_dict() for course in scrape_courses_from_html(HTML_FILE, parser)]
+
+
+if __name__ == '__main__':
+    with open(HTML_FILE, encoding='utf-8', errors='ignore') as f:
+        html_content = f.read()
+
+    parsers = available_parsers()
+    missing = [name for name in PARSER_BACKENDS if name not in parsers]
+    print(f"courses.html: {len(html_content) / 1e6:.1f} MB, best of {RUNS}; default backend: {default_parser()}")
+    if missing:
+        print(f"not installed: {', '.join(missing)}")
+
+    rows = {}
+    for parser in parsers:
+        parse_seconds, _ = best_of(lambda: make_soup(html_content, parser))
+        extract_seconds, records = best_of(lambda: extract(parser))
+        rows[parser] = parse_seconds, extract_seconds, records
+
+    # Speedups are against the built-in html.parser
+    baseline = rows['html.parser'][1]
+    print(f"\n{'backend':<12} {'full parse (s)':>15} {'extract (s)':>12} {'speedup':>8} {'records':>8}")
+    for parser, (parse_seconds, extract_seconds, records) in rows.items():
+        print(f"{parser:<12} {parse_seconds:>15.2f} {extract_seconds:>12.2f} {baseline / extract_seconds:>7.1f}x "
+              f"{len(records):>8}")
@@ -0,0 +1,118 @@
+"""
+Benchmark "which building am I in": BuildingIndex (STR-tree plus
+point-in-polygon) against testing every outline, on generated OSM
+footprints and GPS fixes spread over campus, a share of them inside
+buildings. Checks both answer every fix the same, then times the
+/api/v1/locations/at endpoint end to end.
+Run from backend/: python -m benchmarks.bench_locate
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import geo
+from benchmarks import bench_footprints
+from spatial_index import NEAREST_RADIUS, point_in_ring, ring_distance
+
+FIXES = 20000
+BRUTE_FORCE_FIXES = 200
+ENDPOINT_REQUESTS = 2000
+
+
+def brute_force(index, lat, lon, radius=NEAREST_RADIUS):
+    """What locate() answers, by testing every building"""
+    x, y = index._project(lat, lon)
+    inside = [i for i, shape in enumerate(index.shapes) if len(shape) > 1 and point_in_ring(x, y, shape)]
+    if inside:
+        return index.location_ids[min(inside, key=lambda i: index.areas[i])], True, 0.0
+
+    best, best_distance = None, radius
+    for i, shape in enumerate(index.shapes):
+        distance = math.hypot(x - shape[0][0], y - shape[0][1]) if len(shape) == 1 else ring_distance(x, y, shape)
+        if distance < best_distance:
+            best, best_distance = i, distance
+    return None if best is None else (index.location_ids[best], False, best_distance)
+
+
+def gps_fixes(rng, index, count, bbox):
+    """Fixes at random over campus, every third one inside a random building"""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    outlines = [shape for shape in index.shapes if len(shape) > 1]
+    fixes = []
+    for n in range(count):
+        if n % 3 == 0:
+            # A point between a building's first vertex and the one halfway round
+            shape = rng.choice(outlines)
+            (x1, y1), (x2, y2) = shape[0], shape[len(shape) // 2]
+            x, y = (x1 + x2) / 2, (y1 + y2) / 2
+            fixes.append((y / geo.METERS_PER_DEGREE, x / (geo.METERS_PER_DEGREE * math.cos(math.radians(index.ref_lat)))))
+        else:
+            fixes.append((rng.uniform(min_lat - 0.002, max_lat + 0.002), rng.uniform(min_lon - 0.002, max_lon + 0.002)))
+    return fixes
+
+
+def per_second(count, fn):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'locate.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        import import_osm_buildings
+        app.init_database()
+
+    response_file = os.path.join(tmp, 'overpass.json')
+    with open(response_file, 'w') as f:
+        json.dump(bench_footprints.overpass_response(random.Random(bench_footprints.BUILDINGS)), f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import_osm_buildings.run_import(response_file)
+
+    with app.app.app_context():
+        start = time.perf_counter()
+        index = app.build_building_index()
+        build_seconds = time.perf_counter() - start
+    print(f"{len(index)} buildings, tree levels {[len(level) for level in index.levels]}, built in {build_seconds:.2f}s")
+
+    rng = random.Random(FIXES)
+    fixes = gps_fixes(rng, index, FIXES, import_osm_buildings.BBOX)
+    answers = [index.locate(lat, lon) for lat, lon in fixes]
+    inside = sum(1 for answer in answers if answer is not None and answer.inside)
+    nearby = sum(1 for answer in answers if answer is not None and not answer.inside)
+    print(f"{FIXES} fixes: {inside} inside a building, {nearby} near one, {FIXES - inside - nearby} neither")
+
+    mismatches = 0
+    start = time.perf_counter()
+    expected_answers = [brute_force(index, lat, lon) for lat, lon in fixes[:BRUTE_FORCE_FIXES]]
+    brute_force_rate = BRUTE_FORCE_FIXES / (time.perf_counter() - start)
+    for expected, answer in zip(expected_answers, answers):
+        got = answer and (answer.location_id, answer.inside, answer.distance)
+        if (expected is None) != (got is None) or (expected and (got[:2] != expected[:2] or abs(got[2] - expected[2]) > 1e-9)):
+            mismatches += 1
+
+    client = app.app.test_client()
+    rows = [
+        ('STR-tree', per_second(FIXES, lambda: [index.locate(lat, lon) for lat, lon in fixes])),
+        ('every outline', brute_force_rate),
+        ('endpoint', per_second(ENDPOINT_REQUESTS, lambda: [
+            client.get(f'/api/v1/locations/at?lat={lat}&lon={lon}') for lat, lon in fixes[:ENDPOINT_REQUESTS]
+        ])),
+    ]
+    print(f"\n{'lookup':<14} {'per second':>11}")
+    for label, rate in rows:
+        print(f"{label:<14} {rate:>11,.0f}")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} of {BRUTE_FORCE_FIXES} fixes answered differently than testing every outline")
+        sys.exit(1)
+    print(f"\n✅ Same answer as testing every outline for {BRUTE_FORCE_FIXES} fixes")
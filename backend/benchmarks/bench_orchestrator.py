@@ -0,0 +1,114 @@
+"""
+Benchmark the scrape orchestrator against running each college's scraper
+by hand, one after another. Stand-in scrapers serve the checked-in catalog
+dealt out evenly across the colleges, waiting PAGE_LATENCY per page the way
+a polite network fetch does; one college always raises, to check it
+doesn't stop the rest.
+Run from backend/: python -m benchmarks.bench_orchestrator
+"""
+
+import contextlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import defaultdict
+
+from model.models import Course, db
+from scrapers.base_scraper import BaseScraper
+from scrapers.orchestrator import orchestrate, create_app
+
+COURSES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'courses_data.json')
+PAGE_SIZE = 50
+PAGE_LATENCY = 0.1
+FAILING_COLLEGE = 'PZ'
+COLLEGES = ('CMC', 'HMC', 'PO', 'PZ', 'SC')
+
+
+def catalog_by_college():
+    with open(COURSES_FILE) as f:
+        courses = json.load(f)
+    # Nearly every scraped row is tagged PO, so deal them out instead of grouping by college
+    by_college = defaultdict(list)
+    for n, course in enumerate(courses):
+        number = re.sub(r'^[A-Z]+', '', course['course_code'])
+        by_college[COLLEGES[n % len(COLLEGES)]].append({
+            'title': course['title'],
+            'course_number': f"{number}-{course['section']}",
+            'department_code': course['department'],
+            'instructor': course['instructors'],
+            'semester': 'Fall 2024',
+        })
+    return by_college
+
+
+class StandInScraper(BaseScraper):
+    code = None
+
+    def __init__(self):
+        super().__init__(f'{self.code} (stand-in)', self.code, 'http://127.0.0.1')
+
+    def scrape_courses(self):
+        if self.code == FAILING_COLLEGE:
+            raise RuntimeError('catalog markup changed')
+        courses = catalog_by_college()[self.code]
+        for _ in range(0, len(courses), PAGE_SIZE):
+            time.sleep(PAGE_LATENCY)
+        return courses
+
+    def scrape_locations(self):
+        raise NotImplementedError
+
+
+# Module-level classes, so worker processes can unpickle them by name
+STAND_INS = {}
+for _code in COLLEGES:
+    STAND_INS[_code] = globals()[f'StandIn{_code}'] = type(
+        f'StandIn{_code}', (StandInScraper,), {'code': _code, '__module__': __name__}
+    )
+
+
+def sequential():
+    """What running each scraper's run_full_scrape by hand amounts to"""
+    for scraper_class in STAND_INS.values():
+        scraper_class().run_full_scrape()
+
+
+if __name__ == '__main__':
+    logging.getLogger('scrapers').setLevel(logging.CRITICAL)
+    pages = sum(-(-len(courses) // PAGE_SIZE) for courses in catalog_by_college().values())
+    print(f"{len(STAND_INS)} colleges, {pages} pages at {PAGE_LATENCY * 1000:.0f} ms, "
+          f"{os.cpu_count()} CPU(s); {FAILING_COLLEGE} raises")
+
+    os.environ['SCRAPER_DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'sequential.db')
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        sequential()
+        sequential_seconds = time.perf_counter() - start
+        sequential_courses = Course.query.count()
+        db.engine.dispose()
+
+    os.environ['SCRAPER_DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'orchestrated.db')
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as progress:
+            report = orchestrate(STAND_INS)
+        orchestrated_seconds = time.perf_counter() - start
+        orchestrated_courses = Course.query.count()
+
+    print(progress.getvalue(), end='')
+    print(f"\n{'run':<12} {'seconds':>8} {'courses saved':>14}")
+    print(f"{'sequential':<12} {sequential_seconds:>8.2f} {sequential_courses:>14}")
+    print(f"{'orchestrated':<12} {orchestrated_seconds:>8.2f} {orchestrated_courses:>14}")
+    print("\nstages: " + ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in report['timings'].items()))
+
+    assert set(report['failures']) == {FAILING_COLLEGE}, report['failures']
+    assert orchestrated_courses == sequential_courses, (orchestrated_courses, sequential_courses)
+    print(f"✅ {FAILING_COLLEGE} failed alone; the other colleges saved the same courses either way")
@@ -0,0 +1,124 @@
+"""
+Benchmark the OSM building import on a generated Overpass response: the
+original per-building import (a name lookup and a college lookup per
+building) vs the keyed bulk upsert. Checks a re-run of the same file is a
+no-op apart from updates, and that moved buildings are updated in place.
+Run from backend/: python -m benchmarks.bench_osm_import
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+BUILDINGS = 5000
+# How far the second response moves every building north
+SHIFT = 0.001
+
+
+def overpass_response(rng, shift=0.0):
+    """Named building ways and nodes inside the 5C box, with the noise a real response has"""
+    from import_osm_buildings import BBOX
+
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    elements = []
+    for n in range(BUILDINGS):
+        element = {'type': 'way' if n % 4 else 'node', 'id': 1000 + n,
+                   'tags': {'name': f'Building {n}', 'building': 'yes'}}
+        point = {'lat': rng.uniform(min_lat, max_lat - SHIFT) + shift, 'lon': rng.uniform(min_lon, max_lon)}
+        if element['type'] == 'node':
+            element.update(point)
+        else:
+            element['center'] = point
+        elements.append(element)
+    # Repeated elements, parking, and a building outside the box
+    elements += rng.sample(elements, BUILDINGS // 20)
+    elements.append({'type': 'way', 'id': 1, 'center': {'lat': 34.1, 'lon': -117.71}, 'tags': {'name': 'Parking Structure'}})
+    elements.append({'type': 'way', 'id': 2, 'center': {'lat': 35.0, 'lon': -117.71}, 'tags': {'name': 'Far Hall'}})
+    return {'elements': elements}
+
+
+def legacy_import(app, buildings):
+    """The original add_buildings: dedupe by name, two lookups per building"""
+    seen = set()
+    with app.app.app_context():
+        session = app.db.session
+        for building in buildings:
+            if building['name'] in seen:
+                continue
+            seen.add(building['name'])
+            if session.query(app.Location).filter_by(name=building['name']).first():
+                continue
+            college = session.query(app.College).filter_by(name=building['college']).first()
+            session.add(app.Location(
+                name=building['name'], latitude=building['lat'], longitude=building['lon'],
+                category=building['category'], college_id=college.id if college else 1,
+                description=f"Building at {building['college']}", fun_facts='[]'
+            ))
+        session.commit()
+
+
+def location_rows(app):
+    """(locations, distinct OSM ids, latitude of the first generated building)"""
+    with app.app.app_context():
+        keyed = app.db.session.query(app.Location.osm_id).filter(app.Location.osm_id.isnot(None))
+        first = app.Location.query.filter_by(osm_id='node/1000').first()
+        return app.Location.query.count(), keyed.distinct().count(), first and first.latitude
+
+
+if __name__ == '__main__':
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'osm.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        import import_osm_buildings
+        app.init_database()
+        with app.app.app_context():
+            app.seed_database()
+
+    rng = random.Random(BUILDINGS)
+    response_file = os.path.join(tmp, 'overpass.json')
+    moved_file = os.path.join(tmp, 'overpass_moved.json')
+    response = overpass_response(rng)
+    with open(response_file, 'w') as f:
+        json.dump(response, f)
+    with open(moved_file, 'w') as f:
+        json.dump(overpass_response(random.Random(BUILDINGS), shift=SHIFT), f)
+    seeded = location_rows(app)[0]
+
+    runs = {}
+    for label, path in (('first import', response_file), ('re-run', response_file), ('moved', moved_file)):
+        report = import_osm_buildings.run_import(path)
+        runs[label] = report, location_rows(app)
+
+    # The original import, with the imported buildings removed again
+    with app.app.app_context():
+        app.Location.query.filter(app.Location.osm_id.isnot(None)).delete()
+        app.db.session.commit()
+    buildings = import_osm_buildings.extract_buildings(import_osm_buildings.load_overpass(response_file)['elements'])
+    start = time.perf_counter()
+    legacy_import(app, buildings)
+    legacy_seconds = time.perf_counter() - start
+
+    print(f"{BUILDINGS} buildings in a {len(response['elements'])}-element response, "
+          f"{seeded} seeded locations")
+    print(f"\n{'run':<14} {'load':>6} {'extract':>8} {'save':>6} {'inserted':>9} {'updated':>8} {'locations':>10}")
+    for label, (report, (count, _, _)) in runs.items():
+        timings = report['timings']
+        print(f"{label:<14} {timings['load']:>6.2f} {timings['extract']:>8.2f} {timings['save']:>6.2f} "
+              f"{report['counts']['inserted']:>9} {report['counts']['updated']:>8} {count:>10}")
+    print(f"{'per-building':<14} {'':>6} {'':>8} {legacy_seconds:>6.2f}")
+
+    first, (first_count, first_keyed, first_lat) = runs['first import']
+    again, (again_count, _, _) = runs['re-run']
+    moved, (moved_count, _, moved_lat) = runs['moved']
+    assert (first['counts']['inserted'], first['counts']['updated']) == (BUILDINGS, 0), first['counts']
+    assert first_count == seeded + BUILDINGS and first_keyed == BUILDINGS, (first_count, first_keyed)
+    assert (again['counts']['inserted'], again['counts']['updated']) == (0, BUILDINGS), again['counts']
+    assert again_count == first_count, (again_count, first_count)
+    assert moved['counts']['inserted'] == 0 and moved_count == first_count, moved['counts']
+    assert abs(moved_lat - first_lat - SHIFT) < 1e-9, (first_lat, moved_lat)
+    print("\n✅ One row per OSM element; re-running and moved buildings update in place")
@@ -0,0 +1,76 @@
+"""
+Benchmark JSON encode time and bytes on the wire for every list endpoint
+Run from backend/: python -m benchmarks.bench_responses
+"""
+
+import json
+import time
+
+from benchmarks.fixtures import load_catalog_app
+
+import json_responses
+
+LIST_ENDPOINTS = [
+    '/api/v1/colleges',
+    '/api/v1/locations',
+    '/api/v1/events',
+    '/api/v1/courses',
+    '/api/v1/departments',
+    '/api/v1/posts/pending',
+    '/api/v1/course-posts/pending',
+]
+RUNS = 20
+
+# Response shapes compared for the two heaviest screens
+SHAPES = [
+    ('map markers, full', '/api/v1/locations'),
+    ('map markers, sparse', '/api/v1/locations?fields=name,latitude,longitude,category'),
+    ('course list, full', '/api/v1/courses'),
+    ('course list, normalized', '/api/v1/courses?shape=normalized'),
+    ('course list, normalized+sparse', '/api/v1/courses?shape=normalized'
+                                       '&fields=course_code,section,title,location_id,days,time'),
+]
+
+
+def timed(fn, runs=RUNS):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return result, (time.perf_counter() - start) / runs * 1000
+
+
+if __name__ == '__main__':
+    app = load_catalog_app()
+    client = app.app.test_client()
+
+    print(f"{'endpoint':<28} {'stdlib ms':>9} {'orjson ms':>9} {'raw B':>9} "
+          f"{'gzip B':>8} {'gzip ms':>7} {'br B':>8} {'br ms':>6}")
+    for path in LIST_ENDPOINTS:
+        payload = client.get(path).get_json()
+
+        stdlib_body, stdlib_ms = timed(lambda: json.dumps(payload, separators=(',', ':'), sort_keys=True))
+        if json_responses.orjson:
+            _, orjson_ms = timed(lambda: json_responses.orjson.dumps(payload, option=json_responses.OrjsonProvider.options))
+            orjson_ms = f'{orjson_ms:.2f}'
+        else:
+            orjson_ms = 'n/a'
+
+        raw = stdlib_body.encode()
+        level = app.app.config['COMPRESS_LEVEL']
+        gzipped, gzip_ms = timed(lambda: json_responses.compress(raw, 'gzip', level))
+        if json_responses.brotli:
+            brotlied, br_ms = timed(lambda: json_responses.compress(raw, 'br', level))
+            br_bytes, br_ms = len(brotlied), f'{br_ms:.2f}'
+        else:
+            br_bytes, br_ms = 'n/a', 'n/a'
+
+        print(f"{path:<28} {stdlib_ms:>9.2f} {orjson_ms:>9} {len(raw):>9} "
+              f"{len(gzipped):>8} {gzip_ms:>7.2f} {br_bytes:>8} {br_ms:>6}")
+
+    print()
+    print(f"{'shape':<32} {'raw B':>9} {'gzip B':>8} {'request ms':>10}")
+    for name, path in SHAPES:
+        response, ms = timed(lambda: client.get(path), runs=5)
+        raw = client.get(path, headers={'Accept-Encoding': 'identity'}).data
+        gzipped = client.get(path, headers={'Accept-Encoding': 'gzip'}).data
+        print(f"{name:<32} {len(raw):>9} {len(gzipped):>8} {ms:>10.1f}")
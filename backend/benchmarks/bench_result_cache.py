@@ -0,0 +1,45 @@
+"""
+Benchmark repeated filter requests with and without the response cache
+Run from backend/: python -m benchmarks.bench_result_cache
+"""
+
+import time
+
+from benchmarks.fixtures import load_catalog_app
+
+PATHS = [
+    '/api/v1/courses?college=PO&department=CSCI',
+    '/api/v1/courses?college=CMC',
+    '/api/v1/courses',
+    '/api/v1/locations',
+]
+RUNS = 20
+
+
+def mean_ms(client, path, headers):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+if __name__ == '__main__':
+    app = load_catalog_app()
+    client = app.app.test_client()
+    headers = {'Accept-Encoding': 'gzip'}
+
+    print(f"{'path':<44} {'uncached ms':>11} {'cached ms':>9}")
+    for path in PATHS:
+        # Clearing before every request measures the miss path
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            app.result_cache.clear()
+            client.get(path, headers=headers)
+        uncached = (time.perf_counter() - start) / RUNS * 1000
+
+        client.get(path, headers=headers)
+        cached = mean_ms(client, path, headers)
+        print(f"{path:<44} {uncached:>11.2f} {cached:>9.2f}")
+
+    print()
+    print(app.result_cache.stats())
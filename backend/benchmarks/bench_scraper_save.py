@@ -0,0 +1,161 @@
+"""
+Benchmark BaseScraper.save_to_database: the original per-course
+find-or-create loop vs preloaded lookups with chunked bulk upserts, on a
+first save (all inserts) and a re-save (all updates). Checks both leave the
+same rows behind.
+Run from backend/: python -m benchmarks.bench_scraper_save
+"""
+
+import logging
+import os
+import random
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy import event
+
+from model.models import College, Department, Course, db
+from scrapers.base_scraper import BaseScraper
+
+COURSES = 10000
+DEPARTMENTS = 40
+
+
+class StandInScraper(BaseScraper):
+    def __init__(self):
+        super().__init__('Stand-in College', 'SI', 'http://127.0.0.1')
+
+    def scrape_courses(self):
+        return []
+
+    def scrape_locations(self):
+        return []
+
+
+def scraped_courses(title_suffix=''):
+    rng = random.Random(COURSES)
+    return [
+        {
+            'title': f'Course {n}{title_suffix}',
+            'course_number': f'{n:03d}',
+            'department_code': f'D{n % DEPARTMENTS:02d}',
+            'department_name': f'Department {n % DEPARTMENTS}',
+            'description': 'Lorem ipsum ' * rng.randint(1, 20),
+            'instructor': f'Prof. {rng.randint(1, 500)}',
+            'credits': 1,
+            'semester': 'Fall 2024',
+            'time_slots': [{'days': 'MWF', 'start_time': '9:00', 'end_time': '9:50'}],
+        }
+        for n in range(COURSES)
+    ]
+
+
+def legacy_save(scraper, courses_data):
+    """The original save_to_database: find-or-create per department, existence query per course"""
+    college = College.query.filter_by(code=scraper.college_code).first()
+    if not college:
+        college = College(name=scraper.college_name, code=scraper.college_code)
+        db.session.add(college)
+        db.session.commit()
+
+    for course_data in courses_data:
+        if not scraper.validate_course_data(course_data):
+            continue
+        department = Department.query.filter_by(
+            code=course_data['department_code'], college_id=college.id
+        ).first()
+        if not department:
+            department = Department(
+                name=course_data.get('department_name', course_data['department_code']),
+                code=course_data['department_code'],
+                college_id=college.id
+            )
+            db.session.add(department)
+            db.session.commit()
+
+        existing_course = Course.query.filter_by(
+            course_number=course_data['course_number'],
+            department_id=department.id,
+            semester=course_data.get('semester', 'Current')
+        ).first()
+        if existing_course:
+            existing_course.title = course_data['title']
+            existing_course.description = course_data.get('description')
+            existing_course.instructor = course_data.get('instructor')
+            existing_course.credits = course_data.get('credits', 1)
+            if course_data.get('time_slots'):
+                existing_course.set_time_slots(course_data['time_slots'])
+        else:
+            course = Course(
+                title=course_data['title'],
+                course_number=course_data['course_number'],
+                description=course_data.get('description'),
+                credits=course_data.get('credits', 1),
+                semester=course_data.get('semester', 'Current'),
+                instructor=course_data.get('instructor'),
+                department_id=department.id,
+                college_id=college.id,
+                enrollment_limit=course_data.get('enrollment_limit')
+            )
+            if course_data.get('time_slots'):
+                course.set_time_slots(course_data['time_slots'])
+            db.session.add(course)
+    db.session.commit()
+
+
+def snapshot():
+    """Saved courses, comparable across implementations"""
+    return sorted(
+        db.session.query(Department.code, Department.name, Course.course_number, Course.semester,
+                         Course.title, Course.description, Course.instructor, Course.credits,
+                         Course.time_slots)
+        .join(Course, Course.department_id == Department.id)
+    )
+
+
+def timed(save, courses):
+    queries = [0]
+
+    def count(*args):
+        queries[0] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    save(courses)
+    seconds = time.perf_counter() - start
+    event.remove(db.engine, 'before_cursor_execute', count)
+    return seconds, queries[0]
+
+
+def run(save):
+    """(first save, re-save) as (seconds, queries), plus the rows left behind"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp, 'save.db')
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            first = timed(save, scraped_courses())
+            again = timed(save, scraped_courses(' (revised)'))
+            rows = snapshot()
+            db.session.remove()
+            db.engine.dispose()
+        return first, again, rows
+
+
+if __name__ == '__main__':
+    logging.getLogger('scrapers').setLevel(logging.WARNING)
+    scraper = StandInScraper()
+
+    print(f"{COURSES} courses in {DEPARTMENTS} departments")
+    print(f"{'implementation':<16} {'save':<8} {'seconds':>8} {'queries':>8} {'rows/s':>9}")
+    results = {}
+    for name, save in (('per-course', lambda courses: legacy_save(scraper, courses)),
+                       ('bulk upsert', scraper.save_to_database)):
+        first, again, results[name] = run(save)
+        for label, (seconds, queries) in (('first', first), ('re-save', again)):
+            print(f"{name:<16} {label:<8} {seconds:>8.2f} {queries:>8} {COURSES / seconds:>9.0f}")
+
+    assert results['per-course'] == results['bulk upsert'], "implementations saved different rows"
+    print("\n✅ Both implementations saved identical rows")
@@ -0,0 +1,120 @@
+"""
+Concurrency check for the response cache: N simultaneous requests for a cold
+or just-invalidated /api/v1/courses should run the course query once. After
+another worker's write they're served stale during the refresh; after this
+process's own write they wait for the fresh result.
+Run from backend/: python -m benchmarks.bench_stampede
+"""
+
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+from werkzeug.datastructures import MultiDict
+
+from benchmarks.fixtures import load_catalog_app
+
+CONCURRENCY = 32
+PATH = '/api/v1/courses'
+
+
+class NoCoalescing:
+    """Stand-in for SingleFlight that lets every caller run the query"""
+
+    def do(self, key, fn):
+        return fn(), False
+
+
+def burst(app, flights):
+    """Fire CONCURRENCY requests at once; returns (X-Cache counts, course queries, seconds)"""
+    queries = Counter()
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().startswith('SELECT') and 'FROM course' in statement:
+            queries['course'] += 1
+
+    with app.app.app_context():
+        engine = app.db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+
+    barrier = threading.Barrier(CONCURRENCY)
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def request():
+        client = app.app.test_client()
+        barrier.wait()
+        response = client.get(PATH)
+        with lock:
+            statuses[response.headers['X-Cache']] += 1
+
+    threads = [threading.Thread(target=request) for _ in range(CONCURRENCY)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Let a background refresh finish before counting
+    key = app.ResultCache.make_key('get_courses', MultiDict())
+    while flights.in_flight(key):
+        time.sleep(0.01)
+    event.remove(engine, 'before_cursor_execute', count)
+    return dict(statuses), queries['course'], elapsed
+
+
+def invalidate(app):
+    """A course write in this process"""
+    with app.app.app_context():
+        course = app.Course.query.first()
+        course.notes = (course.notes or '') + ' '
+        app.db.session.commit()
+
+
+def invalidate_elsewhere(app):
+    """A course write by another worker: the version moves without this process's session seeing it"""
+    with app.app.app_context():
+        with app.db.engine.begin() as connection:
+            app.bump_table_versions(connection, {'course'})
+
+
+if __name__ == '__main__':
+    app = load_catalog_app()
+    cache = app.result_cache
+
+    print(f"{'scenario':<36} {'course queries':>14} {'seconds':>8}  X-Cache")
+
+    flights = cache.flights
+    cache.flights = NoCoalescing()
+    cache.clear()
+    statuses, queries, elapsed = burst(app, flights)
+    print(f"{'cold, no coalescing':<36} {queries:>14} {elapsed:>8.2f}  {statuses}")
+    cache.flights = flights
+
+    cache.clear()
+    statuses, queries, elapsed = burst(app, flights)
+    print(f"{'cold, single-flight':<36} {queries:>14} {elapsed:>8.2f}  {statuses}")
+    assert queries == 1, queries
+
+    invalidate_elsewhere(app)
+    statuses, queries, elapsed = burst(app, flights)
+    print(f"{'invalidated, stale-while-revalidate':<36} {queries:>14} {elapsed:>8.2f}  {statuses}")
+    assert queries == 1 and statuses == {'STALE': CONCURRENCY}, (queries, statuses)
+
+    statuses, queries, elapsed = burst(app, flights)
+    print(f"{'after refresh':<36} {queries:>14} {elapsed:>8.2f}  {statuses}")
+    assert queries == 0 and statuses == {'HIT': CONCURRENCY}, (queries, statuses)
+
+    invalidate(app)
+    statuses, queries, elapsed = burst(app, flights)
+    print(f"{'invalidated by own write':<36} {queries:>14} {elapsed:>8.2f}  {statuses}")
+    assert queries == 1 and 'STALE' not in statuses, (queries, statuses)
+
+    statuses, queries, elapsed = burst(app, flights)
+    print(f"{'after refresh':<36} {queries:>14} {elapsed:>8.2f}  {statuses}")
+    assert queries == 0 and statuses == {'HIT': CONCURRENCY}, (queries, statuses)
+
+    print()
+    print(cache.stats())
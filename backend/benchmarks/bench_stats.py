@@ -0,0 +1,143 @@
+"""
+Benchmark /stats: per-college count() loop vs GROUP BY vs counters table
+Run from backend/: python -m benchmarks.bench_stats
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy import event
+
+from api.routes import api
+from model.models import (College, Department, Course, Location, Event, db,
+                          enable_stats_counters, rebuild_stats_counters)
+
+COURSES_PER_COLLEGE = 440
+LOCATIONS_PER_COLLEGE = 25
+EVENTS_PER_COLLEGE = 20
+DEPARTMENTS_PER_COLLEGE = 10
+RUNS = 50
+
+
+def legacy_stats():
+    """The original get_stats: five global counts, then three per college"""
+    stats = {
+        'colleges': College.query.count(),
+        'courses': Course.query.count(),
+        'locations': Location.query.count(),
+        'events': Event.query.filter(Event.is_active == True).count(),
+        'departments': Department.query.count(),
+    }
+    college_stats = {}
+    for college in College.query.all():
+        college_stats[college.code] = {
+            'courses': Course.query.filter_by(college_id=college.id).count(),
+            'locations': Location.query.filter_by(college_id=college.id).count(),
+            'events': Event.query.filter_by(college_id=college.id, is_active=True).count()
+        }
+    stats['by_college'] = college_stats
+    return stats
+
+
+def create_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    app.register_blueprint(api, url_prefix='/api/v1')
+    return app
+
+
+def seed(num_colleges):
+    rng = random.Random(num_colleges)
+    db.session.execute(db.insert(College), [
+        {'id': i, 'name': f'Campus {i}', 'code': f'C{i}'} for i in range(1, num_colleges + 1)
+    ])
+    db.session.execute(db.insert(Department), [
+        {'name': f'Dept {d}', 'code': f'D{d}', 'college_id': c}
+        for c in range(1, num_colleges + 1) for d in range(DEPARTMENTS_PER_COLLEGE)
+    ])
+    db.session.execute(db.insert(Location), [
+        {'name': f'Building {c}-{l}', 'category': 'academic', 'college_id': c}
+        for c in range(1, num_colleges + 1) for l in range(LOCATIONS_PER_COLLEGE)
+    ])
+    db.session.execute(db.insert(Course), [
+        {'title': f'Course {n}', 'course_number': str(n), 'semester': 'Fall 2024',
+         'department_id': 1, 'college_id': c}
+        for c in range(1, num_colleges + 1) for n in range(COURSES_PER_COLLEGE)
+    ])
+    db.session.execute(db.insert(Event), [
+        {'title': f'Event {n}', 'start_datetime': datetime.utcnow(), 'college_id': c,
+         'is_active': rng.random() < 0.8}
+        for c in range(1, num_colleges + 1) for n in range(EVENTS_PER_COLLEGE)
+    ])
+    db.session.commit()
+
+
+def measure(fn):
+    queries = [0]
+
+    def count(*args):
+        queries[0] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    fn()
+    per_call = queries[0]
+    event.remove(db.engine, 'before_cursor_execute', count)
+
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        fn()
+    elapsed = (time.perf_counter() - start) / RUNS * 1000
+    return elapsed, per_call
+
+
+def run(num_colleges):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(os.path.join(tmp, 'stats.db'))
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            seed(num_colleges)
+
+            legacy = measure(legacy_stats)
+            expected = legacy_stats()
+
+            def endpoint():
+                response = client.get('/api/v1/stats')
+                return response.get_json()
+
+            aggregated = measure(endpoint)
+            assert_same(expected, endpoint())
+
+            enable_stats_counters()
+            rebuild_stats_counters()
+            counters = measure(endpoint)
+            assert_same(expected, endpoint())
+
+            # Counters stay correct through ORM writes
+            course = Course(title='New', course_number='1', department_id=1, college_id=1)
+            db.session.add(course)
+            db.session.commit()
+            db.session.delete(Event.query.filter_by(college_id=2, is_active=True).first())
+            db.session.commit()
+            assert_same(legacy_stats(), endpoint())
+
+            db.session.remove()
+        return legacy, aggregated, counters
+
+
+def assert_same(expected, actual):
+    actual = {k: v for k, v in actual.items() if k != 'last_updated'}
+    assert expected == actual, (expected, actual)
+
+
+if __name__ == '__main__':
+    print(f"{'colleges':>8}  {'implementation':<16} {'ms/request':>10} {'queries':>8}")
+    for num_colleges in (5, 100):
+        results = run(num_colleges)
+        for name, (ms, queries) in zip(('count() loop', 'GROUP BY', 'counters table'), results):
+            print(f"{num_colleges:>8}  {name:<16} {ms:>10.2f} {queries:>8}")
@@ -0,0 +1,125 @@
+"""
+Query budget check: every budgeted endpoint, requested against a seeded
+multi-row database, must stay within its @max_queries budget. With enough
+rows per table an N+1 (a lazy load per serialized row) blows well past any
+budget, so this catches them before they ship. Exits 1 on any overrun.
+Run from backend/: python -m benchmarks.check_query_budgets
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+from query_budget import QueryBudgetExceeded
+
+# Generated scale: enough rows that a per-row query can't hide under a budget
+SCALE = ['--users', '50', '--locations', '40', '--courses', '300', '--location-posts', '400',
+         '--course-posts', '400', '--events', '60', '--now', '2024-10-15T12:00']
+
+
+def load_seeded_app():
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'budget.db')
+    os.environ['QUERY_BUDGET_MODE'] = 'raise'
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        import generate_data
+        app.init_database()
+        with app.app.app_context():
+            generate_data.Generator(generate_data.parse_args(SCALE)).run()
+    app.app.testing = True
+    return app
+
+
+def requests_to_check(app):
+    """(method, path, json) covering every budgeted route, cold and filtered variants included"""
+    with app.app.app_context():
+        location = app.Location.query.join(app.LocationPost).first()
+        course = app.Course.query.join(app.CoursePost).first()
+        user_id = app.db.session.query(app.StarredItem.user_id).first()[0]
+        course_ids = [course_id for course_id, in app.db.session.query(app.Course.id).limit(20)]
+
+    items = [{'item_type': 'course', 'item_id': course_id} for course_id in course_ids]
+    return [
+        ('GET', '/api/v1/colleges', None),
+        ('GET', '/api/v1/locations', None),
+        ('GET', '/api/v1/locations?shape=normalized', None),
+        ('GET', f'/api/v1/locations/{location.id}', None),
+        ('GET', '/api/v1/locations/at?lat=34.0975&lon=-117.7115', None),
+        ('GET', '/api/v1/footprints?bbox=-117.714,34.093,-117.704,34.107&zoom=15', None),
+        ('POST', f'/api/v1/locations/{location.id}/posts', {'content': 'Budget check'}),
+        ('GET', '/api/v1/posts/pending', None),
+        ('GET', '/api/v1/events', None),
+        ('GET', '/api/v1/events?shape=normalized', None),
+        ('GET', '/api/v1/events?from=2024-10-01&to=2024-10-31', None),
+        ('GET', '/api/v1/events?upcoming=1', None),
+        ('POST', '/api/v1/events', {'title': 'Budget check', 'event_type': 'fun', 'location_id': location.id}),
+        ('GET', f'/api/v1/starred?user_id={user_id}', None),
+        ('GET', f'/api/v1/starred?user_id={user_id}&hydrate=1', None),
+        ('POST', '/api/v1/starred', {'user_id': user_id, 'item_type': 'location', 'item_id': location.id}),
+        ('POST', '/api/v1/starred/batch', {'user_id': user_id, 'items': items}),
+        ('DELETE', '/api/v1/starred/batch', {'user_id': user_id, 'items': items}),
+        ('GET', '/api/v1/courses', None),
+        ('GET', '/api/v1/courses?shape=normalized', None),
+        ('GET', '/api/v1/courses?search=zzzqqq', None),
+        ('GET', '/api/v1/autocomplete?q=intro', None),
+        ('GET', '/api/v1/search/fuzzy?q=calclus', None),
+        ('GET', f'/api/v1/user/courses?user_id={user_id}', None),
+        ('POST', '/api/v1/user/courses', {'user_id': user_id, 'course_id': course.id}),
+        ('POST', '/api/v1/user/courses/batch', {'user_id': user_id, 'course_ids': course_ids}),
+        ('DELETE', '/api/v1/user/courses/batch', {'user_id': user_id, 'course_ids': course_ids}),
+        ('GET', f'/api/v1/courses/{course.id}', None),
+        ('POST', f'/api/v1/courses/{course.id}/posts', {'content': 'Budget check'}),
+        ('GET', '/api/v1/course-posts/pending', None),
+        ('GET', '/api/v1/departments', None),
+    ]
+
+
+def check_budgets(app):
+    """Request every route from requests_to_check() on cold caches.
+
+    Returns (results, unchecked): (method, path, status, overrun) per request,
+    status None and overrun the QueryBudgetExceeded where the budget was
+    exceeded; and the budgeted endpoints no request reached.
+    """
+    client = app.app.test_client()
+    results = []
+    checked = set()
+
+    for method, path, body in requests_to_check(app):
+        checked.add(app.app.url_map.bind('').match(path.split('?')[0], method=method)[0])
+        # Cold caches are the expensive case
+        app.result_cache.clear()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = client.open(path, method=method, json=body)
+        except QueryBudgetExceeded as e:
+            results.append((method, path, None, e))
+            continue
+        results.append((method, path, response.status_code, None))
+
+    unchecked = sorted(
+        name for name, view in app.app.view_functions.items()
+        if getattr(view, 'query_budget', None) is not None and name not in checked
+    )
+    return results, unchecked
+
+
+if __name__ == '__main__':
+    app = load_seeded_app()
+    results, unchecked = check_budgets(app)
+    failures = 0
+    for method, path, status_code, overrun in results:
+        if overrun is not None:
+            failures += 1
+            print(f"❌ {method} {path}: {overrun}")
+            continue
+        status = '✅' if status_code < 400 else '⚠️ '
+        print(f"{status} {method} {path} ({status_code})")
+
+    if unchecked:
+        print(f"\n⚠️  Budgeted endpoints not exercised: {', '.join(unchecked)}")
+
+    print(f"\n{'❌' if failures else '✅'} {failures} endpoint(s) over budget")
+    sys.exit(1 if failures else 0)
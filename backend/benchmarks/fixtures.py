@@ -0,0 +1,36 @@
+"""
+Shared setup for benchmarks: the app on a throwaway SQLite file holding the
+seed data plus the scraped course catalog from courses_data.json.
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COURSES_FILE = os.path.join(BACKEND_DIR, 'courses_data.json')
+
+
+def load_catalog_app():
+    """Import app against a temp database seeded with the sample data and
+    the scraped catalog.
+
+    Must run before anything else imports app, since app binds its database
+    at import time.
+    """
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        from scrape_courses import Course, import_to_database
+
+        app.init_database()
+        with app.app.app_context():
+            app.seed_database()
+
+        with open(COURSES_FILE) as f:
+            import_to_database([Course(data) for data in json.load(f)])
+
+    return app
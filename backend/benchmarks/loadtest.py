@@ -0,0 +1,386 @@
+"""
+HTTP load test: virtual users run scripted journeys against a live server.
+
+Run from backend/:
+  python -m benchmarks.loadtest run --spawn --workers 4 --concurrency 16 --duration 30 --out after.json
+  python -m benchmarks.loadtest run --url http://127.0.0.1:5000 --concurrency 8
+  python -m benchmarks.loadtest compare before.json after.json
+
+`--spawn` starts gunicorn on a free local port with the current environment
+(point DATABASE_URL at a generate_data.py database for realistic volume).
+`compare` exits non-zero when an endpoint regressed, so it can gate a deploy.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote, urlsplit
+
+from benchmarks.bench_autocomplete import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Flag a regression when p95 grows or throughput drops by more than this share...
+REGRESSION_THRESHOLD = 0.10
+# ...and p95 grew by at least this many ms, so sub-millisecond noise isn't flagged
+REGRESSION_MIN_MS = 2.0
+# Error rate increase, in percentage points, that counts as a regression
+REGRESSION_ERROR_POINTS = 1.0
+
+
+class Client:
+    """One keep-alive connection per virtual user; records every request"""
+
+    def __init__(self, base_url, record):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.record = record
+        self.connection = None
+
+    def request(self, method, path, label=None, body=None):
+        """Returns the decoded JSON body, or None when the request failed"""
+        headers = {'Accept-Encoding': 'identity'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+
+        label = f'{method} {label or path}'
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            status, data = None, b''
+        elapsed = (time.perf_counter() - start) * 1000
+
+        ok = status is not None and status < 400
+        self.record(label, elapsed, ok)
+        if not ok:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class Catalog:
+    """Ids and search terms discovered from the server before the run"""
+
+    def __init__(self, client, user_ids):
+        locations = client.request('GET', '/api/v1/locations?fields=id') or []
+        courses = (client.request('GET', '/api/v1/courses?fields=id,title') or {}).get('courses', [])
+        if not locations or not courses:
+            raise SystemExit("❌ Server returned no locations or courses to drive the journeys")
+
+        self.location_ids = [location['id'] for location in locations]
+        self.course_ids = [course['id'] for course in courses]
+        words = sorted({word for course in courses for word in course['title'].split() if len(word) > 3})
+        self.search_terms = words[:2000]
+
+        if user_ids:
+            self.user_ids = user_ids
+        else:
+            login = client.request('POST', '/api/v1/auth/login',
+                                   body={'username': 'student', 'password': 'student123'})
+            if not login:
+                raise SystemExit("❌ Demo login failed; pass --user-ids")
+            self.user_ids = [login['user']['id']]
+
+
+# Journeys: what one visit does, in order. Each step is (method, path, label, body).
+
+def open_map(rng, catalog):
+    return [
+        ('GET', '/api/v1/colleges', None, None),
+        ('GET', '/api/v1/locations', None, None),
+        ('GET', '/api/v1/events', None, None),
+    ]
+
+
+def search_courses(rng, catalog):
+    term = rng.choice(catalog.search_terms)
+    steps = [('GET', f'/api/v1/autocomplete?q={quote(term[:n])}', '/api/v1/autocomplete', None)
+             for n in range(2, min(len(term), 5) + 1)]
+    steps.append(('GET', f'/api/v1/courses?search={quote(term)}', '/api/v1/courses?search', None))
+    return steps
+
+
+def open_location(rng, catalog):
+    location_id = rng.choice(catalog.location_ids)
+    return [('GET', f'/api/v1/locations/{location_id}', '/api/v1/locations/<id>', None)]
+
+
+def post_update(rng, catalog):
+    location_id = rng.choice(catalog.location_ids)
+    return [
+        ('GET', f'/api/v1/locations/{location_id}', '/api/v1/locations/<id>', None),
+        ('POST', f'/api/v1/locations/{location_id}/posts', '/api/v1/locations/<id>/posts',
+         {'content': 'Line out the door', 'post_type': 'temporary'}),
+    ]
+
+
+def star_item(rng, catalog):
+    user_id = rng.choice(catalog.user_ids)
+    if rng.random() < 0.5:
+        item = {'item_type': 'location', 'item_id': rng.choice(catalog.location_ids)}
+    else:
+        item = {'item_type': 'course', 'item_id': rng.choice(catalog.course_ids)}
+    return [
+        ('POST', '/api/v1/starred', None, {'user_id': user_id, **item}),
+        ('GET', f'/api/v1/starred?user_id={user_id}&hydrate=1', '/api/v1/starred?hydrate', None),
+    ]
+
+
+def add_course(rng, catalog):
+    user_id = rng.choice(catalog.user_ids)
+    return [
+        ('GET', f'/api/v1/courses?search={quote(rng.choice(catalog.search_terms))}', '/api/v1/courses?search', None),
+        ('POST', '/api/v1/user/courses', None, {'user_id': user_id, 'course_id': rng.choice(catalog.course_ids)}),
+        ('GET', f'/api/v1/user/courses?user_id={user_id}', '/api/v1/user/courses', None),
+    ]
+
+
+# (journey, weight): mostly browsing, with a steady trickle of writes
+JOURNEYS = [
+    (open_map, 30),
+    (search_courses, 25),
+    (open_location, 25),
+    (post_update, 8),
+    (star_item, 7),
+    (add_course, 5),
+]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def __call__(self, label, elapsed, ok):
+        with self._lock:
+            self.samples[label].append(elapsed)
+            if not ok:
+                self.errors[label] += 1
+
+
+def run_load(base_url, concurrency, duration, think, seed, user_ids):
+    recorder = Recorder()
+    catalog = Catalog(Client(base_url, lambda *args: None), user_ids)
+    journeys, weights = zip(*JOURNEYS)
+    journey_counts = defaultdict(int)
+    counts_lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline = None
+
+    def virtual_user(number):
+        rng = random.Random(seed * 1000 + number)
+        client = Client(base_url, recorder)
+        start_barrier.wait()
+        while time.perf_counter() < deadline:
+            journey = rng.choices(journeys, weights)[0]
+            for method, path, label, body in journey(rng, catalog):
+                client.request(method, path, label, body)
+            with counts_lock:
+                journey_counts[journey.__name__] += 1
+            if think:
+                time.sleep(rng.expovariate(1 / think))
+        client.close()
+
+    threads = [threading.Thread(target=virtual_user, args=(n,), daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return summarize(recorder, elapsed, dict(journey_counts), {
+        'url': base_url, 'concurrency': concurrency, 'duration': duration, 'think': think, 'seed': seed
+    })
+
+
+def endpoint_stats(samples, errors, elapsed):
+    samples = sorted(samples)
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / elapsed, 2),
+        'p50': round(percentile(samples, 0.5), 2),
+        'p95': round(percentile(samples, 0.95), 2),
+        'p99': round(percentile(samples, 0.99), 2),
+        'error_rate': round(errors / len(samples), 4),
+    }
+
+
+def summarize(recorder, elapsed, journeys, settings):
+    endpoints = {
+        label: endpoint_stats(samples, recorder.errors[label], elapsed)
+        for label, samples in sorted(recorder.samples.items())
+    }
+    every = [value for samples in recorder.samples.values() for value in samples]
+    total = endpoint_stats(every, sum(recorder.errors.values()), elapsed) if every else None
+    return {'settings': settings, 'elapsed': round(elapsed, 2), 'journeys': journeys,
+            'endpoints': endpoints, 'total': total}
+
+
+def print_report(result):
+    print(f"\n{'endpoint':<44} {'requests':>9} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    rows = list(result['endpoints'].items())
+    if result['total']:
+        rows.append(('all', result['total']))
+    for label, stats in rows:
+        print(f"{label:<44} {stats['requests']:>9} {stats['rps']:>8.1f} {stats['p50']:>8.2f} "
+              f"{stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['error_rate']:>7.2%}")
+    print("\njourneys: " + ', '.join(f'{name} {count}' for name, count in sorted(result['journeys'].items())))
+
+
+def find_regressions(before, after, threshold=REGRESSION_THRESHOLD):
+    """(endpoint, message) for every endpoint that got slower, slower to serve, or less reliable"""
+    regressions = []
+    for label, new in after['endpoints'].items():
+        old = before['endpoints'].get(label)
+        if old is None:
+            continue
+        if new['p95'] > old['p95'] * (1 + threshold) and new['p95'] - old['p95'] >= REGRESSION_MIN_MS:
+            regressions.append((label, f"p95 {old['p95']:.2f} -> {new['p95']:.2f} ms"))
+        if new['rps'] < old['rps'] * (1 - threshold):
+            regressions.append((label, f"rps {old['rps']:.1f} -> {new['rps']:.1f}"))
+        if (new['error_rate'] - old['error_rate']) * 100 >= REGRESSION_ERROR_POINTS:
+            regressions.append((label, f"errors {old['error_rate']:.2%} -> {new['error_rate']:.2%}"))
+    return regressions
+
+
+def compare(before, after, threshold):
+    print(f"{'endpoint':<44} {'p95 before':>10} {'p95 after':>10} {'change':>8} {'rps before':>10} {'rps after':>10}")
+    for label, new in after['endpoints'].items():
+        old = before['endpoints'].get(label)
+        if old is None:
+            print(f"{label:<44} {'-':>10} {new['p95']:>10.2f} {'new':>8} {'-':>10} {new['rps']:>10.1f}")
+            continue
+        change = (new['p95'] - old['p95']) / old['p95'] if old['p95'] else 0.0
+        print(f"{label:<44} {old['p95']:>10.2f} {new['p95']:>10.2f} {change:>+8.1%} "
+              f"{old['rps']:>10.1f} {new['rps']:>10.1f}")
+
+    regressions = find_regressions(before, after, threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s):")
+        for label, message in regressions:
+            print(f"   {label}: {message}")
+    else:
+        print("\n✅ No regressions")
+    return regressions
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_gunicorn(workers, port):
+    """Start gunicorn with the backend's gunicorn.conf.py and wait until it answers"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers), '-b', f'127.0.0.1:{port}'],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"❌ gunicorn exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/api/v1/colleges')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("❌ gunicorn did not start within 120 s")
+
+
+def parse_user_ids(value):
+    """'3-20002' or '1,2,5'"""
+    if '-' in value:
+        low, high = value.split('-')
+        return list(range(int(low), int(high) + 1))
+    return [int(part) for part in value.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the API with scripted user journeys')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run')
+    run.add_argument('--url', default='http://127.0.0.1:5000')
+    run.add_argument('--spawn', action='store_true', help='start a local gunicorn instead of using --url')
+    run.add_argument('--workers', type=int, default=4, help='gunicorn workers with --spawn')
+    run.add_argument('--concurrency', type=int, default=16, help='virtual users')
+    run.add_argument('--duration', type=float, default=30, help='seconds')
+    run.add_argument('--think', type=float, default=0, help='mean pause between journeys, seconds')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--user-ids', type=parse_user_ids, help="users for writes, e.g. 3-20002; default logs in as the demo student")
+    run.add_argument('--out', help='save the results as JSON for compare')
+
+    diff = commands.add_parser('compare')
+    diff.add_argument('before')
+    diff.add_argument('after')
+    diff.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.before) as f:
+            before = json.load(f)
+        with open(args.after) as f:
+            after = json.load(f)
+        return 1 if compare(before, after, args.threshold) else 0
+
+    server = None
+    url = args.url
+    if args.spawn:
+        port = free_port()
+        server = spawn_gunicorn(args.workers, port)
+        url = f'http://127.0.0.1:{port}'
+    try:
+        print(f"🚀 {args.concurrency} virtual users for {args.duration:.0f} s against {url}")
+        result = run_load(url, args.concurrency, args.duration, args.think, args.seed, args.user_ids)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(result)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Saved to {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Staged catalog imports for SQLite.
+
+An import runs against a private copy of the database instead of the live
+file, so the long write transaction never touches what the workers read.
+Once the copy passes verification, the catalog tables are replaced in the
+live database in one short transaction that also bumps their table versions.
+That transaction first checks that nothing wrote to the live catalog since
+the copy was taken (API writes, other importers); if something did, the
+import is re-run on a fresh copy rather than overwriting that write.
+Under WAL, readers keep their snapshot while that transaction runs and see
+the new catalog on their next query; cached responses and search indexes
+pick it up through the version bump, so no worker needs a restart.
+
+Renaming the staging file over the live one is not an option: open
+connections and the WAL file would keep pointing at the old inode.
+"""
+
+import os
+import sqlite3
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+# Written mostly by the importers; user data (posts, stars, events) stays live
+CATALOG_TABLES = ('college', 'department', 'location', 'course', 'building_footprint')
+APPEND_ONLY_TABLES = ('college', 'department', 'location', 'course')
+
+# Imports run again on a fresh copy when the live catalog changed meanwhile
+IMPORT_ATTEMPTS = 3
+
+
+# Set in the info of sessions writing to a staging copy, so hooks that track
+# writes to the live database (table versions, invalidations) leave them alone
+STAGING_SESSION_INFO = 'catalog_staging'
+
+
+class StagingVerificationError(Exception):
+    pass
+
+
+class CatalogChangedError(Exception):
+    """The live catalog was written after the staging copy was taken"""
+
+
+def database_path(engine):
+    if engine.dialect.name != 'sqlite' or not engine.url.database or engine.url.database == ':memory:':
+        raise ValueError("Staged imports need a file-backed SQLite database")
+    return engine.url.database
+
+
+def create_staging_copy(live_path):
+    """Consistent copy of the live database next to it, via the backup API"""
+    staging_path = f'{live_path}.staging-{os.getpid()}'
+    if os.path.exists(staging_path):
+        os.remove(staging_path)
+
+    source = sqlite3.connect(live_path)
+    target = sqlite3.connect(staging_path)
+    try:
+        source.backup(target)
+        # A single file is easier to verify and attach than one with a WAL
+        target.execute('PRAGMA journal_mode=delete')
+    finally:
+        target.close()
+        source.close()
+    return staging_path
+
+
+def table_counts(connection, schema='main'):
+    return {
+        table: connection.execute(text(f'SELECT COUNT(*) FROM {schema}.{table}')).scalar()
+        for table in CATALOG_TABLES
+    }
+
+
+def catalog_state(connection, load_versions):
+    """(table versions, row counts) of the catalog, to tell whether anything wrote to it"""
+    return load_versions(connection), table_counts(connection)
+
+
+def check_integrity(staging_engine):
+    with staging_engine.connect() as connection:
+        result = connection.execute(text('PRAGMA integrity_check')).scalar()
+    if result != 'ok':
+        raise StagingVerificationError(f"integrity_check failed: {result}")
+
+
+def verify_counts(counts, live_counts):
+    """Refuse a staging catalog that lost rows the live one has.
+
+    The importers only add or update these tables, so any of them shrinking
+    means the build went wrong somewhere. Footprints are exempt: a building
+    that lost its outline loses its footprint.
+    """
+    for table in APPEND_ONLY_TABLES:
+        if counts[table] < live_counts[table]:
+            raise StagingVerificationError(
+                f"{table} would shrink from {live_counts[table]} to {counts[table]} rows"
+            )
+
+
+def swap_in(live_engine, staging_path, metadata, bump_versions, load_versions, copied_state):
+    """Replace the live catalog tables with the staging ones in one transaction.
+
+    The write lock is taken before anything is checked, so no other writer
+    can commit between the checks and the swap. Raises CatalogChangedError,
+    leaving the live database untouched, if the catalog is no longer in
+    copied_state. Returns the catalog row counts now live.
+    """
+    with live_engine.connect() as connection:
+        # ATTACH is not allowed inside a transaction
+        connection.exec_driver_sql('ATTACH DATABASE ? AS staging', (staging_path,))
+        try:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+            live_state = catalog_state(connection, load_versions)
+            if live_state != copied_state:
+                raise CatalogChangedError("Catalog tables were written while the import ran")
+
+            counts = table_counts(connection, 'staging')
+            verify_counts(counts, live_state[1])
+            for name in CATALOG_TABLES:
+                columns = ', '.join(f'"{column.name}"' for column in metadata.tables[name].columns)
+                connection.exec_driver_sql(f'DELETE FROM main."{name}"')
+                connection.exec_driver_sql(
+                    f'INSERT INTO main."{name}" ({columns}) SELECT {columns} FROM staging."{name}"'
+                )
+            bump_versions(connection, set(CATALOG_TABLES))
+            connection.commit()
+            return counts
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.exec_driver_sql('DETACH DATABASE staging')
+
+
+def staged_import(live_engine, metadata, import_into, bump_versions, load_versions, attempts=IMPORT_ATTEMPTS):
+    """Run import_into(session) against a staging copy and swap the result in.
+
+    load_versions(connection) returns the catalog tables' versions, which
+    every write bumps. If the live catalog was written while the import ran,
+    swapping the copy in would lose that write, so the import is run again
+    on a fresh copy, up to `attempts` times in all. Returns the catalog row
+    counts now live. The staging file is removed whether or not the import
+    succeeds.
+    """
+    live_path = database_path(live_engine)
+    for attempt in range(1, attempts + 1):
+        staging_path = create_staging_copy(live_path)
+        staging_engine = create_engine(f'sqlite:///{staging_path}')
+        try:
+            with staging_engine.connect() as connection:
+                copied_state = catalog_state(connection, load_versions)
+            with Session(staging_engine, info={STAGING_SESSION_INFO: True}) as session:
+                import_into(session)
+                session.commit()
+
+            check_integrity(staging_engine)
+            staging_engine.dispose()
+            try:
+                return swap_in(live_engine, staging_path, metadata, bump_versions, load_versions, copied_state)
+            except CatalogChangedError:
+                if attempt == attempts:
+                    raise
+                print(f"⚠️  Catalog changed during the import, retrying ({attempt}/{attempts})")
+        finally:
+            staging_engine.dispose()
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
@@ -0,0 +1,84 @@
+"""
+Engine profile: pool sizing and the SQLite pragmas applied to every connection.
+
+The defaults suit several gunicorn workers sharing one SQLite file: WAL lets
+readers run alongside the single writer, synchronous=NORMAL drops the fsync
+on every commit (WAL stays crash-safe, a power loss can only lose the last
+commits), and busy_timeout makes a writer wait for the lock instead of
+failing with "database is locked". Every setting can be overridden from the
+environment.
+"""
+
+import os
+
+from sqlalchemy import event
+
+DEFAULT_PROFILE = {
+    'SQLITE_JOURNAL_MODE': 'wal',
+    'SQLITE_SYNCHRONOUS': 'normal',
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,
+    'SQLITE_MMAP_SIZE': 256 * 1024 * 1024,
+    # Negative means KiB, so this is a 64 MiB page cache per connection
+    'SQLITE_CACHE_SIZE': -64 * 1024,
+    'DB_POOL_SIZE': 10,
+    'DB_MAX_OVERFLOW': 20,
+    'DB_POOL_TIMEOUT': 30,
+}
+
+
+def is_sqlite_file(uri):
+    return uri.startswith('sqlite') and ':memory:' not in uri and uri.rstrip('/') != 'sqlite:'
+
+
+def configure_engine(app):
+    """Fill in the engine profile; call before SQLAlchemy(app) reads the config"""
+    for name, default in DEFAULT_PROFILE.items():
+        value = os.environ.get(name)
+        if value is not None:
+            app.config[name] = type(default)(value)
+        else:
+            app.config.setdefault(name, default)
+
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if uri.startswith('sqlite') and not is_sqlite_file(uri):
+        # In-memory databases use a single static connection, no pool to size
+        return
+
+    options.setdefault('pool_size', app.config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', app.config['DB_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', app.config['DB_POOL_TIMEOUT'])
+    if uri.startswith('sqlite'):
+        connect_args = options.setdefault('connect_args', {})
+        # The driver's own lock wait, in seconds; the pragma below covers
+        # statements the driver doesn't retry
+        connect_args.setdefault('timeout', app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000)
+    else:
+        options.setdefault('pool_pre_ping', True)
+
+
+def sqlite_pragmas(config):
+    """PRAGMA statements for a new connection, in the order they must run"""
+    return [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+    ]
+
+
+def install_sqlite_pragmas(engine, config):
+    """Run the profile's pragmas on every connection the engine opens"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
@@ -0,0 +1,74 @@
+"""
+Event start and end times. Events are entered as campus wall-clock strings
+("Oct 15, 2024 at 6:00 PM", or event_date "2024-10-15" plus event_time
+"6:00 PM"); they are stored as naive UTC datetimes like every other
+timestamp in the database.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+CAMPUS_TZ = ZoneInfo('America/Los_Angeles')
+
+# Events carry no end time; they're assumed to run this long
+DEFAULT_DURATION = timedelta(hours=2)
+
+DATE_TIME_FORMATS = ('%b %d, %Y at %I:%M %p', '%B %d, %Y at %I:%M %p', '%b %d, %Y')
+TIME_FORMATS = ('%I:%M %p', '%I:%M%p', '%I %p', '%H:%M')
+
+
+def to_utc(local):
+    """Naive campus wall-clock time as naive UTC"""
+    return local.replace(tzinfo=CAMPUS_TZ).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _parse(value, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_event_times(date_time=None, event_date=None, event_time=None):
+    """(start_at, end_at) in naive UTC from an event's strings, or (None, None).
+
+    An event with a date but no time is taken to last the whole day.
+    """
+    start = None
+    whole_day = False
+    if event_date:
+        day = _parse(event_date, ('%Y-%m-%d',))
+        clock = _parse(event_time, TIME_FORMATS) if event_time else None
+        if day and clock:
+            start = datetime.combine(day.date(), clock.time())
+        elif day and not event_time:
+            start, whole_day = day, True
+    if start is None and date_time:
+        start = _parse(date_time, DATE_TIME_FORMATS)
+        whole_day = start is not None and ' at ' not in date_time
+    if start is None:
+        return None, None
+
+    end = datetime.combine(start.date() + timedelta(days=1), time()) if whole_day else start + DEFAULT_DURATION
+    return to_utc(start), to_utc(end)
+
+
+def parse_query_time(value, end_of_day=False):
+    """A from/to query value as naive UTC.
+
+    Accepts an ISO date or datetime; dates and naive datetimes are campus
+    time. With end_of_day, a bare date means the end of that day. Raises
+    ValueError if the value doesn't parse.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if len(value) == 10 and end_of_day:
+        parsed += timedelta(days=1)
+    if parsed.tzinfo is None:
+        return to_utc(parsed)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def isoformat_utc(value):
+    return value.replace(tzinfo=timezone.utc).isoformat() if value else None
@@ -0,0 +1,377 @@
+"""
+Synthetic data generator for load and scale testing
+Run: DATABASE_URL=sqlite:////tmp/scale.db python generate_data.py --courses 100000 --location-posts 1000000
+
+Fills every model on top of the seed rows, deterministically for a given
+--seed and --now. Vocabulary (departments, titles, instructors, buildings)
+comes from the scraped catalog so search and autocomplete behave like they
+do on real data. Popularity is skewed the way real traffic is: a few
+buildings and courses collect most posts, stars and enrollments.
+
+Rows are written with Core executemany in large batches, one transaction
+per table; table versions are bumped once at the end.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+from operator import itemgetter
+
+from sqlalchemy import func
+
+import event_times
+from app import (app, db, init_database, seed_database, hash_password, bump_table_versions, User, College,
+                 Location, LocationPost, Event, Department, Course, CoursePost, StarredItem, UserCourse)
+
+COURSES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'courses_data.json')
+BATCH_SIZE = 50000
+
+# Center of the 5Cs and the spread of generated buildings around it, in degrees
+CAMPUS_CENTER = (34.1000, -117.7085)
+CAMPUS_SPREAD = 0.004
+
+CATEGORIES = {'academic': 45, 'residential': 25, 'dining': 8, 'recreation': 7, 'library': 5, 'other': 10}
+BUILDING_KINDS = ['Hall', 'Center', 'Building', 'Commons', 'House', 'Lab', 'Annex', 'Pavilion']
+EVENT_TYPES = {'fun': 35, 'academic': 25, 'career': 10, 'club': 20, 'sports': 10}
+DAY_PATTERNS = {'MW': 30, 'TR': 30, 'MWF': 20, 'F': 5, 'M': 5, 'T': 5, 'W': 5}
+TIME_SLOTS = ['08:10AM-09:25AM', '09:35AM-10:50AM', '11:00AM-12:15PM', '01:15PM-02:30PM',
+              '02:45PM-04:00PM', '04:15PM-05:30PM', '07:00PM-09:50PM']
+POST_TEXT = [
+    'Line out the door right now', 'Quiet, plenty of seats', 'Free pizza in the lobby',
+    'Wifi is down on the second floor', 'Study room 204 is open', 'Fire alarm test at 3',
+    'Great tacos today', 'Elevator out of service', 'Lost a blue water bottle here',
+    'Office hours moved to the lounge', 'Midterm review session tonight', 'Problem set 4 posted',
+]
+
+
+def zipf_cum_weights(n, s=1.1):
+    """Cumulative weights for rank-based popularity: item k gets 1 / (k+1)^s"""
+    return list(accumulate(1 / (rank + 1) ** s for rank in range(n)))
+
+
+def stamp(value):
+    """Datetimes in the format SQLAlchemy stores them in on SQLite"""
+    return value.isoformat(' ', 'microseconds')
+
+
+def weighted_cum(weights):
+    return list(weights), list(accumulate(weights.values()))
+
+
+def load_vocabulary():
+    with open(COURSES_FILE) as f:
+        catalog = json.load(f)
+    return {
+        'departments': sorted({c['department'] for c in catalog if c['department']}),
+        'titles': [c['title'] for c in catalog if c['title']],
+        'title_words': sorted({w for c in catalog for w in c['title'].split() if len(w) > 3}),
+        'instructors': sorted({c['instructors'] for c in catalog if c['instructors']}),
+        'buildings': sorted({c['building'] for c in catalog if c['building']}),
+    }
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = args.now
+        self.vocab = load_vocabulary()
+        self.counts = {}
+
+    def insert(self, model, rows):
+        """Write rows in BATCH_SIZE executemany batches, one transaction per table.
+
+        Statements go straight to the driver: SQLAlchemy's per-value bind
+        processing would cost more than generating the rows.
+        """
+        table = model.__table__
+        total = 0
+        with db.engine.begin() as connection:
+            compiled = table.insert().compile(dialect=connection.dialect, column_keys=[c.name for c in table.columns])
+            if compiled.positional:
+                order = itemgetter(*compiled.positiontup)
+                prepare = lambda batch: [order(row) for row in batch]
+            else:
+                prepare = lambda batch: batch
+
+            while True:
+                batch = list(islice(rows, BATCH_SIZE))
+                if not batch:
+                    break
+                connection.exec_driver_sql(compiled.string, prepare(batch))
+                total += len(batch)
+        self.counts[table.name] = total
+        return total
+
+    def next_id(self, model):
+        return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+    def timestamp(self, days_back):
+        """A time within the last `days_back` days, skewed towards recent"""
+        return self.now - timedelta(seconds=days_back * 86400 * self.rng.random() ** 2)
+
+    def ids(self, start, count):
+        return range(start, start + count)
+
+    def users(self):
+        colleges = [name for name, in db.session.query(College.name).order_by(College.id)]
+        # Hashing is deliberately slow; every generated user shares one password
+        password_hash = hash_password('password')
+        first = self.next_id(User)
+        self.user_ids = self.ids(first, self.args.users)
+
+        def rows():
+            for user_id in self.user_ids:
+                yield {
+                    'id': user_id,
+                    'username': f'user{user_id:07d}',
+                    'password_hash': password_hash,
+                    'name': f'Student {user_id}',
+                    'email': f'user{user_id:07d}@example.edu',
+                    'role': 'admin' if self.rng.random() < 0.001 else 'student',
+                    'college': self.rng.choice(colleges),
+                    'created_at': stamp(self.timestamp(730)),
+                }
+        return self.insert(User, rows())
+
+    def locations(self):
+        self.college_ids = [college_id for college_id, in db.session.query(College.id).order_by(College.id)]
+        categories, category_weights = weighted_cum(CATEGORIES)
+        buildings = self.vocab['buildings']
+        first = self.next_id(Location)
+        self.location_ids = self.ids(first, self.args.locations)
+        self.location_popularity = zipf_cum_weights(len(self.location_ids))
+
+        def rows():
+            for location_id in self.location_ids:
+                base = buildings[location_id % len(buildings)]
+                kind = self.rng.choice(BUILDING_KINDS)
+                yield {
+                    'id': location_id,
+                    'name': f'{base} {kind} {location_id}',
+                    'latitude': self.rng.gauss(CAMPUS_CENTER[0], CAMPUS_SPREAD),
+                    'longitude': self.rng.gauss(CAMPUS_CENTER[1], CAMPUS_SPREAD),
+                    'category': self.rng.choices(categories, cum_weights=category_weights)[0],
+                    'college_id': self.rng.choice(self.college_ids),
+                    'description': f'{kind} at {base}',
+                    'fun_facts': '[]',
+                    'osm_id': None,
+                    'created_at': stamp(self.timestamp(365)),
+                }
+        return self.insert(Location, rows())
+
+    def popular_location(self):
+        return self.rng.choices(self.location_ids, cum_weights=self.location_popularity)[0]
+
+    def departments(self):
+        first = self.next_id(Department)
+
+        def rows():
+            department_id = first
+            for college_id in self.college_ids:
+                for code in self.vocab['departments']:
+                    yield {'id': department_id, 'name': code.title(), 'code': code, 'college_id': college_id,
+                           'created_at': stamp(self.now)}
+                    department_id += 1
+        return self.insert(Department, rows())
+
+    def courses(self):
+        days, day_weights = weighted_cum(DAY_PATTERNS)
+        college_codes = dict(db.session.query(College.id, College.code))
+        departments = self.vocab['departments']
+        titles = self.vocab['titles']
+        words = self.vocab['title_words']
+        instructors = self.vocab['instructors']
+        instructor_popularity = zipf_cum_weights(len(instructors), s=0.8)
+        first = self.next_id(Course)
+        self.course_ids = self.ids(first, self.args.courses)
+        self.course_popularity = zipf_cum_weights(len(self.course_ids))
+
+        def rows():
+            course_id = first
+            last = first + self.args.courses
+            while course_id < last:
+                department = self.rng.choice(departments)
+                college_id = self.rng.choice(self.college_ids)
+                code = f'{department}{self.rng.randrange(1, 200):03d}{self.rng.choice("ABCDEF ")}'.strip()
+                code = f'{code} {college_codes[college_id]}'
+                if self.rng.random() < 0.5:
+                    title = self.rng.choice(titles)
+                else:
+                    title = ' '.join(self.rng.sample(words, self.rng.randint(2, 4)))
+                # Most courses have one section, large intro courses up to four
+                sections = min(self.rng.choice((1, 1, 1, 2, 2, 3, 4)), last - course_id)
+                for section in range(1, sections + 1):
+                    capacity = self.rng.choice((15, 20, 25, 30, 40, 60, 120))
+                    enrolled = min(capacity + 5, int(capacity * self.rng.betavariate(5, 2)))
+                    yield {
+                        'id': course_id,
+                        'course_code': code,
+                        'section': f'{section:02d}',
+                        'title': title,
+                        'department_code': department,
+                        'college_id': college_id,
+                        # Like the scraped catalog, most sections have no mapped building
+                        'location_id': self.popular_location() if self.rng.random() < 0.3 else None,
+                        'instructors': self.rng.choices(instructors, cum_weights=instructor_popularity)[0],
+                        'days': self.rng.choices(days, cum_weights=day_weights)[0],
+                        'time': self.rng.choice(TIME_SLOTS),
+                        'seats_available': f'{capacity - enrolled}/{capacity}',
+                        'credit': self.rng.choice(('1.00', '1.00', '1.00', '0.50', '0.25')),
+                        'semester': 'Fall 2024',
+                        'notes': '',
+                        'created_at': stamp(self.now),
+                    }
+                    course_id += 1
+        return self.insert(Course, rows())
+
+    def post_rows(self, first, parent_key, parents):
+        """Location and course posts: mostly short-lived, skewed to popular parents"""
+        three_hours = timedelta(hours=3)
+        for post_id, parent_id in enumerate(parents, first):
+            created_at = self.timestamp(120)
+            if self.rng.random() < 0.7:
+                post_type = 'temporary'
+                expires_at = created_at + three_hours
+                status = 'approved' if expires_at > self.now else 'expired'
+                expires_at = stamp(expires_at)
+            else:
+                post_type = 'permanent'
+                expires_at = None
+                status = 'approved' if self.rng.random() < 0.8 else 'pending'
+            yield {
+                'id': post_id,
+                parent_key: parent_id,
+                'content': self.rng.choice(POST_TEXT),
+                'post_type': post_type,
+                'status': status,
+                'created_by': 'Anonymous' if self.rng.random() < 0.6 else f'user{self.rng.choice(self.user_ids):07d}',
+                'expires_at': expires_at,
+                'created_at': stamp(created_at),
+            }
+
+    def location_posts(self):
+        parents = self.rng.choices(self.location_ids, cum_weights=self.location_popularity, k=self.args.location_posts)
+        return self.insert(LocationPost, self.post_rows(self.next_id(LocationPost), 'location_id', parents))
+
+    def course_posts(self):
+        parents = self.rng.choices(self.course_ids, cum_weights=self.course_popularity, k=self.args.course_posts)
+        return self.insert(CoursePost, self.post_rows(self.next_id(CoursePost), 'course_id', parents))
+
+    def events(self):
+        event_types, type_weights = weighted_cum(EVENT_TYPES)
+
+        self.event_ids = self.ids(self.next_id(Event), self.args.events)
+
+        def rows():
+            for event_id in self.event_ids:
+                # Half past, half upcoming within the next two months
+                when = self.now + timedelta(days=self.rng.uniform(-60, 60), hours=self.rng.randrange(8, 22))
+                when = when.replace(minute=self.rng.choice((0, 30)), second=0, microsecond=0)
+                event_time = when.strftime('%I:%M %p').lstrip('0')
+                yield {
+                    'id': event_id,
+                    'title': ' '.join(self.rng.sample(self.vocab['title_words'], 2)).title(),
+                    'event_type': self.rng.choices(event_types, cum_weights=type_weights)[0],
+                    'date_time': f"{when.strftime('%b %d, %Y')} at {event_time}",
+                    'event_date': when.strftime('%Y-%m-%d'),
+                    'event_time': event_time,
+                    'start_at': stamp(event_times.to_utc(when)),
+                    'end_at': stamp(event_times.to_utc(when + event_times.DEFAULT_DURATION)),
+                    'location_id': self.popular_location(),
+                    'description': self.rng.choice(POST_TEXT),
+                    'status': 'approved' if self.rng.random() < 0.85 else 'pending',
+                    'created_by': f'user{self.rng.choice(self.user_ids):07d}',
+                    'created_at': stamp(self.timestamp(90)),
+                }
+        return self.insert(Event, rows())
+
+    def per_user(self, mean, pick):
+        """Distinct picks per user; counts are geometric around `mean`"""
+        for user_id in self.user_ids:
+            count = 0
+            while self.rng.random() < mean / (mean + 1):
+                count += 1
+            yield user_id, {pick() for _ in range(count)}
+
+    def starred_items(self):
+        pickers = [
+            ('location', 45, self.popular_location),
+            ('course', 40, lambda: self.rng.choices(self.course_ids, cum_weights=self.course_popularity)[0]),
+            ('event', 15, lambda: self.rng.choice(self.event_ids)),
+        ]
+        item_weights = list(accumulate(weight for _, weight, _ in pickers))
+
+        def pick():
+            item_type, _, picker = self.rng.choices(pickers, cum_weights=item_weights)[0]
+            return item_type, picker()
+
+        first = self.next_id(StarredItem)
+
+        def rows():
+            star_id = first
+            for user_id, items in self.per_user(self.args.stars_per_user, pick):
+                for item_type, item_id in sorted(items):
+                    yield {'id': star_id, 'user_id': user_id, 'item_type': item_type, 'item_id': item_id,
+                           'created_at': stamp(self.timestamp(120))}
+                    star_id += 1
+        return self.insert(StarredItem, rows())
+
+    def user_courses(self):
+        def pick():
+            return self.rng.choices(self.course_ids, cum_weights=self.course_popularity)[0]
+
+        first = self.next_id(UserCourse)
+
+        def rows():
+            user_course_id = first
+            for user_id, course_ids in self.per_user(self.args.courses_per_user, pick):
+                for course_id in sorted(course_ids):
+                    yield {'id': user_course_id, 'user_id': user_id, 'course_id': course_id,
+                           'created_at': stamp(self.timestamp(120))}
+                    user_course_id += 1
+        return self.insert(UserCourse, rows())
+
+    def run(self):
+        # Generated rows build on the sample colleges, so an empty database gets those first
+        seed_database()
+        steps = [self.users, self.locations, self.departments, self.courses, self.location_posts,
+                 self.course_posts, self.events, self.starred_items, self.user_courses]
+        total_start = time.perf_counter()
+        for step in steps:
+            start = time.perf_counter()
+            written = step()
+            print(f"✅ {step.__name__:<15} {written:>9,} rows in {time.perf_counter() - start:.1f}s")
+
+        with db.engine.begin() as connection:
+            bump_table_versions(connection, set(self.counts))
+        total = sum(self.counts.values())
+        print(f"\n🎉 Generated {total:,} rows in {time.perf_counter() - total_start:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fill the database with synthetic data')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--now', type=datetime.fromisoformat, default=datetime(2024, 10, 15, 12),
+                        help='reference time for timestamps and post expiry (ISO format)')
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--locations', type=int, default=2000)
+    parser.add_argument('--courses', type=int, default=100000)
+    parser.add_argument('--location-posts', type=int, default=500000)
+    parser.add_argument('--course-posts', type=int, default=500000)
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--stars-per-user', type=float, default=5)
+    parser.add_argument('--courses-per-user', type=float, default=4)
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print(f"🏗️  Generating into {app.config['SQLALCHEMY_DATABASE_URI']} (seed {args.seed})")
+    init_database()
+    with app.app_context():
+        Generator(args).run()
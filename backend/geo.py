@@ -0,0 +1,143 @@
+"""
+Geometry for building footprints: outlines stored as encoded polylines,
+simplified ahead of time for the zoom levels the map shows them at.
+
+Points are (lat, lon) pairs and an outline is a closed ring (first point
+repeated at the end). Encoding is Google's polyline algorithm at 1e-6
+degree precision (~0.1 m), which is what polyline decoders call
+"precision 6".
+"""
+
+import math
+
+# Zooms outlines are simplified for; BuildingFootprint has an outline_z<zoom>
+# column for each. Zoomed in past the last one, the full outline is served.
+FOOTPRINT_ZOOMS = (14, 15, 16, 17)
+# Allowed simplification error, in screen pixels at the zoom being drawn
+TOLERANCE_PIXELS = 0.5
+POLYLINE_PRECISION = 6
+
+EARTH_CIRCUMFERENCE = 40075016.686
+METERS_PER_DEGREE = EARTH_CIRCUMFERENCE / 360
+
+
+def meters_per_pixel(zoom, lat):
+    """Ground size of one 256-px-tile pixel at zoom and latitude"""
+    return EARTH_CIRCUMFERENCE * math.cos(math.radians(lat)) / (256 * 2 ** zoom)
+
+
+def footprint_level(zoom):
+    """The precomputed zoom to serve at zoom, or None for the full outline"""
+    if zoom > FOOTPRINT_ZOOMS[-1]:
+        return None
+    return max(FOOTPRINT_ZOOMS[0], zoom)
+
+
+def encode_polyline(points, precision=POLYLINE_PRECISION):
+    factor = 10 ** precision
+    chunks = []
+    last_lat = last_lon = 0
+    for lat, lon in points:
+        lat, lon = round(lat * factor), round(lon * factor)
+        for delta in (lat - last_lat, lon - last_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        last_lat, last_lon = lat, lon
+    return ''.join(chunks)
+
+
+def decode_polyline(encoded, precision=POLYLINE_PRECISION):
+    factor = 10 ** precision
+    points = []
+    index = lat = lon = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        points.append((lat / factor, lon / factor))
+    return points
+
+
+def ring_bounds(ring):
+    """(min_lat, min_lon, max_lat, max_lon)"""
+    lats = [lat for lat, _ in ring]
+    lons = [lon for _, lon in ring]
+    return min(lats), min(lons), max(lats), max(lons)
+
+
+def project(points, ref_lat):
+    """Points as (x, y) meters on a plane tangent at ref_lat; fine at campus scale"""
+    x_scale = METERS_PER_DEGREE * math.cos(math.radians(ref_lat))
+    return [(lon * x_scale, lat * METERS_PER_DEGREE) for lat, lon in points]
+
+
+def segment_distance(p, a, b):
+    """Distance from point p to the segment a-b, all (x, y) in the same plane units"""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length_sq))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def simplify_line(xy, tolerance):
+    """Indexes of the points Douglas-Peucker keeps from the line xy"""
+    keep = {0, len(xy) - 1}
+    stack = [(0, len(xy) - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, distance = None, tolerance
+        for i in range(first + 1, last):
+            d = segment_distance(xy[i], xy[first], xy[last])
+            if d > distance:
+                farthest, distance = i, d
+        if farthest is not None:
+            keep.add(farthest)
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return sorted(keep)
+
+
+def simplify_ring(ring, tolerance):
+    """The closed ring simplified to within tolerance meters.
+
+    Returns None when the ring collapses below a triangle, i.e. the building
+    is thinner than the tolerance.
+    """
+    xy = project(ring, ring[0][0])
+    # A closed ring has no endpoints to anchor on: split it at the vertex
+    # farthest from the first and simplify both halves
+    split = max(range(len(xy) - 1), key=lambda i: math.hypot(xy[i][0] - xy[0][0], xy[i][1] - xy[0][1]))
+    if split == 0:
+        return None
+    kept = simplify_line(xy[:split + 1], tolerance) + [split + i for i in simplify_line(xy[split:], tolerance)[1:]]
+    if len(kept) < 4:
+        return None
+    return [ring[i] for i in kept]
+
+
+def footprint(ring):
+    """Bounds and encoded outlines of a closed ring: the full outline plus one per FOOTPRINT_ZOOMS"""
+    min_lat, min_lon, max_lat, max_lon = ring_bounds(ring)
+    result = {
+        'min_lat': min_lat, 'min_lon': min_lon, 'max_lat': max_lat, 'max_lon': max_lon,
+        'outline': encode_polyline(ring)
+    }
+    for zoom in FOOTPRINT_ZOOMS:
+        simplified = simplify_ring(ring, TOLERANCE_PIXELS * meters_per_pixel(zoom, min_lat))
+        result[f'outline_z{zoom}'] = encode_polyline(simplified) if simplified else None
+    return result
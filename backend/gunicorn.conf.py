@@ -0,0 +1,26 @@
+"""
+gunicorn settings for the backend. Run from backend/: gunicorn -c gunicorn.conf.py
+
+The app is preloaded: create_app() runs once in the master, and workers are
+forked from it with the schema checked and the search indexes already built,
+sharing those pages copy-on-write instead of each rebuilding them.
+"""
+
+import gc
+import os
+
+wsgi_app = 'app:create_app(listen=False)'
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach, so collections
+    # in the workers don't write to (and so copy) the pages they share
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app
+    app.init_worker()
@@ -1,23 +1,39 @@
-import requests
+"""
+Import 5C buildings from OpenStreetMap into the locations table.
+Run from backend/: python import_osm_buildings.py [--file overpass.json] [--save-response overpass.json] [--staged] [--dry-run]
+
+Without --file the buildings are fetched live from the Overpass API;
+--save-response keeps that response so later runs can work offline from it.
+Buildings are keyed by OSM element id, so re-running the import updates
+the same rows instead of adding duplicates. Ways also bring their outline,
+stored as a BuildingFootprint simplified for each map zoom (see geo.py).
+"""
+
+import argparse
 import json
-from app import app, db, Location, College
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+import geo
+from app import app, db, init_database, dialect_insert, BuildingFootprint, Location, College, import_catalog_staged
 
 # Overpass API query for 5C buildings
-overpass_url = "https://overpass-api.de/api/interpreter"
-overpass_query = """
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+BBOX = (34.093, -117.714, 34.107, -117.704)
+OVERPASS_QUERY = """
 [out:json];
 (
-  node["name"]["building"](34.093,-117.714,34.107,-117.704);
-  way["name"]["building"](34.093,-117.714,34.107,-117.704);
+  node["name"]["building"]({0},{1},{2},{3});
+  way["name"]["building"]({0},{1},{2},{3});
 );
-out center;
-"""
+out geom;
+""".format(*BBOX)
 
-print("🔍 Fetching buildings from OpenStreetMap...")
-response = requests.post(overpass_url, data={'data': overpass_query})
-data = response.json()
-
-print(f"✅ Found {len(data['elements'])} buildings")
+# Rows per bulk upsert statement
+UPSERT_CHUNK_SIZE = 500
 
 # Map college names
 college_keywords = {
@@ -33,7 +49,7 @@ college_keywords = {
 # Categorize by keywords
 def categorize_building(name, tags):
     name_lower = name.lower()
-    
+
     if any(word in name_lower for word in ['dining', 'cafe', 'restaurant', 'food', 'commons', 'frary', 'frank', 'collins', 'malott', 'hoch', 'mcconnell']):
         return 'dining'
     elif any(word in name_lower for word in ['gym', 'rains', 'pool', 'athletic', 'recreation', 'ducey', 'voelkel', 'fitness']):
@@ -50,113 +66,258 @@ def guess_college(name, tags):
     # Default to Pomona if unknown
     return 'Pomona College'
 
-# Process buildings
-buildings = []
-seen_names = set()
-
-for element in data['elements']:
-    if 'tags' not in element or 'name' not in element['tags']:
-        continue
-    
-    name = element['tags']['name']
-    
-    # Skip duplicates
-    if name in seen_names:
-        continue
-    seen_names.add(name)
-    
-    # Skip basement levels and parking
-    if 'basement' in name.lower() or 'parking' in name.lower():
-        continue
-    
-    tags = element['tags']
-    
-    # Get coordinates
-    if element['type'] == 'node':
-        lat = element['lat']
-        lon = element['lon']
-    elif 'center' in element:
-        lat = element['center']['lat']
-        lon = element['center']['lon']
-    else:
-        continue
-    
-    # Skip if coordinates are invalid
-    if not (34.093 <= lat <= 34.107 and -117.714 <= lon <= -117.704):
-        continue
-    
-    category = categorize_building(name, tags)
-    college_name = guess_college(name, tags)
-    
-    buildings.append({
-        'name': name,
-        'lat': lat,
-        'lon': lon,
-        'category': category,
-        'college': college_name,
-        'tags': tags
-    })
-
-# Sort by college and name
-buildings.sort(key=lambda x: (x['college'], x['name']))
-
-print(f"\n📦 Processed {len(buildings)} valid buildings")
-
-# Show preview grouped by category
-categories = {}
-for building in buildings:
-    cat = building['category']
-    if cat not in categories:
-        categories[cat] = []
-    categories[cat].append(building)
-
-print("\n📋 Preview of buildings to import:")
-for category, items in categories.items():
-    print(f"\n  {category.upper()} ({len(items)}):")
-    for building in items[:5]:
-        print(f"    • {building['name']} - {building['college']}")
-    if len(items) > 5:
-        print(f"    ... and {len(items) - 5} more")
-
-# Ask for confirmation
-print(f"\n💾 Total: {len(buildings)} buildings")
-confirm = input("\n❓ Import these buildings to database? (yes/no): ")
-
-if confirm.lower() == 'yes':
+def fetch_overpass(save_to=None):
+    """Overpass response for the 5C bounding box, also written to save_to if given"""
+    response = requests.post(OVERPASS_URL, data={'data': OVERPASS_QUERY}, timeout=60)
+    response.raise_for_status()
+    data = response.json()
+    if save_to:
+        with open(save_to, 'w') as f:
+            json.dump(data, f)
+    return data
+
+def load_overpass(path):
+    """A saved Overpass JSON response"""
+    with open(path) as f:
+        return json.load(f)
+
+def osm_id(element):
+    """Stable key for an OSM element; ids are only unique within a type"""
+    return f"{element['type']}/{element['id']}"
+
+def way_outline(element):
+    """A way's closed ring of (lat, lon) points, or None if it doesn't outline an area"""
+    ring = [(point['lat'], point['lon']) for point in element.get('geometry') or []]
+    if len(ring) < 4 or ring[0] != ring[-1]:
+        return None
+    return ring
+
+def extract_buildings(elements):
+    """Importable buildings from Overpass elements, one per OSM element"""
+    buildings = {}
+    min_lat, min_lon, max_lat, max_lon = BBOX
+
+    for element in elements:
+        tags = element.get('tags') or {}
+        name = tags.get('name')
+        if not name:
+            continue
+
+        # Skip basement levels and parking
+        if 'basement' in name.lower() or 'parking' in name.lower():
+            continue
+
+        # Get coordinates; a way's position is its bounding box center, as Overpass's "out center" gives
+        outline = None
+        if element['type'] == 'node':
+            lat = element['lat']
+            lon = element['lon']
+        elif 'bounds' in element:
+            bounds = element['bounds']
+            lat = (bounds['minlat'] + bounds['maxlat']) / 2
+            lon = (bounds['minlon'] + bounds['maxlon']) / 2
+            outline = way_outline(element)
+        elif 'center' in element:
+            lat = element['center']['lat']
+            lon = element['center']['lon']
+        else:
+            continue
+
+        # Skip if coordinates are invalid
+        if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+            continue
+
+        # The same element listed twice keeps its later entry
+        buildings[osm_id(element)] = {
+            'osm_id': osm_id(element),
+            'name': name,
+            'lat': lat,
+            'lon': lon,
+            'category': categorize_building(name, tags),
+            'college': guess_college(name, tags),
+            'tags': tags,
+            'outline': outline
+        }
+
+    # Sort by college and name
+    return sorted(buildings.values(), key=lambda x: (x['college'], x['name']))
+
+def print_preview(buildings):
+    """Buildings grouped by category, a few of each"""
+    categories = {}
+    for building in buildings:
+        categories.setdefault(building['category'], []).append(building)
+
+    print("\n📋 Buildings to import:")
+    for category, items in categories.items():
+        print(f"\n  {category.upper()} ({len(items)}):")
+        for building in items[:5]:
+            print(f"    • {building['name']} - {building['college']}")
+        if len(items) > 5:
+            print(f"    ... and {len(items) - 5} more")
+
+def simplify_outlines(buildings):
+    """Encode each building's outline, with its per-zoom simplifications, as building['footprint']"""
+    for building in buildings:
+        building['footprint'] = geo.footprint(building['outline']) if building['outline'] else None
+
+def upsert_buildings(session, buildings):
+    """Insert new buildings and update known ones by OSM id; the caller commits.
+
+    Locations added before they had an OSM id (sample data, earlier imports)
+    are adopted by exact name, so they're updated rather than duplicated.
+    Buildings of a college missing from the database are skipped and their
+    colleges listed under 'unknown_colleges'. Footprints from
+    simplify_outlines() are upserted alongside, and dropped for buildings
+    that no longer have an outline. Returns the number of buildings
+    inserted, updated and skipped, and footprints saved and removed.
+    """
+    college_ids = dict(session.query(College.name, College.id))
+    unknown_colleges = sorted({building['college'] for building in buildings} - set(college_ids))
+    skipped = len(buildings)
+    buildings = [building for building in buildings if building['college'] in college_ids]
+    skipped -= len(buildings)
+    known = {osm: location_id for osm, location_id in session.query(Location.osm_id, Location.id).filter(
+        Location.osm_id.isnot(None)
+    )}
+    unkeyed = {}
+    for location_id, name in session.query(Location.id, Location.name).filter(Location.osm_id.is_(None)):
+        unkeyed.setdefault(name, location_id)
+
+    adopted = []
+    for building in buildings:
+        if building['osm_id'] not in known and building['name'] in unkeyed:
+            location_id = unkeyed.pop(building['name'])
+            adopted.append({'id': location_id, 'osm_id': building['osm_id']})
+            known[building['osm_id']] = location_id
+    if adopted:
+        session.execute(db.update(Location), adopted)
+
+    rows = [
+        {
+            'osm_id': building['osm_id'],
+            'name': building['name'],
+            'latitude': building['lat'],
+            'longitude': building['lon'],
+            'category': building['category'],
+            'college_id': college_ids[building['college']],
+            'description': f"Building at {building['college']}",
+            'fun_facts': '[]'
+        }
+        for building in buildings
+    ]
+
+    # Description and fun facts may have been edited since; only OSM's fields are refreshed
+    insert = dialect_insert(session.get_bind())(Location)
+    statement = insert.on_conflict_do_update(
+        index_elements=[Location.osm_id],
+        set_={column: insert.excluded[column] for column in ('name', 'latitude', 'longitude', 'category', 'college_id')}
+    )
+    for chunk_start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        session.execute(statement, rows[chunk_start:chunk_start + UPSERT_CHUNK_SIZE])
+
+    updated = sum(1 for building in buildings if building['osm_id'] in known)
+    location_ids = dict(session.query(Location.osm_id, Location.id).filter(Location.osm_id.isnot(None)))
+    footprints = upsert_footprints(session, buildings, location_ids)
+    removed = remove_stale_footprints(session, buildings, location_ids)
+    return {
+        'inserted': len(buildings) - updated, 'updated': updated, 'skipped': skipped,
+        'unknown_colleges': unknown_colleges, 'footprints': footprints, 'footprints_removed': removed
+    }
+
+def upsert_footprints(session, buildings, location_ids):
+    """Save the footprints of buildings already upserted; returns how many"""
+    outlined = [building for building in buildings if building.get('footprint')]
+    if not outlined:
+        return 0
+
+    rows = [
+        {'location_id': location_ids[building['osm_id']], 'updated_at': datetime.utcnow(), **building['footprint']}
+        for building in outlined
+    ]
+
+    insert = dialect_insert(session.get_bind())(BuildingFootprint)
+    statement = insert.on_conflict_do_update(
+        index_elements=[BuildingFootprint.location_id],
+        set_={column: insert.excluded[column] for column in rows[0] if column != 'location_id'}
+    )
+    for chunk_start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        session.execute(statement, rows[chunk_start:chunk_start + UPSERT_CHUNK_SIZE])
+    return len(rows)
+
+def remove_stale_footprints(session, buildings, location_ids):
+    """Delete the footprints of imported buildings OSM no longer outlines; returns how many"""
+    outlineless = [location_ids[building['osm_id']] for building in buildings if not building.get('footprint')]
+    removed = 0
+    for chunk_start in range(0, len(outlineless), UPSERT_CHUNK_SIZE):
+        removed += session.execute(db.delete(BuildingFootprint).where(
+            BuildingFootprint.location_id.in_(outlineless[chunk_start:chunk_start + UPSERT_CHUNK_SIZE])
+        )).rowcount
+    return removed
+
+def run_import(path=None, save_response=None, staged=False, dry_run=False):
+    """Load (or fetch), extract and save buildings; returns counts and per-stage timings.
+
+    Needs no app context; staged=True builds the import in a copy of the
+    database and swaps it in, for imports into a running app.
+    """
+    timings = {}
+    start = time.perf_counter()
+    data = load_overpass(path) if path else fetch_overpass(save_response)
+    timings['load'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buildings = extract_buildings(data.get('elements', []))
+    timings['extract'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    simplify_outlines(buildings)
+    timings['simplify'] = time.perf_counter() - start
+
+    report = {'elements': len(data.get('elements', [])), 'buildings': buildings, 'counts': None, 'timings': timings}
+    if dry_run:
+        return report
+
+    start = time.perf_counter()
+    init_database()
     with app.app_context():
-        imported = 0
-        skipped = 0
-        
-        for building in buildings:
-            # Check if already exists
-            existing = Location.query.filter_by(name=building['name']).first()
-            if existing:
-                print(f"⏭️  Skipping (already exists): {building['name']}")
-                skipped += 1
-                continue
-            
-            # Get college ID
-            college = College.query.filter_by(name=building['college']).first()
-            college_id = college.id if college else 1
-            
-            # Create new location
-            new_location = Location(
-                name=building['name'],
-                latitude=building['lat'],
-                longitude=building['lon'],
-                category=building['category'],
-                college_id=college_id,
-                description=f"Building at {building['college']}",
-                fun_facts='[]'
-            )
-            
-            db.session.add(new_location)
-            imported += 1
-            name = building['name']
-            cat = building['category']
-            print(f"✅ Imported: {name} ({cat})")
-        
-        db.session.commit()
-        print(f"\n🎉 Import complete! Imported {imported}, Skipped {skipped}")
-else:
-    print("❌ Import cancelled")
\ No newline at end of file
+        if staged:
+            counts = {}
+            import_catalog_staged(lambda session: counts.update(upsert_buildings(session, buildings)))
+        else:
+            counts = upsert_buildings(db.session, buildings)
+            db.session.commit()
+    timings['save'] = time.perf_counter() - start
+    report['counts'] = counts
+    return report
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Import 5C buildings from OpenStreetMap')
+    parser.add_argument('--file', help='saved Overpass JSON response to import instead of fetching')
+    parser.add_argument('--save-response', metavar='PATH', help='keep the fetched Overpass response here')
+    # --staged builds in a copy and swaps it in, for imports into a running app
+    parser.add_argument('--staged', action='store_true', help='import into a staging copy and swap it in')
+    parser.add_argument('--dry-run', action='store_true', help="show what would be imported, don't save")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    print(f"🔍 Loading buildings from {args.file}..." if args.file else "🔍 Fetching buildings from OpenStreetMap...")
+    try:
+        report = run_import(args.file, args.save_response, args.staged, args.dry_run)
+    except (OSError, ValueError, requests.exceptions.RequestException) as e:
+        print(f"❌ Could not load buildings: {e}")
+        sys.exit(1)
+
+    print(f"✅ Found {report['elements']} elements, {len(report['buildings'])} valid buildings")
+    print_preview(report['buildings'])
+    if report['counts'] is not None:
+        counts = report['counts']
+        print(f"\n🎉 Import complete! Inserted {counts['inserted']}, Updated {counts['updated']}, "
+              f"{counts['footprints']} footprints, {counts['footprints_removed']} stale footprints removed")
+        if counts['skipped']:
+            print(f"⚠️  Skipped {counts['skipped']} buildings of colleges not in the database: "
+                  f"{', '.join(counts['unknown_colleges'])}")
+    else:
+        print("\n💾 Dry run, nothing saved")
+    print("⏱️  " + ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in report['timings'].items()))
@@ -0,0 +1,116 @@
+"""
+Response encoding: a pluggable JSON provider and gzip/brotli compression.
+
+orjson and brotli are optional. Without them the app falls back to the
+stdlib encoder and gzip-only compression.
+"""
+
+import gzip
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Same output as Flask's default provider, encoded by orjson"""
+
+    # Datetimes go through default() so they still render as HTTP dates
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get('indent') or kwargs.get('cls'):
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        # Hand the bytes straight to the response instead of a str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'stdlib': DefaultJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+
+def json_provider_class(name='auto'):
+    """Provider class for JSON_PROVIDER: 'auto', 'orjson' or 'stdlib'"""
+    if name == 'auto':
+        name = 'orjson' if orjson else 'stdlib'
+    if name == 'orjson' and not orjson:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    return JSON_PROVIDERS[name]
+
+
+def parse_fields(value):
+    """?fields=id,name,... as a set, or None when every field is wanted"""
+    if not value:
+        return None
+    return {field.strip() for field in value.split(',') if field.strip()} | {'id'}
+
+
+def pick_fields(row, fields):
+    """Sparse fieldset: only the requested keys of a serialized row"""
+    if fields is None:
+        return row
+    return {key: value for key, value in row.items() if key in fields}
+
+
+def choose_encoding(accept_encodings):
+    """Best supported Content-Encoding the client accepts, or None"""
+    if brotli and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level['br'])
+    return gzip.compress(data, compresslevel=level['gzip'], mtime=0)
+
+
+def init_app(app):
+    """Install the configured JSON provider and response compression"""
+    app.config.setdefault('JSON_PROVIDER', 'auto')
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', {'gzip': 6, 'br': 5})
+
+    app.json = json_provider_class(app.config['JSON_PROVIDER'])(app)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code >= 300
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding:
+            response.set_data(compress(data, encoding, app.config['COMPRESS_LEVEL']))
+            response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,216 @@
+"""
+Per-request metrics in Prometheus text format, served at /metrics.
+
+Every request records its latency, response size, SQL statement count, SQL
+time and ORM rows loaded into histograms labelled by route template and
+method, so cardinality is bounded by the app's routes rather than its URLs.
+The SQL hooks only add two clock reads and a counter update per statement.
+
+Each gunicorn worker keeps its own numbers; scrape every worker or run a
+single one when exact totals matter.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import Response, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+KNOWN_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'}
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    __slots__ = ('started', 'sql_started', 'queries', 'sql_seconds', 'rows')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_started = None
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+
+    def inc(self, labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [count per bucket (non-cumulative, +Inf last), sum, count]
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.label_names, labels)} {total:.6g}')
+            lines.append(f'{self.name}_count{_format_labels(self.label_names, labels)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self, prefix='chizu'):
+        self._lock = threading.Lock()
+        labels = ('endpoint', 'method')
+        self.requests = Counter(f'{prefix}_http_requests_total', 'Requests by route, method and status class.',
+                                ('endpoint', 'method', 'status'))
+        self.histograms = {
+            'latency': Histogram(f'{prefix}_http_request_duration_seconds', 'Request latency.',
+                                 labels, LATENCY_BUCKETS),
+            'bytes': Histogram(f'{prefix}_http_response_bytes', 'Response body size as sent.',
+                               labels, SIZE_BUCKETS),
+            'queries': Histogram(f'{prefix}_db_queries_per_request', 'SQL statements executed per request.',
+                                 labels, QUERY_BUCKETS),
+            'sql_seconds': Histogram(f'{prefix}_db_time_per_request_seconds', 'Time spent in SQL per request.',
+                                     labels, LATENCY_BUCKETS),
+            'rows': Histogram(f'{prefix}_db_rows_per_request', 'ORM rows loaded per request.',
+                              labels, ROW_BUCKETS),
+        }
+        self._gauges = []
+
+    def record(self, endpoint, method, status, stats, elapsed, size):
+        labels = (endpoint, method)
+        with self._lock:
+            self.requests.inc((endpoint, method, status))
+            self.histograms['latency'].observe(labels, elapsed)
+            if size is not None:
+                self.histograms['bytes'].observe(labels, size)
+            self.histograms['queries'].observe(labels, stats.queries)
+            self.histograms['sql_seconds'].observe(labels, stats.sql_seconds)
+            self.histograms['rows'].observe(labels, stats.rows)
+
+    def add_gauges(self, collect):
+        """collect() -> {name: (help, value)}, evaluated on every scrape"""
+        self._gauges.append(collect)
+
+    def render(self):
+        with self._lock:
+            lines = self.requests.render()
+            for histogram in self.histograms.values():
+                lines.extend(histogram.render())
+        for collect in self._gauges:
+            for name, (help_text, value) in collect().items():
+                lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}'])
+        return '\n'.join(lines) + '\n'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        # A request runs one statement at a time, so one start time is enough
+        stats.sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    if stats.sql_started is not None:
+        stats.sql_seconds += time.perf_counter() - stats.sql_started
+        stats.sql_started = None
+    stats.queries += 1
+
+
+def _instance_loaded(target, context):
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def instrument_engine(engine):
+    """Count statements and SQL time for requests served through this engine"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def instrument_models(model_base):
+    """Count ORM rows loaded, for every model inheriting from model_base"""
+    event.listen(model_base, 'load', _instance_loaded, propagate=True)
+
+
+def init_app(app, registry=None):
+    """Record every request and serve the registry at /metrics.
+
+    Call before other after_request hooks are registered (such as response
+    compression) so the recorded size is the one actually sent.
+    """
+    registry = registry or Registry()
+    app.extensions['metrics'] = registry
+
+    @app.before_request
+    def start_request_metrics():
+        request.environ['metrics.token'] = _current.set(RequestStats())
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        rule = request.url_rule
+        endpoint = rule.rule if rule is not None else 'unmatched'
+        method = request.method if request.method in KNOWN_METHODS else 'other'
+        size = None if response.is_streamed or response.direct_passthrough else response.calculate_content_length()
+        registry.record(endpoint, method, f'{response.status_code // 100}xx', stats,
+                        time.perf_counter() - stats.started, size)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        token = request.environ.pop('metrics.token', None)
+        if token is not None:
+            _current.reset(token)
+
+    def metrics_view():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    return registry
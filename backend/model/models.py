@@ -1,5 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func, inspect, literal, union_all
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 from datetime import datetime
+from itertools import chain
 import json
 
 # Create db instance
@@ -129,4 +133,192 @@ class Event(db.Model):
             'event_type': self.event_type,
             'start_datetime': self.start_datetime.isoformat(),
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class StatsCounter(db.Model):
+    """Materialized counts for /stats, one row per college.
+
+    The row with college_id 0 holds the global totals. The row with
+    college_id -1 marks the counters as valid: rebuild_stats_counters()
+    writes it, and any write the counter hooks don't see deletes it.
+    """
+    college_id = db.Column(db.Integer, primary_key=True)
+    colleges = db.Column(db.Integer, nullable=False, default=0)
+    departments = db.Column(db.Integer, nullable=False, default=0)
+    courses = db.Column(db.Integer, nullable=False, default=0)
+    locations = db.Column(db.Integer, nullable=False, default=0)
+    events = db.Column(db.Integer, nullable=False, default=0)
+
+GLOBAL_STATS_ROW = 0
+STATS_VALID_ROW = -1
+STATS_COUNTER_COLUMNS = ('colleges', 'departments', 'courses', 'locations', 'events')
+STATS_COUNTED_MODELS = (College, Department, Course, Location, Event)
+
+def aggregate_stats():
+    """Count everything /stats reports with one GROUP BY query per table,
+    sent to the database as a single UNION ALL statement.
+
+    Returns {college_id: {counter: count}} with the totals under GLOBAL_STATS_ROW.
+    """
+    grouped = union_all(
+        db.select(literal('colleges'), literal(GLOBAL_STATS_ROW), func.count(College.id)),
+        db.select(literal('departments'), literal(GLOBAL_STATS_ROW), func.count(Department.id)),
+        db.select(literal('courses'), Course.college_id, func.count(Course.id))
+            .group_by(Course.college_id),
+        db.select(literal('locations'), Location.college_id, func.count(Location.id))
+            .group_by(Location.college_id),
+        db.select(literal('events'), Event.college_id, func.count(Event.id))
+            .where(Event.is_active == True)
+            .group_by(Event.college_id),
+    )
+    
+    counts = {GLOBAL_STATS_ROW: dict.fromkeys(STATS_COUNTER_COLUMNS, 0)}
+    for counter, college_id, count in db.session.execute(grouped):
+        if counter in ('courses', 'locations', 'events'):
+            counts[GLOBAL_STATS_ROW][counter] += count
+            if college_id is None:
+                continue
+        counts.setdefault(college_id, dict.fromkeys(STATS_COUNTER_COLUMNS, 0))[counter] = count
+    
+    return counts
+
+def rebuild_stats_counters():
+    """Recompute the stats_counter table from scratch.
+
+    Run after bulk writes that skip the ORM (Core inserts, query.delete()),
+    since those don't fire the mapper events that keep the counters current.
+    """
+    counts = aggregate_stats()
+    StatsCounter.__table__.create(db.engine, checkfirst=True)
+    db.session.execute(db.delete(StatsCounter))
+    db.session.execute(db.insert(StatsCounter), [
+        {'college_id': college_id, **row} for college_id, row in counts.items()
+    ] + [{'college_id': STATS_VALID_ROW, **dict.fromkeys(STATS_COUNTER_COLUMNS, 0)}])
+    db.session.commit()
+
+def read_stats_counters():
+    """{college_id: {counter: count}} from stats_counter, or None unless it's marked valid"""
+    try:
+        rows = {row.college_id: row for row in StatsCounter.query.all()}
+    except OperationalError:
+        # rebuild_stats_counters() hasn't created the table yet
+        db.session.rollback()
+        return None
+    if rows.pop(STATS_VALID_ROW, None) is None:
+        return None
+    return {
+        college_id: {column: getattr(row, column) for column in STATS_COUNTER_COLUMNS}
+        for college_id, row in rows.items()
+    }
+
+# Databases known to have a stats_counter table; it's never dropped once created
+_stats_tables = set()
+
+def _invalidate_stats_counters(session):
+    """Delete the valid marker in the session's transaction, until the next rebuild"""
+    connection = session.connection()
+    url = str(connection.engine.url)
+    if url not in _stats_tables:
+        if not inspect(connection).has_table(StatsCounter.__tablename__):
+            return
+        _stats_tables.add(url)
+    table = StatsCounter.__table__
+    connection.execute(db.delete(table).where(table.c.college_id == STATS_VALID_ROW))
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_after_unhooked_flush(session, flush_context):
+    # Installed in every process, so writers without the counter hooks
+    # (scrapers, imports, other workers) can't leave counters that look current
+    if stats_counters_enabled():
+        return
+    if any(isinstance(obj, STATS_COUNTED_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        _invalidate_stats_counters(session)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_after_bulk_write(orm_execute_state):
+    # Bulk statements skip the counter hooks even where they're enabled
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, STATS_COUNTED_MODELS):
+        _invalidate_stats_counters(orm_execute_state.session)
+
+def _stats_contribution(target, state='current'):
+    """(column, college_id) a row counts towards, or None if it isn't counted.
+
+    state='committed' uses the values the row had before the pending update.
+    """
+    def value(attr):
+        if state == 'committed':
+            history = db.inspect(target).attrs[attr].history
+            if history.deleted:
+                return history.deleted[0]
+        return getattr(target, attr)
+    
+    if isinstance(target, College):
+        return 'colleges', None
+    if isinstance(target, Department):
+        return 'departments', None
+    if isinstance(target, Event) and not value('is_active'):
+        return None
+    
+    column = {Course: 'courses', Location: 'locations', Event: 'events'}[type(target)]
+    return column, value('college_id')
+
+def _bump_stats_counter(connection, contribution, delta):
+    if contribution is None:
+        return
+    column, college_id = contribution
+    
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    
+    table = StatsCounter.__table__
+    for row_id in {GLOBAL_STATS_ROW, college_id} - {None}:
+        connection.execute(
+            insert(table)
+            .values(college_id=row_id, **{column: delta})
+            .on_conflict_do_update(
+                index_elements=[table.c.college_id],
+                set_={column: table.c[column] + delta}
+            )
+        )
+
+def _counter_after_insert(mapper, connection, target):
+    _bump_stats_counter(connection, _stats_contribution(target), 1)
+
+def _counter_after_delete(mapper, connection, target):
+    _bump_stats_counter(connection, _stats_contribution(target, 'committed'), -1)
+
+def _counter_after_update(mapper, connection, target):
+    before = _stats_contribution(target, 'committed')
+    after = _stats_contribution(target)
+    if before != after:
+        _bump_stats_counter(connection, before, -1)
+        _bump_stats_counter(connection, after, 1)
+
+def stats_counters_enabled():
+    """Whether this process keeps stats_counter current as it writes"""
+    return event.contains(Course, 'after_insert', _counter_after_insert)
+
+def disable_stats_counters():
+    for model in (College, Department, Course, Location, Event):
+        if event.contains(model, 'after_insert', _counter_after_insert):
+            event.remove(model, 'after_insert', _counter_after_insert)
+            event.remove(model, 'after_delete', _counter_after_delete)
+            event.remove(model, 'after_update', _counter_after_update)
+
+def enable_stats_counters():
+    """Keep stats_counter current on every ORM insert, update and delete.
+
+    Opt-in: call once per process that writes (web workers and scrapers alike),
+    then rebuild_stats_counters() once inside an app context to seed the table.
+    """
+    for model in (College, Department, Course, Location, Event):
+        if event.contains(model, 'after_insert', _counter_after_insert):
+            continue
+        event.listen(model, 'after_insert', _counter_after_insert)
+        event.listen(model, 'after_delete', _counter_after_delete)
+        event.listen(model, 'after_update', _counter_after_update)
@@ -0,0 +1,100 @@
+"""
+Query budgets: a declared maximum number of SQL statements per endpoint.
+
+Views declare their budget with @max_queries(n). With QUERY_BUDGET_MODE set
+to 'log' (the default under the debug server) a request that goes over logs
+the statements it ran, grouped by fingerprint so an N+1 shows up as one
+normalized query repeated N times. 'raise' turns an overrun into a 500 for
+budget checks and tests; 'off' installs no hooks at all.
+"""
+
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'log', 'raise')
+
+_statements = ContextVar('query_budget_statements', default=None)
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number = re.compile(r'\b\d+(?:\.\d+)?\b')
+_placeholder_list = re.compile(r'\((?:\s*(?:\?|%s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)')
+_whitespace = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, endpoint, budget, statements):
+        self.endpoint = endpoint
+        self.budget = budget
+        self.statements = statements
+        super().__init__(f"{endpoint} ran {len(statements)} queries, budget is {budget}\n"
+                         + format_fingerprints(statements))
+
+
+def max_queries(limit):
+    """Declare the most SQL statements one request to this view may run"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def fingerprint(statement):
+    """Statement with literals and IN lists collapsed, so repeats group together"""
+    statement = _string_literal.sub('?', statement)
+    statement = _number.sub('?', statement)
+    statement = _placeholder_list.sub('(...)', statement)
+    return _whitespace.sub(' ', statement).strip()
+
+
+def format_fingerprints(statements):
+    """Normalized statements, most repeated first"""
+    counts = Counter(fingerprint(statement) for statement in statements)
+    return '\n'.join(f'  {count:>4} x {sql}' for sql, count in counts.most_common())
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = _statements.get()
+    if statements is not None:
+        statements.append(statement)
+
+
+def init_app(app, engine):
+    """Check every budgeted request against the statements it ran on engine"""
+    mode = app.config.setdefault('QUERY_BUDGET_MODE', 'log' if app.debug else 'off')
+    if mode not in MODES:
+        raise ValueError(f"QUERY_BUDGET_MODE must be one of {MODES}, not {mode!r}")
+    if mode == 'off':
+        return
+
+    event.listen(engine, 'before_cursor_execute', _record_statement)
+
+    @app.before_request
+    def start_query_budget():
+        request.environ['query_budget.token'] = _statements.set([])
+
+    @app.after_request
+    def check_query_budget(response):
+        view = app.view_functions.get(request.endpoint)
+        budget = getattr(view, 'query_budget', None)
+        statements = _statements.get()
+        if budget is None or statements is None or len(statements) <= budget:
+            return response
+
+        exceeded = QueryBudgetExceeded(request.endpoint, budget, statements)
+        if mode == 'raise':
+            raise exceeded
+        logger.warning("⚠️  Query budget exceeded: %s", exceeded)
+        return response
+
+    @app.teardown_request
+    def finish_query_budget(exc):
+        token = request.environ.pop('query_budget.token', None)
+        if token is not None:
+            _statements.reset(token)
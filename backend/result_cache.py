@@ -0,0 +1,232 @@
+"""
+In-process cache of encoded API responses.
+
+Entries are keyed by endpoint plus normalized query parameters and tagged
+with the table versions they were computed from; a version mismatch on
+lookup means some table the endpoint reads has been written since. Stale
+entries can still be served for a short grace period while one background
+refresh replaces them, and concurrent misses on one key share a single
+computation. Memory is bounded by the total size of cached bodies.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class CacheEntry:
+    __slots__ = ('key', 'versions', 'versions_at', 'mimetype', 'status', 'bodies', 'size', 'stale_since')
+
+    def __init__(self, key, versions, mimetype, body, status=200, versions_at=None):
+        self.key = key
+        self.versions = versions
+        # When `versions` was read, on the time.monotonic() clock
+        self.versions_at = time.monotonic() if versions_at is None else versions_at
+        self.mimetype = mimetype
+        self.status = status
+        # Uncompressed body under None, plus compressed variants as requested
+        self.bodies = {None: body}
+        self.size = len(body)
+        self.stale_since = None
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def _join(self, key):
+        """(flight, leader): the running flight for key, or a new one we lead"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _lead(self, key, flight, fn):
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def do(self, key, fn):
+        """Returns (result, shared); shared is True if another caller ran fn"""
+        flight, leader = self._join(key)
+        if leader:
+            return self._lead(key, flight, fn), False
+
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._flights
+
+    def start(self, key, fn):
+        """Run fn on a background thread unless a call for key is already running"""
+        flight, leader = self._join(key)
+        if not leader:
+            return False
+
+        def run():
+            try:
+                self._lead(key, flight, fn)
+            except Exception:
+                logger.exception("Background refresh failed for %s", key)
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+
+class ResultCache:
+    """Byte-budgeted LRU of response bodies with version-based invalidation"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_stale_seconds=5):
+        self.max_bytes = max_bytes
+        self.max_stale_seconds = max_stale_seconds
+        self.flights = SingleFlight()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(endpoint, args, view_args=None):
+        """Key for a request; parameter order and empty values don't matter"""
+        params = tuple(sorted((k, v) for k, v in args.items(multi=True) if v != ''))
+        return endpoint, params, tuple(sorted((view_args or {}).items()))
+
+    def lookup(self, key, versions, written_at=None):
+        """Returns (entry, FRESH), (entry, STALE) or (None, None).
+
+        An entry whose versions no longer match is STALE for up to
+        max_stale_seconds after it was first found out of date, then dropped.
+        written_at is when this process last wrote a table the entry reads;
+        an out-of-date entry older than that write is never served, so a
+        client reading back its own write sees it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+
+            if entry.versions == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry, FRESH
+
+            now = time.monotonic()
+            if entry.stale_since is None:
+                entry.stale_since = now
+                self.invalidations += 1
+            own_write = written_at is not None and written_at >= entry.versions_at
+            if not own_write and now - entry.stale_since <= self.max_stale_seconds:
+                self.stale_hits += 1
+                return entry, STALE
+
+            self._remove(key)
+            self.misses += 1
+            return None, None
+
+    def store(self, entry):
+        """Cache a computed entry; oversized or non-200 entries are not kept"""
+        if entry.status != 200 or entry.size > self.max_bytes:
+            return False
+        with self._lock:
+            if entry.key in self._entries:
+                self._remove(entry.key)
+            self._entries[entry.key] = entry
+            self.size += entry.size
+            self._evict()
+        return True
+
+    def compute(self, key, fn):
+        """Run fn for a missing key, coalescing with any call already running"""
+        entry, shared = self.flights.do(key, fn)
+        if shared:
+            with self._lock:
+                self.coalesced += 1
+        return entry, shared
+
+    def refresh(self, key, fn):
+        """Recompute a stale key in the background, at most once at a time"""
+        if self.flights.start(key, fn):
+            with self._lock:
+                self.refreshes += 1
+
+    def add_variant(self, entry, encoding, body):
+        """Keep a compressed copy alongside the entry's body"""
+        with self._lock:
+            if encoding in entry.bodies:
+                return
+            entry.bodies[encoding] = body
+            entry.size += len(body)
+            # The entry may already have been evicted or replaced
+            if self._entries.get(entry.key) is entry:
+                self.size += len(body)
+                self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                'coalesced': self.coalesced,
+                'refreshes': self.refreshes,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
@@ -5,10 +5,13 @@ Run: python backend/scrape_courses.py
 """
 
 import re
-from bs4 import BeautifulSoup
+import sys
+from bs4 import SoupStrainer
 import json
 from datetime import datetime
 
+from scrapers.soup import make_soup
+
 class Course:
     def __init__(self, data):
         self.course_code = data.get('course_code', '')
@@ -110,8 +113,8 @@ class Course:
         }
 
 
-def scrape_courses_from_html(html_file='courses.html'):
-    """Scrape courses from your saved HTML file"""
+def scrape_courses_from_html(html_file='courses.html', parser=None):
+    """Scrape courses from your saved HTML file (parser: a scrapers.soup backend, default the fastest)"""
     print("📚 Starting course scrape from", html_file)
     
     try:
@@ -121,7 +124,8 @@ def scrape_courses_from_html(html_file='courses.html'):
         print(f"❌ Error: {html_file} not found in backend folder!")
         return []
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # Only the course table is needed; skip building the rest of the page
+    soup = make_soup(html_content, parser, parse_only=SoupStrainer('table'))
     courses = []
     
     # Find the course table
@@ -189,70 +193,85 @@ def save_to_json(courses, filename='courses_data.json'):
     print(f"\n💾 Saved {len(courses)} courses to {filename}")
 
 
-def import_to_database(courses):
-    """Import courses into the database"""
+def import_to_database(courses, staged=False):
+    """Import courses into the database.
+
+    With staged=True the import is built in a copy of the database and
+    swapped in at the end, so the app keeps serving reads throughout.
+    """
     print("\n📥 Importing courses to database...")
     
     # Import here to avoid circular imports
-    from app import app, db, Course as DBCourse, College, Location, Department
+    from app import app, db, import_catalog_staged, init_database
     
+    init_database()
     with app.app_context():
-        imported = 0
-        skipped = 0
-        updated = 0
+        if staged:
+            counts = import_catalog_staged(lambda session: add_courses(session, courses))
+            print(f"🔁 Swapped in staged catalog: {counts['course']} courses")
+        else:
+            add_courses(db.session, courses)
+            db.session.commit()
+
+
+def add_courses(session, courses):
+    """Add courses that aren't in the database yet; the caller commits"""
+    from app import Course as DBCourse, College, Location
+    
+    imported = 0
+    skipped = 0
+    
+    for course in courses:
+        # Check if course already exists
+        existing = session.query(DBCourse).filter_by(
+            course_code=course.course_code,
+            section=course.section,
+            semester='Fall 2024'
+        ).first()
+        
+        if existing:
+            print(f"⏭️  Already exists: {course.course_code}-{course.section}")
+            skipped += 1
+            continue
+        
+        # Get college
+        college_obj = session.query(College).filter_by(code=course.college).first()
+        if not college_obj:
+            college_obj = session.query(College).filter_by(code='PO').first()
         
-        for course in courses:
-            # Check if course already exists
-            existing = DBCourse.query.filter_by(
-                course_code=course.course_code,
-                section=course.section,
-                semester='Fall 2024'
+        # Find location if building exists
+        location_obj = None
+        if course.building:
+            location_obj = session.query(Location).filter(
+                Location.name.ilike(f'%{course.building}%')
             ).first()
-            
-            if existing:
-                print(f"⏭️  Already exists: {course.course_code}-{course.section}")
-                skipped += 1
-                continue
-            
-            # Get college
-            college_obj = College.query.filter_by(code=course.college).first()
-            if not college_obj:
-                college_obj = College.query.filter_by(code='PO').first()
-            
-            # Find location if building exists
-            location_obj = None
-            if course.building:
-                location_obj = Location.query.filter(
-                    Location.name.ilike(f'%{course.building}%')
-                ).first()
-            
-            # Create course object
-            new_course = DBCourse(
-                course_code=course.course_code,
-                section=course.section,
-                title=course.title,
-                department_code=course.department,
-                college_id=college_obj.id if college_obj else 1,
-                location_id=location_obj.id if location_obj else None,
-                instructors=course.instructors,
-                days=course.days,
-                time=course.time,
-                seats_available=course.seats_available,
-                credit=course.credit,
-                notes=course.notes,
-                semester='Fall 2024'
-            )
-            
-            db.session.add(new_course)
-            imported += 1
-            
-            if imported % 50 == 0:
-                print(f"📦 Imported {imported} courses so far...")
         
-        db.session.commit()
-        print(f"\n🎉 Import complete!")
-        print(f"   ✅ Imported: {imported}")
-        print(f"   ⏭️  Skipped: {skipped}")
+        # Create course object
+        new_course = DBCourse(
+            course_code=course.course_code,
+            section=course.section,
+            title=course.title,
+            department_code=course.department,
+            college_id=college_obj.id if college_obj else 1,
+            location_id=location_obj.id if location_obj else None,
+            instructors=course.instructors,
+            days=course.days,
+            time=course.time,
+            seats_available=course.seats_available,
+            credit=course.credit,
+            notes=course.notes,
+            semester='Fall 2024'
+        )
+        
+        session.add(new_course)
+        imported += 1
+        
+        if imported % 50 == 0:
+            print(f"📦 Imported {imported} courses so far...")
+    
+    print(f"\n🎉 Import complete!")
+    print(f"   ✅ Imported: {imported}")
+    print(f"   ⏭️  Skipped: {skipped}")
 
 
 if __name__ == '__main__':
@@ -274,8 +293,9 @@ if __name__ == '__main__':
         # Ask to import
         do_import = input("\n❓ Import courses to database? (yes/no): ").strip().lower()
         if do_import == 'yes':
-            import_to_database(courses)
-            print("\n🚀 Done! Restart your app to see the courses.")
+            # --staged builds in a copy and swaps it in, for imports into a running app
+            import_to_database(courses, staged='--staged' in sys.argv)
+            print("\n🚀 Done! Running workers pick up the new courses on their next request.")
         else:
             print("\n💾 Courses saved to courses_data.json")
             print("   Run this script again and type 'yes' to import later")
\ No newline at end of file
@@ -1,46 +1,69 @@
 import requests
-from bs4 import BeautifulSoup
-import time
 import logging
+import os
 from abc import ABC, abstractmethod
 
+from .catalog import normalize_location, save_catalog
+from .fetch import FetchScheduler
+from .http_cache import ResponseCache
+from .soup import make_soup
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Scraped pages and parse results; SCRAPER_REPLAY=1 serves every page from here, offline
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.scrape_cache')
+
 class BaseScraper(ABC):
     """Base class for all scrapers with common functionality"""
     
+    # Politeness: requests per second to any one host, and requests in flight overall
+    requests_per_second = 1.0
+    max_concurrency = 8
+    # Bump when a parser's output changes, so results cached for unchanged pages are discarded
+    parser_version = 1
+    
     def __init__(self, college_name, college_code, base_url):
         self.college_name = college_name
         self.college_code = college_code
         self.base_url = base_url
+        self.logger = logger
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (5C Maps Bot) Academic Research'
         })
+        self.cache = ResponseCache(
+            os.environ.get('SCRAPER_CACHE_DIR', DEFAULT_CACHE_DIR),
+            replay=os.environ.get('SCRAPER_REPLAY') == '1'
+        )
+        self.fetcher = FetchScheduler(
+            self.session,
+            max_concurrency=self.max_concurrency,
+            per_host_rate=self.requests_per_second,
+            cache=self.cache
+        )
         
     def make_request(self, url, method='GET', data=None, headers=None, timeout=10):
-        """Make HTTP request with error handling and rate limiting"""
+        """Make HTTP request with error handling, retries and per-host rate limiting"""
         try:
-            # Rate limiting - be respectful
-            time.sleep(1)
-            
-            if method == 'GET':
-                response = self.session.get(url, timeout=timeout, headers=headers)
-            elif method == 'POST':
-                response = self.session.post(url, data=data, timeout=timeout, headers=headers)
-            
-            response.raise_for_status()
-            return response
-            
+            return self.fetcher.request(url, method=method, data=data, headers=headers, timeout=timeout)
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed for {url}: {str(e)}")
             return None
     
-    def parse_html(self, html_content):
-        """Parse HTML content with BeautifulSoup"""
-        return BeautifulSoup(html_content, 'html.parser')
+    def fetch_all(self, urls, timeout=10):
+        """Fetch many pages concurrently; responses in order, None where a request failed"""
+        return self.fetcher.fetch_all(urls, timeout=timeout)
+    
+    def parse_page(self, response, parse):
+        """parse(response), skipped in favour of last run's result when the page is unchanged"""
+        key = f'{type(self).__name__}.{parse.__name__}:{self.parser_version}'
+        return self.cache.parsed(response, key, parse)
+    
+    def parse_html(self, html_content, parse_only=None):
+        """Parse HTML content with BeautifulSoup, using the fastest installed parser"""
+        return make_soup(html_content, parse_only=parse_only)
     
     def clean_text(self, text):
         """Clean and normalize text content"""
@@ -93,84 +116,11 @@ class BaseScraper(ABC):
         return True
     
     def save_to_database(self, courses_data, locations_data=None):
-        """Save scraped data to database"""
-        from model.models import College, Department, Course, Location, db
-        
-        try:
-            # Find or create college
-            college = College.query.filter_by(code=self.college_code).first()
-            if not college:
-                college = College(name=self.college_name, code=self.college_code)
-                db.session.add(college)
-                db.session.commit()
-            
-            courses_saved = 0
-            
-            # Save courses
-            for course_data in courses_data:
-                if not self.validate_course_data(course_data):
-                    continue
-                
-                # Find or create department
-                department = Department.query.filter_by(
-                    code=course_data['department_code'],
-                    college_id=college.id
-                ).first()
-                
-                if not department:
-                    department = Department(
-                        name=course_data.get('department_name', course_data['department_code']),
-                        code=course_data['department_code'],
-                        college_id=college.id
-                    )
-                    db.session.add(department)
-                    db.session.commit()
-                
-                # Check if course already exists
-                existing_course = Course.query.filter_by(
-                    course_number=course_data['course_number'],
-                    department_id=department.id,
-                    semester=course_data.get('semester', 'Current')
-                ).first()
-                
-                if existing_course:
-                    # Update existing course
-                    existing_course.title = course_data['title']
-                    existing_course.description = course_data.get('description')
-                    existing_course.instructor = course_data.get('instructor')
-                    existing_course.credits = course_data.get('credits', 1)
-                    
-                    if course_data.get('time_slots'):
-                        existing_course.set_time_slots(course_data['time_slots'])
-                    
-                else:
-                    # Create new course
-                    new_course = Course(
-                        title=course_data['title'],
-                        course_number=course_data['course_number'],
-                        description=course_data.get('description'),
-                        credits=course_data.get('credits', 1),
-                        semester=course_data.get('semester', 'Current'),
-                        instructor=course_data.get('instructor'),
-                        department_id=department.id,
-                        college_id=college.id,
-                        enrollment_limit=course_data.get('enrollment_limit')
-                    )
-                    
-                    if course_data.get('time_slots'):
-                        new_course.set_time_slots(course_data['time_slots'])
-                    
-                    db.session.add(new_course)
-                
-                courses_saved += 1
-            
-            db.session.commit()
-            logger.info(f"Successfully saved {courses_saved} courses for {self.college_name}")
-            
-        except Exception as e:
-            logger.error(f"Database save failed: {str(e)}")
-            db.session.rollback()
-            raise
+        """Save scraped courses and locations in one transaction with chunked bulk upserts"""
+        courses = [course_data for course_data in courses_data if self.validate_course_data(course_data)]
+        locations = [location for location in map(normalize_location, locations_data or []) if location is not None]
+        result = save_catalog({self.college_code: {'name': self.college_name, 'courses': courses, 'locations': locations}})
+        return {**result['colleges'][self.college_code], 'seconds': result['seconds']}
     
     @abstractmethod
     def scrape_locations(self):
@@ -203,11 +153,8 @@ class BaseScraper(ABC):
         except Exception as e:
             logger.error(f"Scrape failed for {self.college_name}: {str(e)}")
             return False
+    
+    @abstractmethod
     def scrape_courses(self):
         """Abstract method - each college scraper must implement this"""
         pass
-    
-    @abstractmetho
-    def scrape_locations(self):
-    """Abstract method - each college scraper must implement this"""
-    pass
\ No newline at end of file
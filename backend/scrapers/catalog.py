@@ -0,0 +1,236 @@
+"""
+The scraped catalog: per-college scrape results merged into one normalized
+set of records, and saved to the database in a single transaction.
+
+A catalog maps college code to {'name', 'courses', 'locations'}.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Rows per bulk INSERT/UPDATE statement when saving
+SAVE_CHUNK_SIZE = 1000
+
+REQUIRED_FIELDS = ('title', 'course_number', 'department_code')
+TEXT_FIELDS = ('title', 'description', 'instructor', 'department_name')
+
+# Scraped location fields saved to model.models.Location; a location is
+# identified by its name within its college
+LOCATION_FIELDS = (
+    'name', 'building_code', 'room_number', 'latitude', 'longitude', 'address',
+    'description', 'category', 'hours_info', 'contact_info'
+)
+LOCATION_TEXT_FIELDS = ('name', 'address', 'description', 'hours_info', 'contact_info')
+
+
+def clean_text(text):
+    """Collapse runs of whitespace and trim"""
+    return " ".join(text.split()) if text else text
+
+
+def normalize_course(course):
+    """The course with whitespace collapsed, codes upper-cased and defaults filled in.
+
+    Returns None when a required field is missing.
+    """
+    course = dict(course)
+    for field in TEXT_FIELDS:
+        if isinstance(course.get(field), str):
+            course[field] = clean_text(course[field])
+    for field in ('department_code', 'course_number'):
+        if course.get(field):
+            course[field] = str(course[field]).strip().upper()
+    if any(not course.get(field) for field in REQUIRED_FIELDS):
+        return None
+    course.setdefault('semester', 'Current')
+    course.setdefault('credits', 1)
+    return course
+
+
+def course_key(course):
+    return course['department_code'], course['course_number'], course.get('semester', 'Current')
+
+
+def normalize_location(location):
+    """The location's known fields with whitespace collapsed and codes upper-cased.
+
+    Returns None when it has no name.
+    """
+    location = {field: location[field] for field in LOCATION_FIELDS if location.get(field) is not None}
+    for field in LOCATION_TEXT_FIELDS:
+        if isinstance(location.get(field), str):
+            location[field] = clean_text(location[field])
+    if location.get('building_code'):
+        location['building_code'] = str(location['building_code']).strip().upper()
+    if not location.get('name'):
+        return None
+    return location
+
+
+def merge_catalog(results):
+    """One normalized catalog from scrape results ({'code', 'name', 'courses', 'locations'} each).
+
+    Records missing required fields are dropped; a course or location
+    scraped twice keeps its later record.
+    """
+    catalog = {}
+    for result in results:
+        entry = catalog.setdefault(result['code'], {'name': result['name'], 'courses': {}, 'locations': {}})
+        for course in result['courses']:
+            course = normalize_course(course)
+            if course is not None:
+                entry['courses'][course_key(course)] = course
+        for location in result.get('locations') or []:
+            location = normalize_location(location)
+            if location is not None:
+                entry['locations'][location['name']] = location
+
+    for entry in catalog.values():
+        entry['courses'] = list(entry['courses'].values())
+        entry['locations'] = list(entry['locations'].values())
+    return catalog
+
+
+def _save_locations(db, college_id, locations_data):
+    """Upsert a college's locations by name; returns (inserted, updated).
+
+    Fields a scrape didn't supply keep whatever the database has.
+    """
+    from model.models import Location
+
+    locations = {location_data['name']: location_data for location_data in locations_data}
+    existing_ids = dict(db.session.query(Location.name, Location.id).filter_by(college_id=college_id))
+    inserts = [
+        {**location_data, 'college_id': college_id}
+        for location_name, location_data in locations.items() if location_name not in existing_ids
+    ]
+    updates = [
+        {**location_data, 'id': existing_ids[location_name]}
+        for location_name, location_data in locations.items() if location_name in existing_ids
+    ]
+
+    for chunk_start in range(0, len(inserts), SAVE_CHUNK_SIZE):
+        db.session.execute(db.insert(Location), inserts[chunk_start:chunk_start + SAVE_CHUNK_SIZE])
+    for chunk_start in range(0, len(updates), SAVE_CHUNK_SIZE):
+        db.session.execute(db.update(Location), updates[chunk_start:chunk_start + SAVE_CHUNK_SIZE])
+    return len(inserts), len(updates)
+
+
+def _save_college(db, code, name, courses_data, locations_data=()):
+    from model.models import College, Department, Course
+
+    # Find or create college
+    college = College.query.filter_by(code=code).first()
+    if not college:
+        college = College(name=name, code=code)
+        db.session.add(college)
+        db.session.flush()
+
+    # Later duplicates of a course replace earlier ones
+    courses = {course_key(course_data): course_data for course_data in courses_data}
+
+    # Create missing departments in one insert
+    department_ids = dict(db.session.query(Department.code, Department.id).filter_by(college_id=college.id))
+    new_departments = {}
+    for course_data in courses.values():
+        department_code = course_data['department_code']
+        if department_code not in department_ids and department_code not in new_departments:
+            new_departments[department_code] = {
+                'name': course_data.get('department_name', department_code),
+                'code': department_code,
+                'college_id': college.id
+            }
+    if new_departments:
+        db.session.execute(db.insert(Department), list(new_departments.values()))
+        department_ids = dict(db.session.query(Department.code, Department.id).filter_by(college_id=college.id))
+
+    existing_ids = {
+        (department_id, course_number, semester): course_id
+        for course_id, department_id, course_number, semester in db.session.query(
+            Course.id, Course.department_id, Course.course_number, Course.semester
+        ).filter_by(college_id=college.id)
+    }
+
+    inserts = []
+    updates = []
+    for (department_code, course_number, semester), course_data in courses.items():
+        department_id = department_ids[department_code]
+        course_id = existing_ids.get((department_id, course_number, semester))
+        time_slots = course_data.get('time_slots')
+
+        if course_id is not None:
+            row = {
+                'id': course_id,
+                'title': course_data['title'],
+                'description': course_data.get('description'),
+                'instructor': course_data.get('instructor'),
+                'credits': course_data.get('credits', 1),
+                'updated_at': datetime.utcnow()
+            }
+            if time_slots:
+                row['time_slots'] = json.dumps(time_slots)
+            updates.append(row)
+        else:
+            inserts.append({
+                'title': course_data['title'],
+                'course_number': course_number,
+                'description': course_data.get('description'),
+                'credits': course_data.get('credits', 1),
+                'semester': semester,
+                'instructor': course_data.get('instructor'),
+                'department_id': department_id,
+                'college_id': college.id,
+                'enrollment_limit': course_data.get('enrollment_limit'),
+                'time_slots': json.dumps(time_slots) if time_slots else None
+            })
+
+    for chunk_start in range(0, len(inserts), SAVE_CHUNK_SIZE):
+        db.session.execute(db.insert(Course), inserts[chunk_start:chunk_start + SAVE_CHUNK_SIZE])
+    for chunk_start in range(0, len(updates), SAVE_CHUNK_SIZE):
+        db.session.execute(db.update(Course), updates[chunk_start:chunk_start + SAVE_CHUNK_SIZE])
+
+    locations_inserted, locations_updated = _save_locations(db, college.id, locations_data)
+    return {
+        'inserted': len(inserts), 'updated': len(updates), 'departments': len(new_departments),
+        'locations_inserted': locations_inserted, 'locations_updated': locations_updated
+    }
+
+
+def save_catalog(catalog):
+    """Upsert every college's courses and locations in one transaction with chunked bulk statements.
+
+    Each college's departments, existing courses and locations are loaded up front, so
+    the save costs a handful of queries per college and chunk rather than
+    several per course. Needs an app context; returns counts per college
+    and the seconds taken.
+    """
+    from model.models import db, rebuild_stats_counters, stats_counters_enabled
+
+    start = time.perf_counter()
+    try:
+        saved = {
+            code: _save_college(db, code, entry['name'], entry['courses'], entry.get('locations', ()))
+            for code, entry in catalog.items()
+        }
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Database save failed: {str(e)}")
+        db.session.rollback()
+        raise
+
+    # Bulk statements skip the mapper events that keep the counters current
+    if stats_counters_enabled():
+        rebuild_stats_counters()
+
+    seconds = time.perf_counter() - start
+    rows = sum(counts['inserted'] + counts['updated'] for counts in saved.values())
+    for code, counts in saved.items():
+        logger.info(f"Saved {catalog[code]['name']}: {counts['inserted']} new, {counts['updated']} updated, "
+                    f"{counts['departments']} new departments; locations {counts['locations_inserted']} new, "
+                    f"{counts['locations_updated']} updated")
+    logger.info(f"Saved {rows} courses in {seconds:.2f}s, {rows / max(seconds, 1e-9):.0f} rows/s")
+    return {'colleges': saved, 'rows': rows, 'seconds': seconds}
@@ -0,0 +1,160 @@
+"""
+Concurrent, polite HTTP fetching for scrapers.
+
+Requests run on a thread pool, capped by a global concurrency limit, while
+a token bucket per host keeps each site at its own request rate. Pages on
+different hosts fetch in parallel; pages on one host are spaced no closer
+than that host's rate allows. Connection errors, 429s and 5xx responses
+are retried with jittered exponential backoff, honouring Retry-After.
+Connections are reused through the caller's requests.Session. With a
+ResponseCache, GETs become conditional and replay mode skips the network.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second, with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class FetchScheduler:
+    """Fetch URLs concurrently within per-host and global limits.
+
+    `per_host_rate` is requests per second to any one host; `max_concurrency`
+    caps requests in flight across all hosts, from any thread.
+    """
+
+    def __init__(self, session=None, max_concurrency=8, per_host_rate=1.0, per_host_burst=1,
+                 retries=3, backoff=0.5, max_backoff=30.0, timeout=10, cache=None):
+        self.session = session or requests.Session()
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retried = 0
+
+        # Keep one pooled connection per concurrent request instead of urllib3's default of 10 per host
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._executor = None
+
+    def bucket(self, host):
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.per_host_rate, self.per_host_burst)
+            return bucket
+
+    def set_host_rate(self, host, rate, burst=1):
+        """Override the request rate for one host, e.g. from its robots.txt Crawl-delay"""
+        with self._buckets_lock:
+            self._buckets[host] = TokenBucket(rate, burst)
+
+    def retry_delay(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(self.max_backoff, int(retry_after))
+        # Full jitter: spreads retries from many threads instead of having them collide again
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, url, method='GET', data=None, headers=None, timeout=None):
+        """Send one request, retrying transient failures; raises once retries run out"""
+        cached = self.cache is not None and method == 'GET'
+        if cached:
+            if self.cache.replay:
+                return self.cache.replayed(url)
+            headers = {**self.cache.conditional_headers(url), **(headers or {})}
+
+        bucket = self.bucket(urlsplit(url).netloc)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            response = None
+            try:
+                with self._slots:
+                    response = self.session.request(method, url, data=data, headers=headers,
+                                                    timeout=timeout or self.timeout)
+                if cached and response.status_code == 304:
+                    return self.cache.revalidated(url, response) or response
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    if cached:
+                        self.cache.store(url, response)
+                    return response
+                if attempt >= self.retries:
+                    response.raise_for_status()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                logger.warning(f"Request to {url} failed ({e}), retrying")
+
+            delay = self.retry_delay(attempt, response)
+            if response is not None:
+                logger.warning(f"{url} returned {response.status_code}, retrying in {delay:.1f}s")
+            self.retried += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def fetch_all(self, urls, **kwargs):
+        """Responses for urls in order, fetched concurrently; None where a request failed"""
+        def fetch(url):
+            try:
+                return self.request(url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed for {url}: {str(e)}")
+                return None
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix='fetch')
+        return list(self._executor.map(fetch, urls))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.session.close()
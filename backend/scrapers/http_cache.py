@@ -0,0 +1,158 @@
+"""
+On-disk HTTP cache for scrapers.
+
+Bodies are stored content-addressed (named by their SHA-256, so identical
+pages are stored once) and each URL keeps a small JSON entry with the body
+hash and the ETag/Last-Modified validators it was served with. Repeat
+scrapes send conditional GETs; a 304, or a 200 with the same body, marks
+the response `unchanged` so callers can reuse what they parsed last time.
+
+In replay mode nothing touches the network: every GET is answered from the
+cache, which lets parsers be developed and benchmarked offline.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Response headers worth keeping for parsing a replayed page
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CacheMiss(requests.exceptions.RequestException):
+    """Replay mode was asked for a page the cache doesn't have"""
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ResponseCache:
+    def __init__(self, directory, replay=False):
+        self.directory = directory
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def _entry_path(self, url):
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, 'entries', digest[:2], digest + '.json')
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.directory, 'bodies', body_hash[:2], body_hash)
+
+    def _result_path(self, body_hash, key):
+        digest = hashlib.sha256(f'{body_hash}:{key}'.encode()).hexdigest()
+        return os.path.join(self.directory, 'parsed', digest[:2], digest + '.json')
+
+    def entry(self, url):
+        try:
+            with open(self._entry_path(url)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since for the cached copy of url"""
+        entry = self.entry(url)
+        if entry is None or not os.path.exists(self._body_path(entry['body_hash'])):
+            return {}
+        headers = {}
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def cached_response(self, url):
+        """The cached page as a 200 response, or None"""
+        entry = self.entry(url)
+        if entry is None:
+            return None
+        try:
+            with open(self._body_path(entry['body_hash']), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.body_hash = entry['body_hash']
+        response.unchanged = True
+        return response
+
+    def store(self, url, response):
+        """Save a 200 response, marking it unchanged if the body is what we already had"""
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        previous = self.entry(url)
+        response.body_hash = body_hash
+        response.unchanged = previous is not None and previous['body_hash'] == body_hash
+
+        body_path = self._body_path(body_hash)
+        if not os.path.exists(body_path):
+            _write_atomic(body_path, response.content)
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        entry = {'url': url, 'body_hash': body_hash, 'headers': headers}
+        if entry != previous:
+            _write_atomic(self._entry_path(url), json.dumps(entry).encode())
+
+    def revalidated(self, url, response):
+        """Response for a 304: the cached page, with any refreshed validators saved"""
+        cached = self.cached_response(url)
+        if cached is None:
+            return None
+        self.not_modified += 1
+        refreshed = {name: response.headers[name] for name in ('ETag', 'Last-Modified') if name in response.headers}
+        if refreshed and any(cached.headers.get(name) != value for name, value in refreshed.items()):
+            cached.headers.update(refreshed)
+            entry = {'url': url, 'body_hash': cached.body_hash,
+                     'headers': {name: cached.headers[name] for name in KEPT_HEADERS if name in cached.headers}}
+            _write_atomic(self._entry_path(url), json.dumps(entry).encode())
+        return cached
+
+    def replayed(self, url):
+        """Replay mode: the cached page or CacheMiss, without any request"""
+        response = self.cached_response(url)
+        if response is None:
+            self.misses += 1
+            raise CacheMiss(f"{url} is not in the scrape cache at {self.directory}")
+        self.hits += 1
+        return response
+
+    def parsed(self, response, key, parse):
+        """parse(response), reused from disk while the page body is unchanged.
+
+        key names the parser and its output format; change it when the parser
+        changes. Replay mode always parses, since that's what it's for.
+        """
+        body_hash = getattr(response, 'body_hash', None)
+        if body_hash is None or self.replay:
+            return parse(response)
+
+        path = self._result_path(body_hash, key)
+        if getattr(response, 'unchanged', False):
+            try:
+                with open(path) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        result = parse(response)
+        _write_atomic(path, json.dumps(result).encode())
+        return result
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified}
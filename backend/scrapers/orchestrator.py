@@ -0,0 +1,147 @@
+"""
+Scrape every registered college in parallel worker processes, merge the
+results into one normalized catalog and save it in a single transaction.
+Run from backend/: python -m scrapers.orchestrator [--colleges PO CMC] [--workers 5] [--out catalog.json]
+
+Each college gets its own worker process, so one college's network waits
+and parsing don't hold up the others. A scraper that raises only drops
+that college from the catalog; its rows already in the database stay as
+they were.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from flask import Flask
+
+from .catalog import merge_catalog, save_catalog
+from .registry import load_scrapers
+
+
+def scrape_college(scraper_class):
+    """Run one college's scraper (in a worker process); returns its records and stage timings"""
+    scraper = scraper_class()
+    try:
+        start = time.perf_counter()
+        courses = scraper.scrape_courses()
+        scraped = time.perf_counter()
+        try:
+            locations = scraper.scrape_locations()
+        except NotImplementedError:
+            locations = []
+        finished = time.perf_counter()
+    finally:
+        scraper.fetcher.close()
+
+    return {
+        'code': scraper.college_code,
+        'name': scraper.college_name,
+        'courses': courses,
+        'locations': locations,
+        'timings': {'courses': scraped - start, 'locations': finished - scraped}
+    }
+
+
+def run_scrapers(scraper_classes, workers=None):
+    """Scrape {code: scraper class} concurrently; returns (results, {code: error})"""
+    results = []
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers or len(scraper_classes)) as pool:
+        futures = {pool.submit(scrape_college, scraper_class): code for code, scraper_class in scraper_classes.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            code = futures[future]
+            progress = f"[{done}/{len(futures)}]"
+            try:
+                result = future.result()
+            except Exception as e:
+                failures[code] = f"{type(e).__name__}: {e}"
+                print(f"{progress} ❌ {code} failed: {failures[code]}")
+                continue
+
+            results.append(result)
+            timings = result['timings']
+            print(f"{progress} ✅ {code}: {len(result['courses'])} courses in {timings['courses']:.1f}s, "
+                  f"{len(result['locations'])} locations in {timings['locations']:.1f}s")
+
+    # Completion order varies run to run; merge in a fixed order
+    results.sort(key=lambda result: result['code'])
+    return results, failures
+
+
+def orchestrate(scraper_classes, workers=None, save=True):
+    """Scrape, merge and (with an app context) save; returns the catalog, failures and stage timings"""
+    timings = {}
+    start = time.perf_counter()
+    results, failures = run_scrapers(scraper_classes, workers)
+    timings['scrape'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    catalog = merge_catalog(results)
+    timings['merge'] = time.perf_counter() - start
+
+    saved = None
+    if save and catalog:
+        start = time.perf_counter()
+        saved = save_catalog(catalog)
+        timings['save'] = time.perf_counter() - start
+
+    return {
+        'catalog': catalog,
+        'failures': failures,
+        'saved': saved,
+        'timings': timings,
+        'college_timings': {result['code']: result['timings'] for result in results}
+    }
+
+
+def create_app():
+    """Flask app for the scraped-catalog models in model.models"""
+    from model.models import db
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SCRAPER_DATABASE_URL', 'sqlite:///scraped_catalog.db')
+    db.init_app(app)
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape every college in parallel and save one merged catalog')
+    parser.add_argument('--colleges', nargs='+', metavar='CODE', help='only these college codes')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per college)')
+    parser.add_argument('--out', help='also write the merged catalog to this JSON file')
+    parser.add_argument('--no-save', action='store_true', help="don't write to the database")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    scrapers = load_scrapers()
+    if args.colleges:
+        unknown = set(args.colleges) - set(scrapers)
+        if unknown:
+            sys.exit(f"❌ No scraper registered for {', '.join(sorted(unknown))}")
+        scrapers = {code: scrapers[code] for code in args.colleges}
+
+    from model.models import db
+
+    print(f"🕷️  Scraping {len(scrapers)} college(s): {', '.join(scrapers)}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        report = orchestrate(scrapers, args.workers, save=not args.no_save)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report['catalog'], f, indent=2)
+        print(f"💾 Wrote merged catalog to {args.out}")
+
+    courses = sum(len(entry['courses']) for entry in report['catalog'].values())
+    stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in report['timings'].items())
+    print(f"\n🎉 {courses} courses from {len(report['catalog'])} college(s) ({stages})")
+    if report['failures']:
+        print(f"❌ {len(report['failures'])} college(s) failed: {', '.join(report['failures'])}")
+    sys.exit(1 if report['failures'] else 0)
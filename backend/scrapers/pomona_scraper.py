@@ -1,7 +1,9 @@
 from .base_scraper import BaseScraper
+from .registry import register
 import re
 import json
 
+@register('PO')
 class PomonaScraper(BaseScraper):
     """Scraper for Pomona College course data"""
     
@@ -41,6 +43,11 @@ class PomonaScraper(BaseScraper):
         if not response:
             return courses
         
+        return self.parse_page(response, self._parse_catalog_page)
+    
+    def _parse_catalog_page(self, response):
+        """Course records on one catalog page"""
+        courses = []
         soup = self.parse_html(response.text)
         
         # Example parsing - adapt to actual HTML structure
@@ -0,0 +1,28 @@
+"""
+Scrapers by college code. Each scraper module decorates its class with
+@register(code); list the module in SCRAPER_MODULES so the orchestrator
+imports it.
+"""
+
+import importlib
+
+SCRAPER_MODULES = (
+    'scrapers.pomona_scraper',
+)
+
+SCRAPERS = {}
+
+
+def register(code):
+    """Class decorator adding a BaseScraper subclass to the registry under code"""
+    def decorator(cls):
+        SCRAPERS[code] = cls
+        return cls
+    return decorator
+
+
+def load_scrapers():
+    """Import every scraper module; returns {code: scraper class}"""
+    for module in SCRAPER_MODULES:
+        importlib.import_module(module)
+    return dict(SCRAPERS)
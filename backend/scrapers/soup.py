@@ -0,0 +1,44 @@
+"""
+HTML parser backends for BeautifulSoup. By default the fastest installed
+backend is used: lxml's C parser (pip install lxml) when it's there,
+otherwise Python's built-in html.parser. SCRAPER_HTML_PARSER picks a
+backend explicitly; if that one isn't installed we fall back to the
+default with a warning.
+"""
+
+import logging
+import os
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+logger = logging.getLogger(__name__)
+
+# Known backends, fastest first. html5lib parses like a browser but is the
+# slowest, so it is only used when asked for.
+PARSER_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+AUTO_BACKENDS = ('lxml', 'html.parser')
+
+
+def available_parsers():
+    """Installed backends, fastest first"""
+    return [name for name in PARSER_BACKENDS if builder_registry.lookup(name)]
+
+
+def default_parser():
+    """SCRAPER_HTML_PARSER if it's installed, else the fastest installed backend"""
+    requested = os.environ.get('SCRAPER_HTML_PARSER')
+    if requested:
+        if builder_registry.lookup(requested):
+            return requested
+        logger.warning(f"HTML parser '{requested}' is not installed; falling back")
+    return next(name for name in AUTO_BACKENDS if builder_registry.lookup(name))
+
+
+def make_soup(html_content, parser=None, parse_only=None):
+    """BeautifulSoup for html_content with parser, or the default backend"""
+    parser = parser or default_parser()
+    if parser == 'html5lib':
+        # html5lib always builds the whole tree (and warns when given a strainer)
+        parse_only = None
+    return BeautifulSoup(html_content, parser, parse_only=parse_only)
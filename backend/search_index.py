@@ -0,0 +1,295 @@
+"""
+In-memory search indexes for the course catalog and campus buildings.
+
+Indexes are immutable once built; VersionedIndex swaps in a fresh one when
+the catalog version changes, so readers never wait on a rebuild.
+"""
+
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import groupby
+
+# Suggestion kinds, best first when two suggestions match equally well
+KIND_PRIORITY = {'course_code': 0, 'location': 1, 'title': 2, 'instructor': 3}
+
+# Prefixes matching more keys than this are too slow to rank per request,
+# so their top suggestions are computed at build time
+SCAN_LIMIT = 256
+MAX_SUGGESTIONS = 50
+
+# Fuzzy matching: how many trigram candidates get the exact edit-distance
+# rerank, and the share of all entries above which a trigram is too common to
+# narrow anything down
+FUZZY_CANDIDATES = 60
+FUZZY_COMMON_TRIGRAM = 0.05
+FUZZY_MAX_SCORE = 0.4
+
+# "calc 1" should find "Calculus I"
+ROMAN_NUMERALS = {'1': 'i', '2': 'ii', '3': 'iii', '4': 'iv', '5': 'v', '6': 'vi'}
+
+_non_alnum = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """Lowercase and collapse punctuation/whitespace to single spaces"""
+    return _non_alnum.sub(' ', (text or '').lower()).strip()
+
+
+class Suggestion:
+    __slots__ = ('kind', 'text', 'ref_id', 'count')
+
+    def __init__(self, kind, text, ref_id):
+        self.kind = kind
+        self.text = text
+        self.ref_id = ref_id
+        self.count = 1
+
+    def to_dict(self):
+        return {'type': self.kind, 'text': self.text, 'id': self.ref_id, 'count': self.count}
+
+
+def collect_suggestions(entries):
+    """Collapse (kind, text, ref_id) entries into Suggestions, one per (kind, text)"""
+    suggestions = {}
+    for kind, text, ref_id in entries:
+        if not text:
+            continue
+        key = (kind, text)
+        if key in suggestions:
+            suggestions[key].count += 1
+        else:
+            suggestions[key] = Suggestion(kind, text, ref_id)
+    return list(suggestions.values())
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is certain to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, cb in enumerate(b, 1):
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index for typeahead.
+
+    Every word boundary of a suggestion's text is a key, so "calc" finds
+    "Calculus I" and "intro" finds "Intro to Africana Studies". A query is a
+    binary search plus a scan of the matching key range.
+    """
+
+    def __init__(self, entries):
+        """entries: iterable of (kind, text, ref_id). Repeated (kind, text) pairs,
+        such as the sections of one course, collapse into a single suggestion."""
+        self.suggestions = collect_suggestions(entries)
+        keys = []
+        for position, suggestion in enumerate(self.suggestions):
+            words = normalize(suggestion.text).split(' ')
+            for start in range(len(words)):
+                # start 0 is a match on the whole text, which ranks higher
+                keys.append((' '.join(words[start:]), min(start, 1), position))
+        keys.sort()
+
+        self._keys = [key for key, _, _ in keys]
+        self._matches = [(word_start, position) for _, word_start, position in keys]
+
+        self._precomputed = {}
+        self._precompute_busy_prefixes()
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def _precompute_busy_prefixes(self):
+        # Keys sharing a prefix are contiguous, so each prefix length is one
+        # pass over the key ranges that were still too big at the last length
+        ranges = [(0, len(self._keys))]
+        length = 1
+        while ranges:
+            busy = []
+            for start, end in ranges:
+                position = start
+                groups = groupby(range(start, end), key=lambda i: self._keys[i][:length])
+                for prefix, members in groups:
+                    size = sum(1 for _ in members)
+                    if size > SCAN_LIMIT and len(prefix) == length:
+                        self._precomputed[prefix] = self._top(position, position + size, MAX_SUGGESTIONS)
+                        busy.append((position, position + size))
+                    position += size
+            ranges = busy
+            length += 1
+
+    def _top(self, start, end, limit):
+        best = {}
+        for word_start, position in self._matches[start:end]:
+            best[position] = min(best.get(position, word_start), word_start)
+        return heapq.nsmallest(limit, best, key=lambda position: self._rank(best[position], position))
+
+    def _rank(self, word_start, position):
+        suggestion = self.suggestions[position]
+        return (word_start, KIND_PRIORITY.get(suggestion.kind, len(KIND_PRIORITY)),
+                -suggestion.count, len(suggestion.text), suggestion.text)
+
+    def search(self, query, limit=10):
+        """Top `limit` suggestions whose text has a word starting with `query`"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        if prefix in self._precomputed:
+            positions = self._precomputed[prefix][:limit]
+        else:
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + '\uffff', start)
+            positions = self._top(start, end, limit)
+
+        return [self.suggestions[position] for position in positions]
+
+
+class FuzzyIndex:
+    """Typo-tolerant lookup: trigram candidates, reranked by edit distance.
+
+    Each query token's trigrams pull candidates from posting lists, the best
+    FUZZY_CANDIDATES of the wanted kinds by shared trigrams are scored word by word with a bounded
+    Levenshtein distance, so a query never compares against every entry.
+    """
+
+    def __init__(self, entries):
+        self.suggestions = collect_suggestions(entries)
+        self._tokens = []
+        postings = {}
+        for position, suggestion in enumerate(self.suggestions):
+            tokens = self.tokenize(suggestion.text)
+            self._tokens.append(tokens)
+            for trigram in {t for token in tokens for t in self.trigrams(token)}:
+                postings.setdefault(trigram, array('I')).append(position)
+        self._postings = postings
+        self._common = max(1, int(len(self.suggestions) * FUZZY_COMMON_TRIGRAM))
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    @staticmethod
+    def tokenize(text):
+        return [ROMAN_NUMERALS.get(token, token) for token in normalize(text).split(' ') if token]
+
+    @staticmethod
+    def trigrams(token):
+        padded = f'  {token} '
+        return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    def _candidates(self, tokens, kinds=None):
+        lists = [self._postings[t] for token in tokens for t in self.trigrams(token) if t in self._postings]
+        rare = [posting for posting in lists if len(posting) <= self._common]
+        # If every trigram is common, fall back to the rarest ones
+        if not rare:
+            rare = sorted(lists, key=len)[:2]
+
+        shared = Counter()
+        for posting in rare:
+            shared.update(posting)
+        if kinds:
+            # Filter before cutting to the top candidates, or the other kinds could fill them all
+            shared = Counter({
+                position: count for position, count in shared.items() if self.suggestions[position].kind in kinds
+            })
+        return [position for position, _ in shared.most_common(FUZZY_CANDIDATES)]
+
+    @staticmethod
+    def _token_distance(query_token, token):
+        limit = max(1, len(query_token) // 2)
+        best = edit_distance(query_token, token, limit)
+        if len(token) > len(query_token):
+            # Typed-so-far prefixes cost half a point extra
+            best = min(best, edit_distance(query_token, token[:len(query_token)], limit) + 0.5)
+        return best
+
+    def _score(self, query_tokens, tokens, distances):
+        """Edit distance per query character; a query word may also be a prefix.
+
+        `distances` memoizes token pairs across the candidates of one query,
+        since catalog entries share most of their words.
+        """
+        total = 0
+        for query_token in query_tokens:
+            best = len(query_token)
+            for token in tokens:
+                pair = (query_token, token)
+                if pair not in distances:
+                    distances[pair] = self._token_distance(query_token, token)
+                best = min(best, distances[pair])
+            total += best
+        return total / sum(len(token) for token in query_tokens)
+
+    def search(self, query, limit=10, kinds=None):
+        """Best matches for `query` scoring at most FUZZY_MAX_SCORE, best first"""
+        query_tokens = self.tokenize(query)
+        if not query_tokens:
+            return []
+
+        scored = []
+        distances = {}
+        for position in self._candidates(query_tokens, kinds):
+            suggestion = self.suggestions[position]
+            score = self._score(query_tokens, self._tokens[position], distances)
+            if score <= FUZZY_MAX_SCORE:
+                scored.append((score, -suggestion.count, len(suggestion.text), position))
+
+        return [self.suggestions[position] for *_, position in heapq.nsmallest(limit, scored)]
+
+
+class VersionedIndex:
+    """Holds an index and rebuilds it when its data version changes.
+
+    `version` is checked at most once per `check_interval` seconds, and the
+    rebuild happens on one thread while others keep using the previous index.
+    """
+
+    def __init__(self, build, version, check_interval=1.0):
+        self._build = build
+        self._version = version
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_version = None
+        self._checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < self._check_interval:
+            return self._index
+
+        # Only one thread rebuilds; the rest keep serving the current index
+        if not self._lock.acquire(blocking=self._index is None):
+            return self._index
+        try:
+            if self._index is None or time.monotonic() - self._checked_at >= self._check_interval:
+                version = self._version()
+                if self._index is None or version != self._index_version:
+                    self._index = self._build()
+                    self._index_version = version
+                self._checked_at = time.monotonic()
+            return self._index
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        self._checked_at = 0.0
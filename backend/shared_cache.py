@@ -0,0 +1,128 @@
+"""
+Optional Redis layer shared by every worker on every host.
+
+Serialized responses are stored under their cache key plus the table
+versions they were computed from, so a peer only ever reads entries that
+match the versions it sees. Writes publish the tables they touched on an
+invalidation channel; each worker's subscriber thread reacts by reloading
+its table versions, which is how stale local entries get noticed within a
+second of a write on any node.
+
+The redis package is only needed when CACHE_REDIS_URL is set.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'chizu:invalidate'
+
+
+class RedisBackend:
+    def __init__(self, client, prefix='chizu:cache:', ttl=300):
+        # Imported here so an app without a shared cache never loads redis
+        from redis import RedisError
+        self._redis_error = RedisError
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_REDIS_URL is set but the redis package is not installed")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, key, versions):
+        digest = hashlib.sha1(repr((key, versions)).encode()).hexdigest()
+        return self.prefix + digest
+
+    def get(self, key, versions):
+        """(status, mimetype, body) stored for key at these versions, or None"""
+        try:
+            value = self.client.get(self._key(key, versions))
+        except self._redis_error as e:
+            logger.warning("Shared cache get failed: %s", e)
+            self.errors += 1
+            return None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        header, body = value.split(b'\n', 1)
+        header = json.loads(header)
+        return header['status'], header['mimetype'], body
+
+    def set(self, key, versions, status, mimetype, body):
+        header = json.dumps({'status': status, 'mimetype': mimetype}).encode()
+        try:
+            self.client.set(self._key(key, versions), header + b'\n' + body, ex=self.ttl)
+        except self._redis_error as e:
+            logger.warning("Shared cache set failed: %s", e)
+            self.errors += 1
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'errors': self.errors, 'ttl': self.ttl}
+
+    def publish_invalidation(self, tables):
+        try:
+            self.client.publish(INVALIDATION_CHANNEL, json.dumps(sorted(tables)))
+        except self._redis_error as e:
+            logger.warning("Invalidation publish failed: %s", e)
+
+    def subscribe(self, on_invalidate, retry_seconds=1.0):
+        """Call on_invalidate(tables) for every published invalidation.
+
+        Runs on a daemon thread and reconnects after errors; a message missed
+        while disconnected is covered by the version reload interval.
+        """
+        def listen():
+            while True:
+                try:
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(INVALIDATION_CHANNEL)
+                    for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            on_invalidate(set(json.loads(message['data'])))
+                except Exception as e:
+                    logger.warning("Invalidation subscriber error, reconnecting: %s", e)
+                    time.sleep(retry_seconds)
+
+        thread = threading.Thread(target=listen, name='cache-invalidation', daemon=True)
+        thread.start()
+        return thread
+
+
+class VersionSnapshot:
+    """Table versions held in memory between reloads.
+
+    With a shared backend, cache hits read versions from here instead of the
+    database; the snapshot reloads after `max_age` seconds or as soon as an
+    invalidation arrives, whichever comes first.
+    """
+
+    def __init__(self, load, max_age=1.0):
+        self._load = load
+        self._max_age = max_age
+        self._versions = None
+        self._loaded_at = 0.0
+
+    def get(self, *table_names):
+        if self._versions is None or time.monotonic() - self._loaded_at >= self._max_age:
+            # Stamp before loading: an invalidation during the load must win
+            loaded_at = time.monotonic()
+            self._versions = self._load()
+            self._loaded_at = loaded_at
+        return tuple(self._versions.get(name, 0) for name in table_names)
+
+    def invalidate(self):
+        self._loaded_at = 0.0
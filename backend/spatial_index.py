@@ -0,0 +1,176 @@
+"""
+In-memory spatial index for "which building am I in": building outlines
+packed into an STR-tree (Sort-Tile-Recursive) so a lookup only tests the
+few outlines whose bounding boxes are near the point.
+
+Like the search indexes it is immutable once built; wrap it in a
+VersionedIndex to rebuild when footprints change.
+"""
+
+import heapq
+import math
+
+import geo
+
+# Entries per tree node; small nodes mean fewer bbox tests per level
+NODE_CAPACITY = 16
+# How far from any building a point may be and still get a nearest one,
+# by default and at most
+NEAREST_RADIUS = 150.0
+MAX_NEAREST_RADIUS = 1000.0
+
+
+def point_in_ring(x, y, ring):
+    """Even-odd ray casting; ring is a closed list of (x, y)"""
+    inside = False
+    x1, y1 = ring[0]
+    for x2, y2 in ring[1:]:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def ring_distance(x, y, ring):
+    """Distance from (x, y) to the nearest edge of ring"""
+    return min(geo.segment_distance((x, y), a, b) for a, b in zip(ring, ring[1:]))
+
+
+def _bbox_distance(x, y, box):
+    dx = max(box[0] - x, 0.0, x - box[2])
+    dy = max(box[1] - y, 0.0, y - box[3])
+    return math.hypot(dx, dy)
+
+
+def _pack(boxes, capacity):
+    """Group boxes into STR parent nodes; returns [(bbox, [child indexes])]"""
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][0] + boxes[i][2])
+    leaves = math.ceil(len(boxes) / capacity)
+    slice_size = capacity * math.ceil(math.sqrt(leaves))
+
+    nodes = []
+    for start in range(0, len(order), slice_size):
+        column = sorted(order[start:start + slice_size], key=lambda i: boxes[i][1] + boxes[i][3])
+        for group_start in range(0, len(column), capacity):
+            children = column[group_start:group_start + capacity]
+            nodes.append((
+                (min(boxes[i][0] for i in children), min(boxes[i][1] for i in children),
+                 max(boxes[i][2] for i in children), max(boxes[i][3] for i in children)),
+                children
+            ))
+    return nodes
+
+
+class Located:
+    __slots__ = ('location_id', 'inside', 'distance')
+
+    def __init__(self, location_id, inside, distance):
+        self.location_id = location_id
+        self.inside = inside
+        self.distance = distance
+
+    def to_dict(self):
+        return {'location_id': self.location_id, 'inside': self.inside, 'distance_m': round(self.distance, 1)}
+
+
+class BuildingIndex:
+    """Buildings by outline (or, without one, by point) for point lookups.
+
+    entries are (location_id, ring) with ring a closed list of (lat, lon),
+    or (location_id, (lat, lon)) for a location known only by its point.
+    Coordinates are projected to meters around the entries' mean latitude.
+    """
+
+    def __init__(self, entries, capacity=NODE_CAPACITY):
+        entries = list(entries)
+        self.location_ids = []
+        self.shapes = []
+        self.boxes = []
+        self.areas = []
+        if not entries:
+            self.ref_lat = 0.0
+            self.levels = []
+            return
+
+        points = [shape if isinstance(shape[0], float) else shape[0] for _, shape in entries]
+        self.ref_lat = sum(lat for lat, _ in points) / len(points)
+        for location_id, shape in entries:
+            outline = shape if not isinstance(shape[0], float) else [shape]
+            xy = geo.project(outline, self.ref_lat)
+            box = (min(x for x, _ in xy), min(y for _, y in xy), max(x for x, _ in xy), max(y for _, y in xy))
+            self.location_ids.append(location_id)
+            self.shapes.append(xy)
+            self.boxes.append(box)
+            self.areas.append((box[2] - box[0]) * (box[3] - box[1]))
+
+        # levels[0] groups entries, each later level groups the one below;
+        # the last level is the single root
+        self.levels = [_pack(self.boxes, capacity)]
+        while len(self.levels[-1]) > 1:
+            self.levels.append(_pack([box for box, _ in self.levels[-1]], capacity))
+
+    def __len__(self):
+        return len(self.location_ids)
+
+    def _project(self, lat, lon):
+        (x, y), = geo.project([(lat, lon)], self.ref_lat)
+        return x, y
+
+    def containing(self, lat, lon):
+        """Index of the smallest building whose outline contains the point, or None"""
+        if not self.levels:
+            return None
+        x, y = self._project(lat, lon)
+        best = None
+        stack = [(len(self.levels) - 1, 0)]
+        while stack:
+            depth, node = stack.pop()
+            box, children = self.levels[depth][node]
+            if not (box[0] <= x <= box[2] and box[1] <= y <= box[3]):
+                continue
+            if depth:
+                stack.extend((depth - 1, child) for child in children)
+                continue
+            for entry in children:
+                entry_box = self.boxes[entry]
+                if (entry_box[0] <= x <= entry_box[2] and entry_box[1] <= y <= entry_box[3]
+                        and len(self.shapes[entry]) > 1 and point_in_ring(x, y, self.shapes[entry])
+                        and (best is None or self.areas[entry] < self.areas[best])):
+                    best = entry
+        return best
+
+    def nearest(self, lat, lon, radius=NEAREST_RADIUS):
+        """(index, meters) of the building edge or point closest to the point within radius, or None"""
+        if not self.levels:
+            return None
+        x, y = self._project(lat, lon)
+        best, best_distance = None, radius
+        root = len(self.levels) - 1
+        heap = [(_bbox_distance(x, y, self.levels[root][0][0]), root, 0)]
+        while heap:
+            distance, depth, node = heapq.heappop(heap)
+            if distance > best_distance:
+                break
+            if depth < 0:
+                shape = self.shapes[node]
+                exact = math.hypot(x - shape[0][0], y - shape[0][1]) if len(shape) == 1 else ring_distance(x, y, shape)
+                if exact < best_distance or (exact == best_distance and best is None):
+                    best, best_distance = node, exact
+                continue
+            for child in self.levels[depth][node][1]:
+                child_box = self.boxes[child] if depth == 0 else self.levels[depth - 1][child][0]
+                child_distance = _bbox_distance(x, y, child_box)
+                if child_distance <= best_distance:
+                    heapq.heappush(heap, (child_distance, depth - 1, child))
+        return None if best is None else (best, best_distance)
+
+    def locate(self, lat, lon, radius=NEAREST_RADIUS):
+        """The building the point is inside, else the nearest one within radius meters; None if neither"""
+        inside = self.containing(lat, lon)
+        if inside is not None:
+            return Located(self.location_ids[inside], True, 0.0)
+        found = self.nearest(lat, lon, radius)
+        if found is None:
+            return None
+        entry, distance = found
+        return Located(self.location_ids[entry], False, distance)
@@ -0,0 +1,45 @@
+"""
+Shared fixtures. Run from backend/: python -m pytest
+
+The app module is imported once per session against a throwaway SQLite
+file, with query budgets raising, so tests never touch instance/.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'tests.db')
+os.environ['QUERY_BUDGET_MODE'] = 'raise'
+os.environ.pop('CACHE_REDIS_URL', None)
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    import app
+    app.app.testing = True
+    app.create_app(listen=False)
+    return app
+
+
+@pytest.fixture(scope='session')
+def seeded_app(app_module):
+    """The app with a few rows in every table, enough to expose an N+1"""
+    import generate_data
+    from benchmarks.check_query_budgets import SCALE
+    with app_module.app.app_context():
+        generate_data.Generator(generate_data.parse_args(SCALE)).run()
+    return app_module
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def session(app_module):
+    with app_module.app.app_context():
+        yield app_module.db.session
+        app_module.db.session.rollback()
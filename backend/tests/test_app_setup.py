@@ -0,0 +1,26 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_module_level_app_sets_itself_up_on_first_request(tmp_path):
+    """Serving app:app directly, as `gunicorn app:app` does, without create_app()"""
+    database = tmp_path / 'fresh.db'
+    script = textwrap.dedent("""
+        import app
+        response = app.app.test_client().get('/api/v1/locations')
+        assert response.status_code == 200, response.status_code
+        assert response.get_json() == []
+        assert app.app.test_client().get('/metrics').status_code == 200
+    """)
+    env = {**os.environ, 'DATABASE_URL': f'sqlite:///{database}'}
+    result = subprocess.run([sys.executable, '-c', script], cwd=BACKEND, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert 'Serving without create_app()' in result.stderr
+    with sqlite3.connect(database) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
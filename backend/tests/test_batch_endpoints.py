@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.mark.parametrize('method, path, body, error', [
+    ('post', '/api/v1/starred/batch', None, 'JSON object body required'),
+    ('post', '/api/v1/starred/batch', [1, 2], 'JSON object body required'),
+    ('post', '/api/v1/starred/batch', {'items': []}, 'user_id required'),
+    ('post', '/api/v1/starred/batch', {'user_id': 1, 'items': {'item_type': 'location'}}, 'items must be a list'),
+    ('post', '/api/v1/starred/batch', {'user_id': 1, 'items': [{'item_id': 3}]}, 'each item needs an item_type and an item_id'),
+    ('delete', '/api/v1/starred/batch', {'user_id': 1, 'items': [{'item_type': 'location'}]}, 'each item needs an item_type and an item_id'),
+    ('delete', '/api/v1/starred/batch', {'user_id': 1, 'items': [{'item_type': 'location', 'item_id': 'x'}]}, 'item_id must be an integer'),
+    ('post', '/api/v1/starred/batch', {'user_id': [1], 'items': []}, 'user_id must be an integer'),
+    ('post', '/api/v1/starred/batch', {'user_id': {'id': 1}, 'items': []}, 'user_id must be an integer'),
+    ('post', '/api/v1/starred/batch', {'user_id': 1.5, 'items': []}, 'user_id must be an integer'),
+    ('post', '/api/v1/starred/batch', {'user_id': 1, 'items': [{'item_type': 'pizza', 'item_id': 3}]},
+     'item_type must be one of course, event, location'),
+    ('post', '/api/v1/user/courses/batch', None, 'JSON object body required'),
+    ('post', '/api/v1/user/courses/batch', {'user_id': 'me', 'course_ids': [1]}, 'user_id must be an integer'),
+    ('post', '/api/v1/user/courses/batch', {'user_id': 1, 'course_ids': [1, None]}, 'course_ids must be integers'),
+    ('delete', '/api/v1/user/courses/batch', {'user_id': 1, 'course_ids': ['abc']}, 'course_ids must be integers'),
+])
+def test_malformed_batch_bodies_are_rejected(client, method, path, body, error):
+    kwargs = {'data': 'not json', 'content_type': 'application/json'} if body is None else {'json': body}
+    response = getattr(client, method)(path, **kwargs)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+
+
+def test_batch_star_and_unstar(client):
+    items = [{'item_type': 'location', 'item_id': 1}, {'item_type': 'course', 'item_id': '2'}]
+    response = client.post('/api/v1/starred/batch', json={'user_id': 901, 'items': items + items[:1]})
+    assert response.status_code == 200
+    assert sorted((s['item_type'], s['item_id']) for s in response.get_json()) == [('course', 2), ('location', 1)]
+
+    response = client.delete('/api/v1/starred/batch', json={'user_id': 901, 'items': items})
+    assert response.get_json()['removed'] == 2
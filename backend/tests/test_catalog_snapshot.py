@@ -0,0 +1,85 @@
+import pytest
+
+from catalog_snapshot import CatalogChangedError, StagingVerificationError
+
+
+def location_names(app_module):
+    return {name for name, in app_module.db.session.query(app_module.Location.name)}
+
+
+def write_live_location(app_module, name):
+    """Commit a location to the live database the way a request would, outside the import"""
+    with app_module.app.app_context():
+        app_module.db.session.add(app_module.Location(name=name, category='academic'))
+        app_module.db.session.commit()
+
+
+def test_write_during_staged_import_survives(app_module, session):
+    calls = []
+
+    def import_into(staging):
+        calls.append(len(calls))
+        staging.add(app_module.Location(name='Staged Hall', category='academic'))
+        if len(calls) == 1:
+            write_live_location(app_module, 'Written Mid-Import Hall')
+
+    app_module.import_catalog_staged(import_into)
+
+    session.expire_all()
+    names = location_names(app_module)
+    assert 'Written Mid-Import Hall' in names
+    assert 'Staged Hall' in names
+    assert len(calls) == 2
+
+
+def test_import_gives_up_when_catalog_keeps_changing(app_module, session):
+    def import_into(staging):
+        staging.add(app_module.Location(name='Never Swapped Hall', category='academic'))
+        write_live_location(app_module, 'Busy Hall')
+
+    with pytest.raises(CatalogChangedError):
+        app_module.import_catalog_staged(import_into)
+
+    session.expire_all()
+    names = location_names(app_module)
+    assert 'Never Swapped Hall' not in names
+    assert 'Busy Hall' in names
+
+
+def test_import_that_loses_rows_is_refused(app_module, session):
+    write_live_location(app_module, 'Kept Hall')
+
+    def import_into(staging):
+        staging.query(app_module.Location).filter_by(name='Kept Hall').delete()
+
+    with pytest.raises(StagingVerificationError):
+        app_module.import_catalog_staged(import_into)
+
+    session.expire_all()
+    assert 'Kept Hall' in location_names(app_module)
+
+
+class RecordingSharedCache:
+    def __init__(self):
+        self.published = []
+
+    def publish_invalidation(self, tables):
+        self.published.append(set(tables))
+
+
+def test_staged_import_bumps_and_publishes_once_after_the_swap(app_module, session, monkeypatch):
+    recorder = RecordingSharedCache()
+    monkeypatch.setattr(app_module, 'shared_cache', recorder)
+    before = app_module.load_table_versions()
+
+    def import_into(staging):
+        staging.add(app_module.Location(name='Quietly Staged Hall', category='academic'))
+        staging.flush()
+        staging.add(app_module.Location(name='Second Staged Hall', category='academic'))
+
+    app_module.import_catalog_staged(import_into)
+
+    assert recorder.published == [set(app_module.CATALOG_TABLES)]
+    after = app_module.load_table_versions()
+    assert {table: after[table] - before.get(table, 0) for table in app_module.CATALOG_TABLES} == \
+        dict.fromkeys(app_module.CATALOG_TABLES, 1)
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+
+def add_past_event(app_module, session, title, status):
+    session.add(app_module.Event(
+        title=title, event_type='social', date_time='2001-03-05 18:00', status=status,
+        start_at=datetime(2001, 3, 6, 2), end_at=datetime(2001, 3, 6, 4)
+    ))
+
+
+def titles(client, query=''):
+    response = client.get(f'/api/v1/events{query}')
+    assert response.status_code == 200
+    return {event['title'] for event in response.get_json()}
+
+
+def test_archiving_keeps_pending_events_in_the_queue(app_module, session, client):
+    add_past_event(app_module, session, 'Ended Approved Mixer', 'approved')
+    add_past_event(app_module, session, 'Ended Pending Mixer', 'pending')
+    session.commit()
+
+    assert app_module.archive_past_events() >= 1
+    statuses = dict(session.query(app_module.Event.title, app_module.Event.status).filter(
+        app_module.Event.title.like('Ended % Mixer')
+    ))
+    assert statuses == {'Ended Approved Mixer': 'archived', 'Ended Pending Mixer': 'pending'}
+
+    listed = titles(client)
+    assert 'Ended Pending Mixer' in listed
+    assert 'Ended Approved Mixer' not in listed
+
+
+def test_past_window_lists_archived_events(app_module, session, client):
+    add_past_event(app_module, session, 'Archived Lecture', 'archived')
+    add_past_event(app_module, session, 'Rejected Lecture', 'rejected')
+    session.commit()
+
+    window = '?from=2001-03-01&to=2001-03-31'
+    assert 'Archived Lecture' in titles(client, window)
+    assert 'Rejected Lecture' not in titles(client, window)
+    assert 'Archived Lecture' not in titles(client, window + '&status=approved')
+    assert {'Archived Lecture', 'Rejected Lecture'} <= titles(client, window + '&status=all')
+    assert {'Archived Lecture', 'Rejected Lecture'} <= titles(client, '?status=all')
+
+
+def test_listing_events_never_archives_them(app_module, session, client):
+    add_past_event(app_module, session, 'Unarchived Concert', 'approved')
+    session.commit()
+
+    assert 'Unarchived Concert' in titles(client)
+    session.expire_all()
+    assert session.query(app_module.Event).filter_by(title='Unarchived Concert').one().status == 'approved'
+
+    result = app_module.app.test_cli_runner().invoke(args=['archive-events'])
+    assert 'Archived' in result.output
+    session.expire_all()
+    assert session.query(app_module.Event).filter_by(title='Unarchived Concert').one().status == 'archived'
+    assert 'Unarchived Concert' not in titles(client)
+
+
+def test_event_ending_before_it_starts_is_rejected(client):
+    event = {'title': 'Backwards Talk', 'event_type': 'academic', 'date_time': '2030-05-01 18:00'}
+    response = client.post('/api/v1/events', json={
+        **event, 'start_at': '2030-05-01T18:00:00', 'end_at': '2030-05-01T17:00:00'
+    })
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'end_at must not be before start_at'}
+
+    response = client.post('/api/v1/events', json={
+        **event, 'start_at': '2030-05-01T18:00:00', 'end_at': '2030-05-01T19:00:00'
+    })
+    assert response.status_code == 201
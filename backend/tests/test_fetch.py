@@ -0,0 +1,89 @@
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.bench_fetch import StandIn, busiest_second
+from scrapers.fetch import FetchScheduler
+from scrapers.http_cache import CacheMiss, ResponseCache
+
+
+@pytest.fixture
+def stand_in():
+    """Base URL of a local server answering every path; paths ending /flaky answer 503 once"""
+    StandIn.reset()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def scheduler(**kwargs):
+    return FetchScheduler(**{'max_concurrency': 4, 'per_host_rate': 50.0, 'backoff': 0.01, **kwargs})
+
+
+def test_fetch_all_keeps_order_and_retries_503s(stand_in):
+    urls = [f'{stand_in}/page/{n}' + ('/flaky' if n % 3 == 0 else '') for n in range(9)]
+    fetcher = scheduler()
+    responses = fetcher.fetch_all(urls)
+    fetcher.close()
+
+    assert [response.url for response in responses] == urls
+    assert all(response.status_code == 200 for response in responses)
+    assert fetcher.retried == 3
+
+
+def test_per_host_rate_holds(stand_in):
+    rate = 5.0
+    fetcher = scheduler(per_host_rate=rate)
+    responses = fetcher.fetch_all([f'{stand_in}/page/{n}' for n in range(12)])
+    fetcher.close()
+
+    assert all(responses)
+    # One token of burst on top of the rate
+    assert busiest_second(StandIn.arrivals) <= rate + 1
+
+
+def test_connections_are_reused(stand_in):
+    fetcher = scheduler(max_concurrency=2)
+    fetcher.fetch_all([f'{stand_in}/page/{n}' for n in range(10)])
+    fetcher.close()
+    assert len(StandIn.connections) <= 2
+
+
+def test_unreachable_host_gives_none_once_retries_run_out():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    fetcher = scheduler(retries=1)
+    assert fetcher.fetch_all([f'http://127.0.0.1:{port}/gone']) == [None]
+    assert fetcher.retried == 1
+    fetcher.close()
+
+
+def test_repeat_fetch_revalidates_then_replays_offline(stand_in, tmp_path):
+    urls = [f'{stand_in}/page/{n}' for n in range(4)]
+    first = scheduler(cache=ResponseCache(str(tmp_path)))
+    bodies = [response.text for response in first.fetch_all(urls)]
+    first.close()
+
+    cache = ResponseCache(str(tmp_path))
+    second = scheduler(cache=cache)
+    responses = second.fetch_all(urls)
+    second.close()
+    assert StandIn.not_modified == len(urls) == cache.not_modified
+    assert [response.text for response in responses] == bodies
+    assert all(response.unchanged for response in responses)
+
+    # Replay never touches the network: the server's request log doesn't grow
+    requests_before = sum(len(times) for times in StandIn.arrivals.values())
+    replay = ResponseCache(str(tmp_path), replay=True)
+    replayer = scheduler(cache=replay)
+    assert [response.text for response in replayer.fetch_all(urls)] == bodies
+    with pytest.raises(CacheMiss):
+        replayer.request(f'{stand_in}/never-fetched')
+    replayer.close()
+    assert sum(len(times) for times in StandIn.arrivals.values()) == requests_before
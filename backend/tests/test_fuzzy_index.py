@@ -0,0 +1,25 @@
+from search_index import FUZZY_CANDIDATES, FuzzyIndex
+
+
+def crowded_index():
+    """More course titles than FUZZY_CANDIDATES, each sharing more trigrams with the query than the building"""
+    entries = [('title', f'Calculus Hall Seminar {n}', n) for n in range(FUZZY_CANDIDATES + 20)]
+    entries.append(('location', 'Calculus Hl', 500))
+    # Unrelated entries, so the query's trigrams are rare enough to use
+    entries.extend(('course_code', f'ZZZ {n:04d}', 1000 + n) for n in range(2000))
+    return FuzzyIndex(entries)
+
+
+def test_kind_filter_applies_before_the_candidate_cut():
+    results = crowded_index().search('calclus hall', kinds={'location'})
+    assert [(s.kind, s.ref_id) for s in results] == [('location', 500)]
+
+
+def test_courses_only_search_skips_locations():
+    results = crowded_index().search('calclus hall', limit=100, kinds={'course_code', 'title'})
+    assert results and all(s.kind == 'title' for s in results)
+
+
+def test_typo_finds_course():
+    index = FuzzyIndex([('title', 'Linear Algebra', 1), ('title', 'Organic Chemistry', 2), ('location', 'Frary Dining Hall', 3)])
+    assert [s.ref_id for s in index.search('linaer algebra')] == [1]
@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from scrape_courses import scrape_courses_from_html
+from scrapers.soup import available_parsers, default_parser, make_soup
+
+HTML_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'courses.html')
+
+
+def records(parser):
+    return [course.to_dict() for course in scrape_courses_from_html(HTML_FILE, parser)]
+
+
+@pytest.fixture(scope='module')
+def expected():
+    return records('html.parser')
+
+
+def test_builtin_parser_finds_the_catalog(expected):
+    assert len(expected) > 1000
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+def test_backend_extracts_the_same_records(parser, expected):
+    assert records(parser) == expected
+
+
+def test_requested_parser_is_used(monkeypatch):
+    monkeypatch.setenv('SCRAPER_HTML_PARSER', 'html.parser')
+    assert default_parser() == 'html.parser'
+
+
+def test_missing_parser_falls_back(monkeypatch):
+    monkeypatch.setenv('SCRAPER_HTML_PARSER', 'no-such-parser')
+    assert default_parser() in available_parsers()
+    assert make_soup('<p>hi</p>').p.get_text() == 'hi'
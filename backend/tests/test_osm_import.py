@@ -0,0 +1,50 @@
+import import_osm_buildings
+
+
+def way(element_id, name, outlined=True):
+    ring = [(34.1000, -117.7100), (34.1000, -117.7095), (34.1004, -117.7095), (34.1004, -117.7100)]
+    geometry = [{'lat': lat, 'lon': lon} for lat, lon in ring + ring[:1]]
+    return {
+        'type': 'way', 'id': element_id, 'tags': {'name': name, 'building': 'yes'},
+        'bounds': {'minlat': 34.1000, 'minlon': -117.7100, 'maxlat': 34.1004, 'maxlon': -117.7095},
+        'geometry': geometry if outlined else []
+    }
+
+
+def imported(app_module, session, elements):
+    buildings = import_osm_buildings.extract_buildings(elements)
+    import_osm_buildings.simplify_outlines(buildings)
+    counts = import_osm_buildings.upsert_buildings(session, buildings)
+    session.commit()
+    return counts
+
+
+def ensure_college(app_module, session, name, code):
+    if not session.query(app_module.College).filter_by(name=name).first():
+        session.add(app_module.College(name=name, code=code))
+        session.commit()
+
+
+def test_reimport_removes_footprints_of_buildings_that_lost_their_outline(app_module, session):
+    ensure_college(app_module, session, 'Scripps College', 'SC')
+    imported(app_module, session, [way(9001, 'Scripps Outline Hall')])
+    location = session.query(app_module.Location).filter_by(osm_id='way/9001').one()
+    assert session.query(app_module.BuildingFootprint).filter_by(location_id=location.id).count() == 1
+
+    counts = imported(app_module, session, [way(9001, 'Scripps Outline Hall', outlined=False)])
+
+    assert counts['footprints_removed'] == 1
+    session.expire_all()
+    assert session.query(app_module.BuildingFootprint).filter_by(location_id=location.id).count() == 0
+
+
+def test_buildings_of_unknown_colleges_are_skipped_and_reported(app_module, session, monkeypatch):
+    ensure_college(app_module, session, 'Pomona College', 'PO')
+    monkeypatch.setitem(import_osm_buildings.college_keywords, 'Keck', 'Keck Graduate Institute')
+
+    counts = imported(app_module, session, [way(9002, 'Keck Science Annex'), way(9003, 'Pomona Annex')])
+
+    assert counts['skipped'] == 1
+    assert counts['unknown_colleges'] == ['Keck Graduate Institute']
+    assert session.query(app_module.Location).filter_by(osm_id='way/9002').count() == 0
+    assert session.query(app_module.Location).filter_by(osm_id='way/9003').count() == 1
@@ -0,0 +1,60 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+import query_budget
+from benchmarks.check_query_budgets import check_budgets
+from query_budget import QueryBudgetExceeded, max_queries
+
+
+@pytest.fixture(scope='module')
+def budget_check(seeded_app):
+    return check_budgets(seeded_app)
+
+
+def test_no_endpoint_exceeds_its_budget(budget_check):
+    results, _ = budget_check
+    overruns = [f"{method} {path}: {overrun}" for method, path, _, overrun in results if overrun is not None]
+    assert not overruns, '\n'.join(overruns)
+
+
+def test_budgeted_requests_succeed(budget_check):
+    results, _ = budget_check
+    failed = [(method, path, status) for method, path, status, _ in results if status is not None and status >= 400]
+    assert not failed
+
+
+def test_every_budgeted_endpoint_is_checked(budget_check):
+    _, unchecked = budget_check
+    assert not unchecked
+
+
+@pytest.fixture
+def n_plus_one_app():
+    app = Flask(__name__)
+    app.config['QUERY_BUDGET_MODE'] = 'raise'
+    app.testing = True
+    engine = create_engine('sqlite://')
+    query_budget.init_app(app, engine)
+
+    @app.route('/rows/<int:count>')
+    @max_queries(2)
+    def rows(count):
+        with engine.connect() as connection:
+            for n in range(count):
+                connection.execute(text('SELECT :n'), {'n': n})
+        return 'ok'
+
+    return app
+
+
+def test_going_over_budget_raises_with_the_statements(n_plus_one_app):
+    with pytest.raises(QueryBudgetExceeded) as raised:
+        n_plus_one_app.test_client().get('/rows/5')
+    assert raised.value.budget == 2
+    assert len(raised.value.statements) == 5
+    assert '5 x SELECT ?' in str(raised.value)
+
+
+def test_within_budget_passes(n_plus_one_app):
+    assert n_plus_one_app.test_client().get('/rows/2').data == b'ok'
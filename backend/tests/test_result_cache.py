@@ -0,0 +1,31 @@
+from result_cache import FRESH, STALE, CacheEntry, ResultCache
+
+
+def test_outdated_entry_is_served_stale_within_the_grace_period():
+    cache = ResultCache(max_stale_seconds=60)
+    cache.store(CacheEntry('k', (1,), 'application/json', b'[]', versions_at=10.0))
+    assert cache.lookup('k', (1,))[1] == FRESH
+    assert cache.lookup('k', (2,))[1] == STALE
+
+
+def test_outdated_entry_is_not_served_after_an_own_write():
+    cache = ResultCache(max_stale_seconds=60)
+    cache.store(CacheEntry('k', (1,), 'application/json', b'[]', versions_at=10.0))
+    # Another process wrote before this entry was computed; this process wrote after
+    assert cache.lookup('k', (2,), written_at=5.0)[1] == STALE
+    assert cache.lookup('k', (2,), written_at=11.0) == (None, None)
+
+
+def test_client_reads_back_its_own_write(client, app_module, session):
+    names = lambda: {location['name'] for location in client.get('/api/v1/locations').get_json()}
+    assert 'Fresh Hall' not in names()
+    assert client.get('/api/v1/events').status_code == 200
+
+    response = client.post('/api/v1/events', json={'title': 'Read Back Social', 'event_type': 'fun',
+                                                   'start_at': '2099-01-01T18:00'})
+    assert response.status_code == 201
+    assert 'Read Back Social' in {event['title'] for event in client.get('/api/v1/events').get_json()}
+
+    session.add(app_module.Location(name='Fresh Hall', category='academic'))
+    session.commit()
+    assert 'Fresh Hall' in names()
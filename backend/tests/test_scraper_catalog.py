@@ -0,0 +1,51 @@
+import pytest
+from flask import Flask
+
+from model.models import Location, db
+from scrapers.catalog import merge_catalog, save_catalog
+
+
+@pytest.fixture
+def catalog_app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'catalog.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def scraped(locations):
+    return {
+        'code': 'PO', 'name': 'Pomona College', 'locations': locations,
+        'courses': [{'title': 'Linear Algebra', 'course_number': 'math060', 'department_code': 'math'}]
+    }
+
+
+def test_merge_normalizes_locations():
+    catalog = merge_catalog([scraped([
+        {'name': '  Seaver   North ', 'building_code': 'sn', 'category': 'academic', 'floor_plan': 'x'},
+        {'building_code': 'XX'},
+        {'name': 'Seaver North', 'description': 'Labs'},
+    ])])
+
+    assert catalog['PO']['locations'] == [{'name': 'Seaver North', 'description': 'Labs'}]
+
+
+def test_save_upserts_locations_with_courses(catalog_app):
+    save_catalog(merge_catalog([scraped([
+        {'name': 'Seaver North', 'building_code': 'SN', 'category': 'academic', 'hours_info': '8-5'},
+        {'name': 'Edmunds Union', 'category': 'dining'},
+    ])]))
+    saved = save_catalog(merge_catalog([scraped([
+        {'name': 'Seaver North', 'description': 'Science labs'},
+    ])]))
+
+    counts = saved['colleges']['PO']
+    assert (counts['locations_inserted'], counts['locations_updated']) == (0, 1)
+    locations = {location.name: location for location in Location.query}
+    assert set(locations) == {'Seaver North', 'Edmunds Union'}
+    assert locations['Seaver North'].description == 'Science labs'
+    # Fields the later scrape didn't supply are kept
+    assert locations['Seaver North'].hours_info == '8-5'
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from shared_cache import RedisBackend, VersionSnapshot
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def backend(server):
+    return RedisBackend(fakeredis.FakeRedis(server=server), ttl=60)
+
+
+def test_entries_are_shared_per_versions(server, backend):
+    backend.set(('get_colleges', (), ()), (3, 1), 200, 'application/json', b'[{"id": 1}]')
+
+    # Another worker, its own client on the same server
+    peer = RedisBackend(fakeredis.FakeRedis(server=server))
+    assert peer.get(('get_colleges', (), ()), (3, 1)) == (200, 'application/json', b'[{"id": 1}]')
+    assert peer.get(('get_colleges', (), ()), (4, 1)) is None
+    assert (peer.hits, peer.misses) == (1, 1)
+
+
+def test_redis_going_away_degrades_to_misses(server, backend):
+    server.connected = False
+    backend.set('key', (1,), 200, 'application/json', b'{}')
+    assert backend.get('key', (1,)) is None
+    backend.publish_invalidation({'course'})
+    assert backend.errors == 2
+
+
+def test_published_invalidations_reach_subscribers(server, backend):
+    received = []
+    arrived = threading.Event()
+
+    def on_invalidate(tables):
+        received.append(tables)
+        arrived.set()
+
+    RedisBackend(fakeredis.FakeRedis(server=server)).subscribe(on_invalidate)
+    # The subscriber thread may not have subscribed yet; publish until it hears one
+    for _ in range(100):
+        backend.publish_invalidation({'course', 'location'})
+        if arrived.wait(0.05):
+            break
+    assert received and received[0] == {'course', 'location'}
+
+
+def test_version_snapshot_reloads_on_invalidation():
+    versions = {'course': 1}
+    snapshot = VersionSnapshot(lambda: dict(versions), max_age=60)
+    assert snapshot.get('course', 'location') == (1, 0)
+
+    versions['course'] = 2
+    assert snapshot.get('course') == (1,)
+    snapshot.invalidate()
+    assert snapshot.get('course') == (2,)
+
+
+def test_local_miss_is_served_from_the_shared_cache(client, app_module, server, monkeypatch):
+    shared = RedisBackend(fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(app_module, 'shared_cache', shared)
+    app_module.result_cache.clear()
+
+    first = client.get('/api/v1/colleges')
+    assert (shared.hits, shared.misses) == (0, 1)
+
+    # A fresh worker: nothing local, the body comes from Redis
+    app_module.result_cache.clear()
+    second = client.get('/api/v1/colleges')
+    assert shared.hits == 1
+    assert second.data == first.data
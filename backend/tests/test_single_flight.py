@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+from sqlalchemy import event
+
+from result_cache import SingleFlight
+
+CONCURRENCY = 16
+
+
+def run_together(target, count=CONCURRENCY):
+    """Start count threads at once and wait for them all"""
+    barrier = threading.Barrier(count)
+    threads = [threading.Thread(target=lambda: (barrier.wait(), target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = Counter()
+    results = []
+    lock = threading.Lock()
+
+    def compute():
+        calls['compute'] += 1
+        time.sleep(0.1)
+        return object()
+
+    def caller():
+        result = flights.do('key', compute)
+        with lock:
+            results.append(result)
+
+    run_together(caller)
+    assert calls['compute'] == 1
+    assert len({id(result) for result, _ in results}) == 1
+    assert sum(shared for _, shared in results) == CONCURRENCY - 1
+    assert not flights.in_flight('key')
+
+
+def test_waiters_see_the_leaders_error():
+    flights = SingleFlight()
+    errors = []
+
+    def compute():
+        time.sleep(0.1)
+        raise RuntimeError('database down')
+
+    def caller():
+        try:
+            flights.do('key', compute)
+        except RuntimeError as e:
+            errors.append(e)
+
+    run_together(caller, 4)
+    assert len(errors) == 4
+    # The failed flight is gone, so the next caller retries
+    assert flights.do('key', lambda: 'ok') == ('ok', False)
+
+
+def test_background_refresh_runs_once():
+    flights = SingleFlight()
+    calls = Counter()
+    release = threading.Event()
+
+    def refresh():
+        calls['refresh'] += 1
+        release.wait(5)
+
+    started = [flights.start('key', refresh) for _ in range(5)]
+    release.set()
+    while flights.in_flight('key'):
+        time.sleep(0.01)
+    assert started == [True, False, False, False, False]
+    assert calls['refresh'] == 1
+
+
+@pytest.fixture
+def course_queries(app_module):
+    queries = Counter()
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().startswith('SELECT') and 'FROM course' in statement:
+            queries['course'] += 1
+
+    with app_module.app.app_context():
+        engine = app_module.db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    yield queries
+    event.remove(engine, 'before_cursor_execute', count)
+
+
+def test_cold_cache_burst_runs_the_list_query_once(app_module, course_queries):
+    app_module.result_cache.clear()
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def request():
+        response = app_module.app.test_client().get('/api/v1/courses')
+        with lock:
+            statuses[response.headers['X-Cache']] += 1
+
+    run_together(request)
+    assert course_queries['course'] == 1
+    assert statuses['MISS'] == 1
+    assert sum(statuses.values()) == CONCURRENCY
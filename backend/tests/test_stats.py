@@ -0,0 +1,80 @@
+import pytest
+from flask import Flask
+
+from api.routes import api
+from model.models import (GLOBAL_STATS_ROW, College, Course, Department, db, disable_stats_counters,
+                          enable_stats_counters, read_stats_counters, rebuild_stats_counters)
+
+
+@pytest.fixture
+def stats_app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'stats.db'}"
+    db.init_app(app)
+    app.register_blueprint(api, url_prefix='/api/v1')
+    with app.app_context():
+        db.create_all()
+        db.session.add(College(id=1, name='Pomona College', code='PO'))
+        db.session.add(Department(id=1, name='Mathematics', code='MATH', college_id=1))
+        db.session.commit()
+        yield app
+        db.session.remove()
+    disable_stats_counters()
+
+
+def add_course(number):
+    db.session.add(Course(title='Linear Algebra', course_number=number, department_id=1, college_id=1))
+    db.session.commit()
+
+
+def test_counters_left_by_another_process_are_not_trusted(stats_app):
+    # A process with the counters enabled seeded the table, then went away
+    enable_stats_counters()
+    rebuild_stats_counters()
+    disable_stats_counters()
+
+    # This process writes without the hooks, so the table is now stale
+    add_course('MATH060')
+    stats = stats_app.test_client().get('/api/v1/stats').get_json()
+    assert stats['courses'] == 1
+    assert stats['by_college']['PO']['courses'] == 1
+
+
+def test_enabled_counters_are_read_and_kept_current(stats_app):
+    enable_stats_counters()
+    rebuild_stats_counters()
+    add_course('MATH060')
+    add_course('MATH131')
+    stats = stats_app.test_client().get('/api/v1/stats').get_json()
+    assert stats['courses'] == 2
+    assert stats['departments'] == 1
+
+
+def test_write_without_hooks_is_seen_by_a_reader_with_them(stats_app):
+    enable_stats_counters()
+    rebuild_stats_counters()
+
+    # Another process (a scraper, an import) writes without the hooks
+    disable_stats_counters()
+    add_course('MATH060')
+
+    enable_stats_counters()
+    stats = stats_app.test_client().get('/api/v1/stats').get_json()
+    assert stats['courses'] == 1
+    assert read_stats_counters() is None
+
+    # Until the next rebuild, which makes the counters trusted again
+    rebuild_stats_counters()
+    assert read_stats_counters()[GLOBAL_STATS_ROW]['courses'] == 1
+
+
+def test_bulk_writes_invalidate_enabled_counters(stats_app):
+    enable_stats_counters()
+    rebuild_stats_counters()
+    db.session.execute(db.insert(Course), [
+        {'title': 'Real Analysis', 'course_number': 'MATH131', 'department_id': 1, 'college_id': 1}
+    ])
+    db.session.commit()
+
+    assert read_stats_counters() is None
+    assert stats_app.test_client().get('/api/v1/stats').get_json()['courses'] == 1
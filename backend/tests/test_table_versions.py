@@ -0,0 +1,27 @@
+def versions(app_module):
+    return app_module.load_table_versions()
+
+
+def test_writes_to_untracked_tables_leave_versions_alone(app_module, session):
+    before = versions(app_module)
+    session.add(app_module.StarredItem(user_id=902, item_type='location', item_id=1))
+    session.commit()
+    session.execute(app_module.db.update(app_module.StarredItem).where(
+        app_module.StarredItem.user_id == 902
+    ).values(item_id=2))
+    session.commit()
+
+    assert versions(app_module) == before
+    assert 'starred_item' not in app_module.TRACKED_TABLES
+
+
+def test_writes_to_cached_tables_bump_their_version(app_module, session):
+    before = versions(app_module)
+    session.add(app_module.Location(name='Version Hall', category='academic'))
+    session.commit()
+
+    after = versions(app_module)
+    assert after['location'] == before.get('location', 0) + 1
+    assert {name: v for name, v in after.items() if name != 'location'} == \
+        {name: v for name, v in before.items() if name != 'location'}
+
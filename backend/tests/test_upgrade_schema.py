@@ -0,0 +1,17 @@
+def test_unique_index_upgrade_reports_the_duplicates_it_removes(app_module, session, capsys):
+    session.execute(app_module.db.text('DROP INDEX uq_starred_item_user_item'))
+    session.execute(app_module.db.insert(app_module.StarredItem), [
+        {'user_id': 904, 'item_type': 'location', 'item_id': 1},
+        {'user_id': 904, 'item_type': 'location', 'item_id': 1},
+        {'user_id': 904, 'item_type': 'location', 'item_id': 1},
+        {'user_id': 904, 'item_type': 'course', 'item_id': 1},
+    ])
+    session.commit()
+    capsys.readouterr()
+
+    app_module.upgrade_schema()
+
+    output = capsys.readouterr().out
+    assert 'Removed 2 duplicate starred_item rows' in output
+    assert 'uq_starred_item_user_item' in output
+    assert session.query(app_module.StarredItem).filter_by(user_id=904).count() == 2